@@ -0,0 +1,234 @@
+# benchmarks/action_items.py
+"""
+Recall and cost benchmark for the action item prefilter.
+
+Offline (default): labelled synthetic meetings in several languages, with a few
+action item utterances planted among discussion and small talk. Reports the
+share of planted utterances the prefilter keeps (utterance recall), the share of
+the transcript tokens it sends, and its run time:
+
+    python -m benchmarks.action_items --meetings 20 --utterances 600 --min-recall 0.95
+
+Against the LLM (--llm): extracts action items from each transcript twice, from
+the full transcript (the baseline) and from the prefiltered excerpts, and
+reports the recall of the prefiltered items against the baseline items, prompt
+tokens and latency. Use real transcripts with --transcripts, a JSONL file of
+transcription results such as the batch output:
+
+    python -m benchmarks.action_items --llm --transcripts batch_results.jsonl
+
+With --min-recall the exit status is non-zero when recall falls below it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+# Phrasings per language: (action items, discussion)
+_CORPUS = {
+    "en": (
+        ["I'll send the revised budget to finance by Friday.", "Can you book the room for the offsite?",
+         "We need to update the onboarding guide before the next sprint.", "Action item for Priya: review the vendor contract.",
+         "Let me draft the announcement and share it tomorrow."],
+        ["The numbers from last quarter looked better than expected.", "Customers mostly asked about pricing.",
+         "I think the design is heading in the right direction.", "That was a long discussion last time."],
+    ),
+    "es": (
+        ["Voy a enviar el informe el viernes.", "¿Puedes revisar el contrato antes del lunes?",
+         "Tenemos que preparar la demo para la próxima semana."],
+        ["El trimestre pasado fue bastante bueno.", "Los clientes preguntaron por los precios.",
+         "Creo que el diseño va bien."],
+    ),
+    "fr": (
+        ["Je vais envoyer le compte rendu demain.", "Pouvez-vous préparer la présentation pour jeudi ?",
+         "Il faut vérifier les chiffres avant la réunion."],
+        ["Le dernier trimestre était correct.", "Les clients aiment la nouvelle interface.",
+         "C'était une bonne discussion."],
+    ),
+    "de": (
+        ["Ich werde den Bericht bis Freitag schicken.", "Kannst du den Termin mit dem Kunden vorbereiten?",
+         "Wir müssen die Zahlen nächste Woche prüfen."],
+        ["Das letzte Quartal war gut.", "Die Kunden mögen das neue Design.", "Das war eine lange Diskussion."],
+    ),
+    "pt": (
+        ["Eu vou enviar a proposta amanhã.", "Você pode revisar o contrato até sexta?",
+         "Precisamos preparar a apresentação para a próxima semana."],
+        ["O último trimestre foi bom.", "Os clientes gostaram do novo painel.", "Foi uma conversa longa."],
+    ),
+    "zh": (
+        ["我会在周五之前发送报告。", "请你明天准备一下演示。", "我们需要在下周之前更新文档。"],
+        ["上个季度的结果还不错。", "客户对新界面很满意。", "这次讨论很有意思。"],
+    ),
+    "ja": (
+        ["明日までに資料を送ります、私がやります。", "来週の会議の準備をお願いします。", "金曜日までに確認が必要です。"],
+        ["前四半期は好調でした。", "お客様は新しいデザインを気に入っています。", "長い議論でした。"],
+    ),
+    "hi": (
+        ["मैं कल तक रिपोर्ट भेज दूंगा।", "कृपया सोमवार तक प्रस्ताव तैयार करें।", "हमें अगले हफ्ते तक डेटा देखना चाहिए।"],
+        ["पिछली तिमाही अच्छी रही।", "ग्राहकों को नया डिज़ाइन पसंद आया।", "यह लंबी चर्चा थी।"],
+    ),
+}
+_SMALL_TALK = ["Yeah.", "Okay.", "Sorry, you were on mute.", "Can everyone see my screen?", "Right.", "Hmm, good point."]
+
+
+def synthetic_meeting(seed: int, utterances: int, action_rate: float) -> Tuple[List[dict], Set[int]]:
+    """A meeting in one language with action items planted at action_rate; returns utterances and planted indexes."""
+    rng = random.Random(seed)
+    actions, discussion = _CORPUS[sorted(_CORPUS)[seed % len(_CORPUS)]]
+    lines, planted = [], set()
+    for i in range(utterances):
+        roll = rng.random()
+        if roll < action_rate:
+            text = rng.choice(actions)
+            planted.add(i)
+        elif roll < 0.6:
+            text = rng.choice(discussion)
+        else:
+            text = rng.choice(_SMALL_TALK)
+        lines.append({"speaker": "ABCD"[rng.randrange(4)], "start": i * 5000, "end": i * 5000 + 4500,
+                      "confidence": 0.9, "text": text})
+    return lines, planted
+
+
+def load_transcripts(path: str) -> List[dict]:
+    """Reads transcription results, bare or under a "transcript" key as in the batch output."""
+    transcripts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record = record.get("transcript", record)
+            if isinstance(record, dict) and record.get("text"):
+                transcripts.append(record)
+    return transcripts
+
+
+def item_recall(baseline: List[str], candidate: List[str], threshold: float = 0.5) -> Optional[float]:
+    """Share of baseline items matched by a candidate item (token Jaccard similarity >= threshold)."""
+    from src.services.retrieval import tokenize
+    if not baseline:
+        return None
+    candidate_tokens = [set(tokenize(item)) for item in candidate]
+    matched = 0
+    for item in baseline:
+        tokens = set(tokenize(item))
+        if any(tokens and len(tokens & other) / len(tokens | other) >= threshold for other in candidate_tokens):
+            matched += 1
+    return matched / len(baseline)
+
+
+def run_offline(args: argparse.Namespace) -> Dict[str, float]:
+    from src.schemas.transcription import Utterance
+    from src.services.action_item_filter import build_action_item_context, select_candidates
+    from src.services.text_chunking import estimate_tokens
+
+    kept_planted = total_planted = 0
+    ratios, times = [], []
+    for seed in range(args.meetings):
+        lines, planted = synthetic_meeting(seed, args.utterances, args.action_rate)
+        utterances = [Utterance(**line) for line in lines]
+        text = " ".join(utt.text for utt in utterances)
+        started = time.perf_counter()
+        context, _, _ = build_action_item_context(text, utterances)
+        times.append((time.perf_counter() - started) * 1000)
+        selected, _ = select_candidates(utterances, radius=0)
+        kept = {id(utt) for utt in selected if utt is not None}
+        kept_planted += sum(1 for i in planted if id(utterances[i]) in kept)
+        total_planted += len(planted)
+        ratios.append(estimate_tokens(context) / max(estimate_tokens(text), 1))
+    return {
+        "meetings": args.meetings,
+        "utterance_recall": kept_planted / total_planted if total_planted else 1.0,
+        "token_ratio": statistics.mean(ratios),
+        "prefilter_ms_p50": statistics.median(times),
+    }
+
+
+async def run_llm(args: argparse.Namespace) -> Dict[str, float]:
+    from src.core.config import settings
+    from src.services import llm_service
+    from src.services.action_item_filter import build_action_item_context
+    from src.services.text_chunking import estimate_tokens
+    from src.schemas.transcription import Utterance
+
+    if args.transcripts:
+        transcripts = load_transcripts(args.transcripts)
+    else:
+        transcripts = []
+        for seed in range(args.meetings):
+            lines, _ = synthetic_meeting(seed, args.utterances, args.action_rate)
+            transcripts.append({"text": " ".join(line["text"] for line in lines), "utterances": lines})
+
+    recalls, full_tokens, filtered_tokens, full_ms, filtered_ms = [], [], [], [], []
+    for transcript in transcripts:
+        text = transcript["text"]
+        utterances = [Utterance(**utt) for utt in transcript.get("utterances") or []] or None
+
+        settings.ACTION_ITEMS_PREFILTER_MIN_TOKENS = 0
+        started = time.perf_counter()
+        baseline = await llm_service.extract_action_items(text, utterances)
+        full_ms.append((time.perf_counter() - started) * 1000)
+
+        settings.ACTION_ITEMS_PREFILTER_MIN_TOKENS = 1
+        started = time.perf_counter()
+        filtered = await llm_service.extract_action_items(text, utterances)
+        filtered_ms.append((time.perf_counter() - started) * 1000)
+
+        full_tokens.append(estimate_tokens(text))
+        filtered_tokens.append(estimate_tokens(build_action_item_context(text, utterances)[0]))
+        recall = item_recall(baseline.action_items, filtered.action_items)
+        if recall is not None:
+            recalls.append(recall)
+        if args.verbose:
+            print(f"{len(baseline.action_items)} baseline items, {len(filtered.action_items)} prefiltered, recall {recall}")
+
+    return {
+        "transcripts": len(transcripts),
+        "item_recall": statistics.mean(recalls) if recalls else 1.0,
+        "prompt_tokens_full": sum(full_tokens),
+        "prompt_tokens_prefiltered": sum(filtered_tokens),
+        "latency_ms_full_p50": statistics.median(full_ms) if full_ms else 0.0,
+        "latency_ms_prefiltered_p50": statistics.median(filtered_ms) if filtered_ms else 0.0,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=16, help="Synthetic meetings (one language each).")
+    parser.add_argument("--utterances", type=int, default=600, help="Utterances per synthetic meeting.")
+    parser.add_argument("--action-rate", type=float, default=0.03, help="Share of synthetic utterances that are action items.")
+    parser.add_argument("--llm", action="store_true", help="Compare LLM extraction with and without the prefilter.")
+    parser.add_argument("--transcripts", default="", help="JSONL of transcription results to use with --llm.")
+    parser.add_argument("--min-recall", type=float, default=0.0, help="Exit non-zero below this recall.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.llm:
+        os.environ.setdefault("LLM_CACHE_ENABLED", "false") # Both runs must reach the LLM
+        results = asyncio.run(run_llm(args))
+        recall = results["item_recall"]
+    else:
+        results = run_offline(args)
+        recall = results["utterance_recall"]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, value in results.items():
+            print(f"{name:>28}: {value:.3f}" if isinstance(value, float) else f"{name:>28}: {value}")
+    if recall < args.min_recall:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
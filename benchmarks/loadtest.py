@@ -0,0 +1,220 @@
+# benchmarks/loadtest.py
+"""
+Load generator for the API. Drives one scenario at a fixed concurrency and
+reports p50/p95/p99 latency and throughput.
+
+By default the app runs in-process with the stub providers, so no keys or
+network are needed:
+
+    python -m benchmarks.loadtest --scenario transcribe --concurrency 16 --requests 200
+    python -m benchmarks.loadtest --scenario summarize --distinct-inputs 5 --probe-ping
+
+Pass --base-url to drive a running server instead (its providers are used).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import struct
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+API = "/api/v1"
+SCENARIOS = ["ping", "transcribe", "summarize", "notes", "chat"]
+
+
+def synthetic_wav(seed: int, size: int) -> bytes:
+    """A valid WAV header followed by deterministic PCM bytes; distinct seeds give distinct hashes."""
+    data = (seed.to_bytes(8, "little") * (size // 8 + 1))[:size]
+    header = b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+    header += b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16)
+    header += b"data" + struct.pack("<I", len(data))
+    return header + data
+
+
+def synthetic_transcript(seed: int, utterances: int) -> dict:
+    lines = [
+        {"speaker": "AB"[i % 2], "start": i * 4000, "end": i * 4000 + 3500, "confidence": 0.9,
+         "text": f"Item {seed}-{i}: we discussed the budget, hiring and next steps for the launch."}
+        for i in range(utterances)
+    ]
+    return {"transcript": " ".join(u["text"] for u in lines), "utterances": lines}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize_latencies(name: str, latencies: List[float], errors: int, elapsed: float) -> dict:
+    return {
+        "name": name,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else float("nan"),
+    }
+
+
+async def _transcribe(client: httpx.AsyncClient, seed: int, audio_bytes: int, poll_interval: float):
+    resp = await client.post(
+        f"{API}/transcribe/stream",
+        content=synthetic_wav(seed, audio_bytes),
+        params={"filename": f"load-{seed}.wav"},
+        headers={"Content-Type": "audio/wav"},
+    )
+    resp.raise_for_status()
+    job = resp.json()
+    while job["status"] in ("queued", "processing"):
+        await asyncio.sleep(poll_interval)
+        resp = await client.get(f"{API}/transcriptions/{job['job_id']}")
+        resp.raise_for_status()
+        job = resp.json()
+    if job["status"] != "completed":
+        raise RuntimeError(job.get("error"))
+
+
+def make_request(args: argparse.Namespace) -> Callable[[httpx.AsyncClient, int], Awaitable[None]]:
+    """Returns a coroutine function issuing one request of the scenario for input number i."""
+    async def run(client: httpx.AsyncClient, i: int):
+        seed = i % args.distinct_inputs if args.distinct_inputs else i
+        if args.scenario == "ping":
+            (await client.get("/ping")).raise_for_status()
+        elif args.scenario == "transcribe":
+            await _transcribe(client, seed, args.audio_bytes, args.poll_interval)
+        elif args.scenario in ("summarize", "notes"):
+            path = "summarize" if args.scenario == "summarize" else "notes"
+            payload = synthetic_transcript(seed, args.utterances)
+            (await client.post(f"{API}/llm/{path}", json=payload)).raise_for_status()
+        elif args.scenario == "chat":
+            transcript = synthetic_transcript(seed, args.utterances)
+            payload = {
+                "transcript_context": transcript["transcript"],
+                "utterances": transcript["utterances"],
+                "user_query": f"What was said about item {seed}-{i % args.utterances}?",
+            }
+            (await client.post(f"{API}/llm/chat", json=payload)).raise_for_status()
+    return run
+
+
+async def run_load(client: httpx.AsyncClient, args: argparse.Namespace) -> Dict[str, dict]:
+    request = make_request(args)
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(args.requests))
+    stop_probe = asyncio.Event()
+    ping_latencies: List[float] = []
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                await request(client, i)
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors += 1
+                if args.verbose:
+                    print(f"request {i} failed: {e}")
+
+    async def probe():
+        # Measures how long /ping waits while the scenario runs: a blocked event loop shows up here
+        while not stop_probe.is_set():
+            started = time.perf_counter()
+            await client.get("/ping")
+            ping_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.05)
+
+    probe_task = asyncio.create_task(probe()) if args.probe_ping else None
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    if probe_task:
+        stop_probe.set()
+        await probe_task
+
+    results = {"scenario": summarize_latencies(args.scenario, latencies, errors, elapsed)}
+    results["scenario"]["elapsed_s"] = elapsed
+    results["scenario"]["concurrency"] = args.concurrency
+    if probe_task:
+        results["ping_probe"] = summarize_latencies("ping_probe", ping_latencies, 0, elapsed)
+    return results
+
+
+def _configure_stubs(args: argparse.Namespace):
+    """Points the in-process app at the stub providers before it is imported."""
+    os.environ.setdefault("ASR_PROVIDER", "stub")
+    os.environ.setdefault("LLM_PROVIDER", "stub")
+    os.environ.setdefault("STUB_ASR_LATENCY_MS", str(args.asr_latency_ms))
+    os.environ.setdefault("STUB_LLM_LATENCY_MS", str(args.llm_latency_ms))
+    os.environ.setdefault("STUB_JITTER_MS", str(args.jitter_ms))
+    os.environ.setdefault("STUB_FAILURE_RATE", str(args.failure_rate))
+    if not args.cache:
+        os.environ.setdefault("TRANSCRIPT_CACHE_PATH", "")
+        os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, dict]:
+    timeout = httpx.Timeout(args.timeout)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+            return await run_load(client, args)
+
+    _configure_stubs(args)
+    from src.main import app
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+        return await run_load(client, args)
+
+
+def print_report(results: Dict[str, dict]):
+    for result in results.values():
+        print(
+            f"{result['name']:>12}: {result['requests']} requests, {result['errors']} errors, "
+            f"{result['throughput_rps']:.1f} req/s | "
+            f"p50 {result['p50_ms']:.1f} ms  p95 {result['p95_ms']:.1f} ms  p99 {result['p99_ms']:.1f} ms"
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS, default="transcribe")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--distinct-inputs", type=int, default=0, help="Cycle through N inputs to exercise caches (0 = all distinct).")
+    parser.add_argument("--probe-ping", action="store_true", help="Measure /ping latency while the scenario runs.")
+    parser.add_argument("--base-url", default="", help="Drive a running server instead of the in-process app.")
+    parser.add_argument("--cache", action="store_true", help="Keep the transcript and LLM caches enabled in-process.")
+    parser.add_argument("--audio-bytes", type=int, default=256 * 1024)
+    parser.add_argument("--utterances", type=int, default=200)
+    parser.add_argument("--poll-interval", type=float, default=0.1)
+    parser.add_argument("--asr-latency-ms", type=int, default=2000)
+    parser.add_argument("--llm-latency-ms", type=int, default=500)
+    parser.add_argument("--jitter-ms", type=int, default=100)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    results = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/startup.py
+"""
+Import-time and cold-start benchmark for the API process. Each run happens in
+a fresh interpreter and measures:
+
+- import_ms: time to `import src.main`
+- first_ping_ms: time from interpreter start to the first /ping response
+- first_summary_ms: time from interpreter start to the first summary (stub LLM),
+  which includes initializing the deferred services
+
+It also checks that no provider SDK is imported by `import src.main`:
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --write-baseline benchmarks/startup_baseline.json
+    python -m benchmarks.startup --baseline benchmarks/startup_baseline.json --tolerance 0.25
+
+The exit status is non-zero when a deferred module is imported at startup or,
+with --baseline, when a median regresses by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# Modules that must only be imported on first use, never by `import src.main`
+DEFERRED_MODULES = ["langchain_core", "langchain_groq", "assemblyai"]
+
+_PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+loaded = [name for name in {deferred!r} if name in sys.modules]
+
+import asyncio, httpx
+
+async def first_requests():
+    transport = httpx.ASGITransport(app=src.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+        (await client.get("/ping")).raise_for_status()
+        pinged = time.perf_counter()
+        response = await client.post("/api/v1/llm/summarize", json={{"transcript": "We agreed to ship on Friday."}})
+        response.raise_for_status()
+        return pinged, time.perf_counter()
+
+pinged, summarized = asyncio.run(first_requests())
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "first_ping_ms": (pinged - started) * 1000,
+    "first_summary_ms": (summarized - started) * 1000,
+    "deferred_loaded": loaded,
+}}))
+"""
+
+
+def _probe_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "ASR_PROVIDER": "stub",
+        "LLM_PROVIDER": "stub",
+        "STUB_LLM_LATENCY_MS": "0",
+        "STUB_JITTER_MS": "0",
+        "LLM_CACHE_ENABLED": "false",
+        "TRANSCRIPT_CACHE_PATH": "",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+
+def run_once() -> dict:
+    """Runs the probe in a fresh interpreter and returns its measurements."""
+    code = _PROBE.format(deferred=DEFERRED_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-c", code], env=_probe_env(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def top_imports(limit: int) -> List[dict]:
+    """The slowest modules imported by `import src.main`, by cumulative time (from -X importtime)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        env=_probe_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        rows.append({"module": name.strip(), "cumulative_ms": int(cumulative_us) / 1000})
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+def run(runs: int) -> dict:
+    samples = [run_once() for _ in range(runs)]
+    results = {
+        metric: statistics.median(sample[metric] for sample in samples)
+        for metric in ("import_ms", "first_ping_ms", "first_summary_ms")
+    }
+    results["deferred_loaded"] = sorted({name for sample in samples for name in sample["deferred_loaded"]})
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Returns a description of every regression against the baseline."""
+    failures = [f"{name} imported at startup" for name in results["deferred_loaded"]]
+    for metric, value in results.items():
+        if metric == "deferred_loaded" or metric not in baseline:
+            continue
+        limit = baseline[metric] * (1 + tolerance)
+        if value > limit:
+            failures.append(f"{metric}: {value:.1f} ms exceeds baseline {baseline[metric]:.1f} ms (+{tolerance:.0%})")
+    return failures
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start; medians are reported.")
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest imports (0 to skip).")
+    parser.add_argument("--baseline", default="", help="Fail if results regress against this JSON file.")
+    parser.add_argument("--write-baseline", default="", help="Write the results to this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression against the baseline.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    results = run(args.runs)
+    if args.top:
+        results["top_imports"] = top_imports(args.top)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"import src.main: {results['import_ms']:.1f} ms")
+        print(f"first /ping:     {results['first_ping_ms']:.1f} ms")
+        print(f"first summary:   {results['first_summary_ms']:.1f} ms")
+        print(f"deferred modules loaded at startup: {', '.join(results['deferred_loaded']) or 'none'}")
+        for row in results.get("top_imports", []):
+            print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+
+    if args.write_baseline:
+        with open(args.write_baseline, "w") as f:
+            json.dump({key: value for key, value in results.items() if key.endswith("_ms")}, f, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failures = compare(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
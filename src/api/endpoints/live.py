@@ -0,0 +1,96 @@
+# src/api/endpoints/live.py
+import asyncio
+import json
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
+
+from src.schemas.transcription import LiveMessage
+from src.services.live_service import LiveMeeting
+from src.services.realtime_asr import RealtimeASRSession, get_realtime_asr
+from src.core.config import settings, logger
+
+router = APIRouter()
+
+
+@router.websocket("/live")
+async def live_meeting_endpoint(
+    websocket: WebSocket,
+    sample_rate: int = Query(settings.LIVE_SAMPLE_RATE, ge=8000, le=48000),
+    summary_every: int = Query(settings.LIVE_SUMMARY_EVERY_N_UTTERANCES, ge=0),
+):
+    """
+    Live meeting transcription. The client sends binary frames of 16-bit mono PCM
+    audio at `sample_rate` and a text frame `{"type": "stop"}` when the meeting
+    ends. The server sends JSON LiveMessages: `partial` and `final` utterances as
+    they are recognized, a `summary` every `summary_every` final utterances, and
+    `completed` with the full transcript, which is also added to the transcript store.
+    """
+    await websocket.accept()
+    connected = True
+
+    async def send(message: LiveMessage):
+        nonlocal connected
+        if not connected:
+            return
+        try:
+            await websocket.send_text(message.model_dump_json(exclude_none=True))
+        except Exception:
+            connected = False # The client went away; keep transcribing what was received
+
+    try:
+        backend = await asyncio.to_thread(get_realtime_asr)
+        session: RealtimeASRSession = await backend.open_session(sample_rate)
+    except (ValueError, ConnectionError) as e:
+        logger.error(f"Could not start live transcription: {e}")
+        await send(LiveMessage(type="error", detail=str(e)))
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    meeting = LiveMeeting(send, summary_every)
+    logger.info(f"Live meeting {meeting.transcript_id} started at {sample_rate} Hz")
+
+    async def forward_transcripts():
+        async for event in session.events():
+            await send(LiveMessage(type="final" if event.is_final else "partial", utterance=event.utterance))
+            if event.is_final:
+                meeting.add_utterance(event.utterance)
+
+    forwarder = asyncio.create_task(forward_transcripts())
+    try:
+        while True:
+            # Wait on the client and the ASR session together, so a session that ends or fails is reported at once
+            receiver = asyncio.create_task(websocket.receive())
+            done, _ = await asyncio.wait({receiver, forwarder}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver not in done:
+                receiver.cancel()
+                await asyncio.gather(receiver, return_exceptions=True)
+                break
+            message = receiver.result()
+            if message["type"] == "websocket.disconnect":
+                connected = False
+                break
+            if message.get("bytes"):
+                await session.send_audio(message["bytes"])
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    command = {}
+                if command.get("type") == "stop":
+                    break
+    except WebSocketDisconnect:
+        connected = False
+    except Exception as e:
+        logger.error(f"Live meeting {meeting.transcript_id} failed: {e}")
+        await send(LiveMessage(type="error", detail=str(e)))
+
+    try:
+        await session.close()
+        await forwarder
+    except Exception as e:
+        logger.error(f"Real-time transcription failed for {meeting.transcript_id}: {e}")
+        await send(LiveMessage(type="error", detail=str(e)))
+    result = await meeting.finish()
+    await send(LiveMessage(type="completed", transcript=result, summary=meeting.summary or None))
+    if connected:
+        await websocket.close()
@@ -1,44 +1,99 @@
 # src/api/endpoints/llm.py
-from fastapi import APIRouter, HTTPException, status, Depends
+import asyncio
+import json
+import math
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi.responses import StreamingResponse
 
 from src.schemas.llm import (
     LLMRequestBase,
     SummarizationResponse,
     ActionItemsResponse,
-    ChatRequest, ChatResponse
+    NotesResponse,
+    ChatRequest, ChatResponse,
+    ChatSessionRequest, ChatSessionResponse, ChatSessionQuery,
+    CorpusChatRequest, CorpusChatResponse
 )
-from src.services import llm_service
+from src.schemas.cache import TieredCacheStatsResponse
+from src.services import chat_sessions, llm_service
+from src.services.chat_sessions import ChatSession
+from src.services.llm_scheduler import LLMOverloadedError
 from src.core.config import logger
 
 router = APIRouter()
 
 # Dependency check
 async def check_llm_availability():
-    if llm_service.llm is None:
+    # The first lookup builds the LLM and imports LangChain, so it runs off the event loop
+    if await asyncio.to_thread(llm_service.get_llm) is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="LLM service is not configured or unavailable. Check GROQ_API_KEY.",
         )
 
 
+def _overloaded(error: LLMOverloadedError) -> HTTPException:
+    """429 when over capacity, 503 while the provider circuit is open; both with Retry-After."""
+    return HTTPException(
+        status_code=error.status_code,
+        detail=str(error),
+        headers={"Retry-After": str(max(math.ceil(error.retry_after), 1))},
+    )
+
+
+async def _sse_events(tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Wraps a token stream as Server-Sent Events: one `data` event per token,
+    then a `done` event, or an `error` event if the stream fails midway.
+    """
+    try:
+        async for token in tokens:
+            yield f"data: {json.dumps({'token': token})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        logger.error(f"Streaming error: {e}")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+
+def _sse_response(tokens: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_events(tokens),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post(
     "/summarize",
     response_model=SummarizationResponse,
     summary="Generate Meeting Summary",
-    description="Receives transcript text and returns ONLY a concise summary using Groq LLM.",
+    description="Receives transcript text and returns ONLY a concise summary using Groq LLM. "
+                "With `mode=extractive` the summary is instead made of the most informative utterances, "
+                "selected locally in milliseconds; this mode works without an LLM provider.",
     tags=["LLM Features"],
-    dependencies=[Depends(check_llm_availability)]
 )
-async def summarize_endpoint(request: LLMRequestBase):
+async def summarize_endpoint(
+    request: LLMRequestBase,
+    mode: str = Query("abstractive", pattern="^(abstractive|extractive)$"),
+):
+    if mode == "abstractive":
+        await check_llm_availability()
     if not request.transcript:
          raise HTTPException(status_code=400, detail="Transcript text cannot be empty.")
     try:
-        logger.info("Received request for summarization")
-        result = await llm_service.generate_summary(request.transcript)
+        logger.info(f"Received request for {mode} summarization")
+        if mode == "extractive":
+            return await llm_service.generate_extractive_summary(request.transcript, request.utterances)
+        result = await llm_service.generate_summary(request.transcript, request.utterances)
         return result
     except ValueError as ve:
         logger.warning(f"Summarization validation error: {ve}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except LLMOverloadedError as oe:
+        logger.warning(f"Summarization rejected by the LLM scheduler: {oe}")
+        raise _overloaded(oe)
     except ConnectionError as ce:
          logger.error(f"Summarization connection error: {ce}")
          raise HTTPException(status_code=503, detail=str(ce))
@@ -49,6 +104,35 @@ async def summarize_endpoint(request: LLMRequestBase):
         logger.exception("Unhandled exception during summarization")
         raise HTTPException(status_code=500, detail="An internal server error occurred during summarization.")
 
+@router.post(
+    "/summarize/stream",
+    summary="Stream Meeting Summary",
+    description="Receives transcript text and streams the summary as Server-Sent Events. "
+                "Each `data` event carries a JSON object with a `token`; the stream ends with a `done` or `error` event.",
+    tags=["LLM Features"],
+    dependencies=[Depends(check_llm_availability)]
+)
+async def summarize_stream_endpoint(request: LLMRequestBase):
+    if not request.transcript:
+        raise HTTPException(status_code=400, detail="Transcript text cannot be empty.")
+    logger.info("Received request for streamed summarization")
+    try:
+        llm_service.check_capacity("summary")
+        tokens = await llm_service.stream_summary(request.transcript, request.utterances)
+    except ValueError as ve:
+        logger.warning(f"Summarization validation error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except LLMOverloadedError as oe:
+        logger.warning(f"Summarization rejected by the LLM scheduler: {oe}")
+        raise _overloaded(oe)
+    except ConnectionError as ce:
+        logger.error(f"Summarization connection error: {ce}")
+        raise HTTPException(status_code=503, detail=str(ce))
+    except RuntimeError as re:
+        logger.error(f"Summarization runtime error: {re}")
+        raise HTTPException(status_code=500, detail=str(re))
+    return _sse_response(tokens)
+
 @router.post(
     "/extract-action-items",
     response_model=ActionItemsResponse,
@@ -62,11 +146,14 @@ async def extract_action_items_endpoint(request: LLMRequestBase):
         raise HTTPException(status_code=400, detail="Transcript text cannot be empty.")
     try:
         logger.info("Received request for action item extraction")
-        result = await llm_service.extract_action_items(request.transcript)
+        result = await llm_service.extract_action_items(request.transcript, request.utterances)
         return result
     except ValueError as ve:
         logger.warning(f"Action item validation error: {ve}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except LLMOverloadedError as oe:
+        logger.warning(f"Action item rejected by the LLM scheduler: {oe}")
+        raise _overloaded(oe)
     except ConnectionError as ce:
         logger.error(f"Action item connection error: {ce}")
         raise HTTPException(status_code=503, detail=str(ce))
@@ -78,6 +165,38 @@ async def extract_action_items_endpoint(request: LLMRequestBase):
         raise HTTPException(status_code=500, detail="An internal server error occurred during action item extraction.")
 
 
+@router.post(
+    "/notes",
+    response_model=NotesResponse,
+    summary="Generate Meeting Notes",
+    description="Receives transcript text and returns the summary and the action items, generated concurrently using Groq LLM.",
+    tags=["LLM Features"],
+    dependencies=[Depends(check_llm_availability)]
+)
+async def notes_endpoint(request: LLMRequestBase):
+    if not request.transcript:
+        raise HTTPException(status_code=400, detail="Transcript text cannot be empty.")
+    try:
+        logger.info("Received request for meeting notes")
+        result = await llm_service.generate_notes(request.transcript, request.utterances)
+        return result
+    except ValueError as ve:
+        logger.warning(f"Notes validation error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except LLMOverloadedError as oe:
+        logger.warning(f"Notes rejected by the LLM scheduler: {oe}")
+        raise _overloaded(oe)
+    except ConnectionError as ce:
+        logger.error(f"Notes connection error: {ce}")
+        raise HTTPException(status_code=503, detail=str(ce))
+    except RuntimeError as re:
+        logger.error(f"Notes runtime error: {re}")
+        raise HTTPException(status_code=500, detail=str(re))
+    except Exception as e:
+        logger.exception("Unhandled exception during notes generation")
+        raise HTTPException(status_code=500, detail="An internal server error occurred during notes generation.")
+
+
 @router.post(
     "/chat",
     response_model=ChatResponse,
@@ -91,11 +210,14 @@ async def chat_endpoint(request: ChatRequest):
         raise HTTPException(status_code=400, detail="Transcript context and user query are required.")
     try:
         logger.info(f"Received chat query: '{request.user_query[:50]}...'")
-        result = await llm_service.answer_query(request.transcript_context, request.user_query)
+        result = await llm_service.answer_query(request.transcript_context, request.user_query, request.utterances)
         return result
     except ValueError as ve:
         logger.warning(f"Chat validation error: {ve}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except LLMOverloadedError as oe:
+        logger.warning(f"Chat rejected by the LLM scheduler: {oe}")
+        raise _overloaded(oe)
     except ConnectionError as ce:
         logger.error(f"Chat connection error: {ce}")
         raise HTTPException(status_code=503, detail=str(ce))
@@ -105,3 +227,187 @@ async def chat_endpoint(request: ChatRequest):
     except Exception as e:
         logger.exception("Unhandled exception during chat")
         raise HTTPException(status_code=500, detail="An internal server error occurred during chat.")
+
+
+@router.post(
+    "/chat/stream",
+    summary="Stream Chat Answer",
+    description="Answers a user's question based on the provided transcript context and streams the answer as Server-Sent Events. "
+                "Each `data` event carries a JSON object with a `token`; the stream ends with a `done` or `error` event.",
+    tags=["LLM Features"],
+    dependencies=[Depends(check_llm_availability)]
+)
+async def chat_stream_endpoint(request: ChatRequest):
+    if not request.transcript_context or not request.user_query:
+        raise HTTPException(status_code=400, detail="Transcript context and user query are required.")
+    logger.info(f"Received streamed chat query: '{request.user_query[:50]}...'")
+    try:
+        llm_service.check_capacity("chat")
+        tokens = await llm_service.stream_answer(request.transcript_context, request.user_query, request.utterances)
+    except ValueError as ve:
+        logger.warning(f"Chat validation error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except LLMOverloadedError as oe:
+        logger.warning(f"Chat rejected by the LLM scheduler: {oe}")
+        raise _overloaded(oe)
+    except ConnectionError as ce:
+        logger.error(f"Chat connection error: {ce}")
+        raise HTTPException(status_code=503, detail=str(ce))
+    return _sse_response(tokens)
+
+
+@router.post(
+    "/chat/sessions",
+    response_model=ChatSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Open Chat Session",
+    description="Opens a server-side chat session on a stored transcript (by `transcript_id`) or on the given transcript context. "
+                "Later turns send only the question; the server keeps the transcript index and the conversation history.",
+    tags=["LLM Features"],
+)
+async def open_chat_session_endpoint(request: ChatSessionRequest):
+    try:
+        session = await chat_sessions.create_session(request.transcript_id, request.transcript_context, request.utterances)
+    except ValueError as ve:
+        logger.warning(f"Chat session validation error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Transcript not found: {request.transcript_id}")
+    return session.describe()
+
+
+def _session(session_id: str) -> ChatSession:
+    session = chat_sessions.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Chat session not found or expired: {session_id}")
+    return session
+
+
+@router.get(
+    "/chat/sessions/{session_id}",
+    response_model=ChatSessionResponse,
+    summary="Get Chat Session",
+    description="Returns a chat session's transcript id and how many turns it holds verbatim and summarized.",
+    tags=["LLM Features"],
+)
+async def get_chat_session_endpoint(session_id: str):
+    return _session(session_id).describe()
+
+
+@router.delete(
+    "/chat/sessions/{session_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Close Chat Session",
+    description="Drops a chat session and its history. Idle sessions also expire after `CHAT_SESSION_TTL_SECONDS`.",
+    tags=["LLM Features"],
+)
+async def close_chat_session_endpoint(session_id: str):
+    if not chat_sessions.delete_session(session_id):
+        raise HTTPException(status_code=404, detail=f"Chat session not found or expired: {session_id}")
+
+
+@router.post(
+    "/chat/sessions/{session_id}",
+    response_model=ChatResponse,
+    summary="Ask in Chat Session",
+    description="Answers the next question of a chat session, with the earlier conversation as context for follow-ups.",
+    tags=["LLM Features"],
+    dependencies=[Depends(check_llm_availability)]
+)
+async def session_chat_endpoint(session_id: str, request: ChatSessionQuery):
+    session = _session(session_id)
+    if not request.user_query.strip():
+        raise HTTPException(status_code=400, detail="User query is required.")
+    try:
+        logger.info(f"Received chat query in session {session_id}: '{request.user_query[:50]}...'")
+        return await llm_service.answer_session_query(session, request.user_query)
+    except ValueError as ve:
+        logger.warning(f"Session chat validation error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except LLMOverloadedError as oe:
+        logger.warning(f"Session chat rejected by the LLM scheduler: {oe}")
+        raise _overloaded(oe)
+    except ConnectionError as ce:
+        logger.error(f"Session chat connection error: {ce}")
+        raise HTTPException(status_code=503, detail=str(ce))
+    except RuntimeError as re:
+        logger.error(f"Session chat runtime error: {re}")
+        raise HTTPException(status_code=500, detail=str(re))
+    except Exception as e:
+        logger.exception("Unhandled exception during session chat")
+        raise HTTPException(status_code=500, detail="An internal server error occurred during chat.")
+
+
+@router.post(
+    "/chat/sessions/{session_id}/stream",
+    summary="Stream Answer in Chat Session",
+    description="Answers the next question of a chat session and streams the answer as Server-Sent Events. "
+                "Each `data` event carries a JSON object with a `token`; the stream ends with a `done` or `error` event.",
+    tags=["LLM Features"],
+    dependencies=[Depends(check_llm_availability)]
+)
+async def session_chat_stream_endpoint(session_id: str, request: ChatSessionQuery):
+    session = _session(session_id)
+    if not request.user_query.strip():
+        raise HTTPException(status_code=400, detail="User query is required.")
+    logger.info(f"Received streamed chat query in session {session_id}: '{request.user_query[:50]}...'")
+    try:
+        llm_service.check_capacity("chat")
+        tokens = await llm_service.stream_session_answer(session, request.user_query)
+    except ValueError as ve:
+        logger.warning(f"Session chat validation error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except LLMOverloadedError as oe:
+        logger.warning(f"Session chat rejected by the LLM scheduler: {oe}")
+        raise _overloaded(oe)
+    except ConnectionError as ce:
+        logger.error(f"Session chat connection error: {ce}")
+        raise HTTPException(status_code=503, detail=str(ce))
+    return _sse_response(tokens)
+
+
+@router.post(
+    "/chat/corpus",
+    response_model=CorpusChatResponse,
+    summary="Chat across Stored Meetings",
+    description="Answers a user's question from the most relevant passages of all stored transcripts, or of the selected ones, "
+                "citing meeting ids and timestamps. The prompt has a fixed token budget however many meetings are stored.",
+    tags=["LLM Features"],
+    dependencies=[Depends(check_llm_availability)]
+)
+async def corpus_chat_endpoint(request: CorpusChatRequest):
+    if not request.user_query.strip():
+        raise HTTPException(status_code=400, detail="User query is required.")
+    try:
+        logger.info(f"Received corpus chat query: '{request.user_query[:50]}...'")
+        result = await llm_service.answer_corpus_query(request.user_query, request.transcript_ids, request.recent_meetings)
+        return result
+    except ValueError as ve:
+        logger.warning(f"Corpus chat validation error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except LLMOverloadedError as oe:
+        logger.warning(f"Corpus chat rejected by the LLM scheduler: {oe}")
+        raise _overloaded(oe)
+    except ConnectionError as ce:
+        logger.error(f"Corpus chat connection error: {ce}")
+        raise HTTPException(status_code=503, detail=str(ce))
+    except RuntimeError as re:
+        logger.error(f"Corpus chat runtime error: {re}")
+        raise HTTPException(status_code=500, detail=str(re))
+    except Exception as e:
+        logger.exception("Unhandled exception during corpus chat")
+        raise HTTPException(status_code=500, detail="An internal server error occurred during corpus chat.")
+
+
+@router.get(
+    "/cache/stats",
+    response_model=TieredCacheStatsResponse,
+    summary="LLM Cache Statistics",
+    description="Returns hit/miss counters and size of the in-process and on-disk LLM response cache tiers.",
+    tags=["LLM Features"],
+)
+async def llm_cache_stats_endpoint():
+    stats = llm_service.get_cache_stats()
+    if stats is None:
+        raise HTTPException(status_code=404, detail="LLM response cache is disabled.")
+    return stats
@@ -1,9 +1,15 @@
 # src/api/endpoints/transcription.py
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request, status
 
-from src.schemas.transcription import TranscriptionResponse
-from src.services.transcription_service import process_audio_file
-from src.core.config import logger
+from src.schemas.cache import CacheStatsResponse
+from src.schemas.transcription import TranscriptionJobResponse
+from src.services.transcription_service import (
+    submit_transcription_job,
+    submit_transcription_stream,
+    get_transcription_job,
+    get_transcript_cache_stats,
+)
+from src.core.config import settings, logger
 
 router = APIRouter()
 
@@ -19,6 +25,8 @@ ACCEPTED_MEDIA_TYPES = [
     "video/webm", # .webm (AssemblyAI can extract audio)
     "video/quicktime", # .mov
     "video/x-matroska", # .mkv
+    "audio/flac", # .flac
+    "audio/x-flac", # .flac
 ]
 
 # More direct attempt via simple description often used:
@@ -27,18 +35,19 @@ openapi_file_description = f"The audio/video file to transcribe. Accepted types:
 
 @router.post(
     "/transcribe",
-    response_model=TranscriptionResponse,
+    response_model=TranscriptionJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Transcribe Audio File",
     description="Upload an audio/video file to transcribe it using AssemblyAI. "
-                "Returns the transcript text, detected language, and speaker-separated utterances.",
+                "Returns a job ID immediately; poll /transcriptions/{job_id} for the transcript text, "
+                "detected language, and speaker-separated utterances.",
     tags=["Transcription"],
 )
 async def transcribe_audio_endpoint(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description=openapi_file_description)
 ):
     """
-    Endpoint to receive an audio file and initiate transcription.
+    Endpoint to receive an audio file and queue it for transcription.
     """
     if not file:
         raise HTTPException(status_code=400, detail="No file provided.")
@@ -54,13 +63,71 @@ async def transcribe_audio_endpoint(
     logger.info(f"Received file for transcription: {file.filename}, type: {file.content_type}")
 
     try:
-        result = await process_audio_file(file, background_tasks)
-        if result.status == 'error':
-            raise HTTPException(status_code=422, detail=f"Transcription failed: {result.error}")
-        return result
+        return await submit_transcription_job(file)
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
         logger.exception(f"Unhandled exception in /transcribe endpoint for file {file.filename}")
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
 
+
+@router.post(
+    "/transcribe/stream",
+    response_model=TranscriptionJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Transcribe Streamed Audio",
+    description="Upload an audio/video file as the raw request body (not multipart), with its MIME type as the Content-Type. "
+                "The body is streamed to disk as it arrives and rejected as soon as it exceeds the maximum upload size. "
+                "Returns a job ID immediately; poll /transcriptions/{job_id} for the result.",
+    tags=["Transcription"],
+)
+async def transcribe_stream_endpoint(
+    request: Request,
+    filename: str = Query("audio", description="Original file name, used for its extension.")
+):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in ACCEPTED_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=415, # Unsupported Media Type
+            detail=f"Unsupported file type: {content_type}. Allowed: {', '.join(ACCEPTED_MEDIA_TYPES)}"
+        )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds the maximum upload size of {settings.MAX_UPLOAD_BYTES} bytes.")
+
+    logger.info(f"Receiving streamed file for transcription: {filename}, type: {content_type}")
+
+    try:
+        return await submit_transcription_stream(request.stream(), filename)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.exception(f"Unhandled exception in /transcribe/stream endpoint for file {filename}")
+        raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
+
+@router.get(
+    "/transcriptions/cache/stats",
+    response_model=CacheStatsResponse,
+    summary="Transcript Cache Statistics",
+    description="Returns hit/miss counters and size of the transcript cache keyed by audio hash.",
+    tags=["Transcription"],
+)
+async def transcript_cache_stats_endpoint():
+    stats = get_transcript_cache_stats()
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Transcript cache is disabled.")
+    return stats
+
+
+@router.get(
+    "/transcriptions/{job_id}",
+    response_model=TranscriptionJobResponse,
+    summary="Get Transcription Job",
+    description="Returns the status of a transcription job and, once completed, its transcription result.",
+    tags=["Transcription"],
+)
+async def get_transcription_job_endpoint(job_id: str):
+    job = get_transcription_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Transcription job not found: {job_id}")
+    return job
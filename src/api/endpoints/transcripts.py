@@ -0,0 +1,108 @@
+# src/api/endpoints/transcripts.py
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from src.schemas.transcription import (
+    SearchResponse,
+    StoredTranscript,
+    TranscriptListResponse,
+    UtterancePage,
+)
+from src.services.transcript_store import TranscriptStore, get_transcript_store
+from src.core.config import logger
+
+router = APIRouter()
+
+
+async def _store() -> TranscriptStore:
+    store = await asyncio.to_thread(get_transcript_store)
+    if store is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Transcript store is disabled. Set TRANSCRIPT_STORE_PATH.",
+        )
+    return store
+
+
+@router.get(
+    "/transcripts",
+    response_model=TranscriptListResponse,
+    summary="List Stored Transcripts",
+    description="Lists completed transcripts in the transcript store, newest first, without their text.",
+    tags=["Transcripts"],
+)
+async def list_transcripts_endpoint(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    store = await _store()
+    return await asyncio.to_thread(store.list, offset, limit)
+
+
+@router.get(
+    "/transcripts/{transcript_id}",
+    response_model=StoredTranscript,
+    summary="Get Stored Transcript",
+    description="Returns a stored transcript with its full text. Utterances are served by `/transcripts/{transcript_id}/utterances`.",
+    tags=["Transcripts"],
+)
+async def get_transcript_endpoint(transcript_id: str):
+    store = await _store()
+    transcript = await asyncio.to_thread(store.get, transcript_id)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail=f"Transcript not found: {transcript_id}")
+    return transcript
+
+
+@router.get(
+    "/transcripts/{transcript_id}/utterances",
+    response_model=UtterancePage,
+    summary="Get Transcript Utterances",
+    description="Returns a page of the speaker-labelled utterances of a stored transcript, in order.",
+    tags=["Transcripts"],
+)
+async def get_transcript_utterances_endpoint(
+    transcript_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    store = await _store()
+    page = await asyncio.to_thread(store.get_utterances, transcript_id, offset, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail=f"Transcript not found: {transcript_id}")
+    return page
+
+
+@router.delete(
+    "/transcripts/{transcript_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete Stored Transcript",
+    description="Removes a transcript and its utterances from the store and the search index.",
+    tags=["Transcripts"],
+)
+async def delete_transcript_endpoint(transcript_id: str):
+    store = await _store()
+    if not await asyncio.to_thread(store.delete, transcript_id):
+        raise HTTPException(status_code=404, detail=f"Transcript not found: {transcript_id}")
+
+
+@router.get(
+    "/search",
+    response_model=SearchResponse,
+    summary="Search Transcripts",
+    description="Full-text search over the utterances of all stored transcripts, ranked by BM25. "
+                "Pass `transcript_id` to search one meeting, and `match=any` to match utterances containing any of the terms.",
+    tags=["Transcripts"],
+)
+async def search_endpoint(
+    q: str = Query(..., min_length=1, description="Search terms"),
+    transcript_id: Optional[str] = Query(None),
+    match: str = Query("all", pattern="^(all|any)$"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+):
+    store = await _store()
+    logger.info(f"Searching transcripts for: '{q[:50]}'")
+    return await asyncio.to_thread(store.search, q, offset, limit, transcript_id, match == "all")
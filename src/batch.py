@@ -0,0 +1,188 @@
+# src/batch.py
+"""
+Batch processing of a directory of recordings. Each file is transcribed and,
+unless --transcribe-only is given, summarized with its action items. One JSON
+line per file is appended to the output:
+
+    python -m src.batch /data/meetings --output meetings.jsonl --concurrency 4
+
+The output doubles as the checkpoint: rerunning the same command skips files
+already recorded as completed (matched by relative path, size and modification
+time) and retries failed ones. Throughput is reported in files/hour.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from src.core.config import settings, logger
+from src.services import llm_service, transcription_service
+
+MEDIA_EXTENSIONS = {".mp3", ".wav", ".m4a", ".ogg", ".mp4", ".webm", ".mov", ".flac", ".mkv"}
+
+
+class BatchFile(NamedTuple):
+    path: str
+    relative_path: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def checkpoint_key(self) -> str:
+        return f"{self.relative_path}:{self.size}:{self.mtime_ns}"
+
+
+def find_recordings(root: str, extensions: Set[str], recursive: bool = True) -> List[BatchFile]:
+    """Lists the media files under root in a stable order."""
+    files = []
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        if not recursive:
+            subdirectories.clear()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() not in extensions:
+                continue
+            path = os.path.join(directory, filename)
+            stat = os.stat(path)
+            files.append(BatchFile(path, os.path.relpath(path, root), stat.st_size, stat.st_mtime_ns))
+    return files
+
+
+def load_checkpoint(output_path: str) -> Set[str]:
+    """Returns the checkpoint keys of files already completed in a previous run."""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue # A line cut short by an interrupted run
+            if record.get("status") == "completed":
+                completed.add(record["checkpoint_key"])
+    return completed
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(settings.UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def process_file(item: BatchFile, transcribe_only: bool) -> dict:
+    """Transcribes one file and generates its notes. Failures are recorded, not raised."""
+    started = time.perf_counter()
+    record = {
+        "file": item.relative_path,
+        "checkpoint_key": item.checkpoint_key,
+        "size": item.size,
+        "status": "completed",
+    }
+    try:
+        audio_hash = await asyncio.to_thread(hash_file, item.path)
+        transcript = transcription_service.get_cached_transcript(audio_hash)
+        record["transcript_cached"] = transcript is not None
+        if transcript is None:
+            transcript = await transcription_service.transcribe_and_cache(item.path, audio_hash)
+        record["transcript"] = transcript.model_dump()
+        if transcript.error:
+            raise RuntimeError(f"Transcription failed: {transcript.error}")
+        await transcription_service.save_to_store(transcript, item.relative_path)
+
+        if not transcribe_only and transcript.text:
+            notes = await llm_service.generate_notes(transcript.text, transcript.utterances)
+            record["notes"] = notes.model_dump()
+    except Exception as e:
+        logger.error(f"Batch processing failed for {item.relative_path}: {e}")
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+async def run_batch(
+    files: List[BatchFile],
+    output_path: str,
+    concurrency: int,
+    transcribe_only: bool = False,
+) -> Dict[str, float]:
+    """Processes files with bounded concurrency, appending one JSON line per finished file."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started = time.perf_counter()
+    counts = {"completed": 0, "error": 0}
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        async def worker(item: BatchFile):
+            async with semaphore:
+                record = await process_file(item, transcribe_only)
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            counts[record["status"]] += 1
+            done = counts["completed"] + counts["error"]
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"[{done}/{len(files)}] {item.relative_path}: {record['status']} in {record['elapsed_seconds']:.1f} s "
+                f"({done / elapsed * 3600:.1f} files/hour)"
+            )
+
+        await asyncio.gather(*(worker(item) for item in files))
+
+    elapsed = time.perf_counter() - started
+    processed = counts["completed"] + counts["error"]
+    return {
+        **counts,
+        "elapsed_seconds": elapsed,
+        "files_per_hour": processed / elapsed * 3600 if elapsed else 0.0,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input_dir", help="Directory of recordings.")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file to append results to; also the checkpoint.")
+    parser.add_argument("--concurrency", type=int, default=settings.TRANSCRIPTION_MAX_WORKERS, help="Files processed at once.")
+    parser.add_argument("--transcribe-only", action="store_true", help="Skip the summary and action items.")
+    parser.add_argument("--no-recursive", action="store_true", help="Do not descend into subdirectories.")
+    parser.add_argument("--extensions", default=",".join(sorted(MEDIA_EXTENSIONS)), help="Comma-separated file extensions to process.")
+    parser.add_argument("--limit", type=int, default=0, help="Process at most N pending files (0 = all).")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if not os.path.isdir(args.input_dir):
+        sys.exit(f"Not a directory: {args.input_dir}")
+    if not transcription_service.transcription_available():
+        sys.exit("Transcription is unavailable: set ASSEMBLYAI_API_KEY or ASR_PROVIDER=stub.")
+    if not args.transcribe_only and llm_service.get_llm() is None:
+        sys.exit("The LLM is unavailable: set GROQ_API_KEY or LLM_PROVIDER=stub, or pass --transcribe-only.")
+
+    extensions = {ext.strip().lower() if ext.strip().startswith(".") else f".{ext.strip().lower()}"
+                  for ext in args.extensions.split(",") if ext.strip()}
+    files = find_recordings(args.input_dir, extensions, recursive=not args.no_recursive)
+    completed = load_checkpoint(args.output)
+    pending = [item for item in files if item.checkpoint_key not in completed]
+    logger.info(f"Found {len(files)} recordings, {len(files) - len(pending)} already completed, {len(pending)} pending")
+    if args.limit:
+        pending = pending[:args.limit]
+    if not pending:
+        return
+
+    results = asyncio.run(run_batch(pending, args.output, args.concurrency, args.transcribe_only))
+    print(
+        f"Processed {results['completed'] + results['error']} files ({results['error']} failed) "
+        f"in {results['elapsed_seconds']:.1f} s: {results['files_per_hour']:.1f} files/hour"
+    )
+    if results["error"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
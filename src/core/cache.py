@@ -0,0 +1,199 @@
+# src/core/cache.py
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from src.core.config import logger
+
+
+class MemoryCache:
+    """In-process string key/value cache with size-based LRU eviction and an optional TTL."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached value, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and time.time() - entry[2] > self.ttl_seconds:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: str):
+        """Stores a value and evicts least recently used entries beyond max_bytes."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.time())
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.size_bytes -= size
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class SQLiteCache:
+    """
+    Persistent string key/value cache in a local SQLite file with size-based LRU
+    eviction and an optional TTL. Safe to share between threads and processes.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)")
+        logger.info(f"SQLite cache ready at {path} (max {max_bytes} bytes)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Opens a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached value, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """Stores a value and evicts least recently used entries beyond max_bytes."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {size} byte entry larger than cache limit of {self.max_bytes} bytes")
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = 0
+            for old_key, old_size in conn.execute("SELECT key, size FROM cache ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM cache WHERE key = ?", (old_key,))
+                total -= old_size
+                evicted += 1
+            logger.info(f"Evicted {evicted} entries from cache {self.path}")
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and current size."""
+        with self._lock, self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class TieredCache:
+    """
+    Two-level cache: a per-process MemoryCache in front of an optional SQLiteCache
+    shared by every worker on the host. Disk hits are promoted to memory.
+    """
+
+    def __init__(self, memory: MemoryCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        try:
+            value = self.disk.get(key)
+        except Exception as e:
+            logger.error(f"Disk cache lookup failed: {e}")
+            return None
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: str):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except Exception as e:
+                logger.error(f"Disk cache write failed: {e}")
+
+    def stats(self) -> dict:
+        """Returns per-tier statistics."""
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
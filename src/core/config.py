@@ -11,12 +11,103 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str = ""
     GROQ_MODEL_NAME: str = "llama-3.3-70b-versatile"
 
+    # Providers: "assemblyai"/"groq", or "stub" for local stand-ins that need no keys or network
+    ASR_PROVIDER: str = "assemblyai"
+    LLM_PROVIDER: str = "groq"
+    STUB_ASR_LATENCY_MS: int = 2000
+    STUB_LLM_LATENCY_MS: int = 500
+    STUB_JITTER_MS: int = 100
+    STUB_FAILURE_RATE: float = 0.0 # Probability that a stub call raises
+    STUB_REALTIME_UTTERANCE_MS: int = 3000 # Audio per final utterance from the stub real-time ASR
+
     # LangChain specific settings (optional, for text splitting)
     CHUNK_SIZE: int = 4000
     CHUNK_OVERLAP: int = 200
+    SUMMARY_MAX_CONCURRENCY: int = 4 # Max concurrent LLM calls when summarizing chunks
+    SUMMARY_MAX_REDUCE_ROUNDS: int = 10 # Partial summaries still over CHUNK_SIZE after this many rounds are truncated to fit
+    SUMMARY_EXTRACTIVE_MAX_TOKENS: int = 400 # Length of the local extractive summary (mode=extractive)
+    SUMMARY_PROMPT_MAX_TOKENS: int = 0 # Longer transcripts are cut to their most informative utterances locally before summarization (0 = off)
+    ACTION_ITEMS_PREFILTER_MIN_TOKENS: int = 2000 # Longer transcripts send only likely action item utterances to the LLM (0 = off)
+    ACTION_ITEMS_CONTEXT_RADIUS: int = 1 # Neighbouring utterances kept around each candidate
+
+    # Prompt budgets, checked with a local token count before each call
+    TOKEN_COUNTER: str = "auto" # "auto" uses tiktoken when installed, "heuristic" never does
+    TOKEN_ENCODING: str = "cl100k_base"
+    SUMMARY_PROMPT_BUDGET_TOKENS: int = 6000 # Longer transcripts are summarized map-reduce in CHUNK_SIZE chunks
+    ACTION_ITEMS_PROMPT_BUDGET_TOKENS: int = 6000 # Longer inputs are split and extracted per chunk
+    CHAT_PROMPT_BUDGET_TOKENS: int = 4000 # Retrieved passages are trimmed to fit; longer questions are rejected
+    LLM_MAX_REQUEST_TOKENS: int = 0 # Inputs larger than this are rejected with 400 before any call (0 = no limit)
+
+    # Outbound LLM scheduling, shared by all requests of a process
+    LLM_MAX_CONCURRENCY: int = 8 # Max LLM calls in flight
+    LLM_TOKENS_PER_MINUTE: int = 0 # Provider token budget; 0 disables it
+    LLM_COMPLETION_TOKENS_ESTIMATE: int = 512 # Tokens reserved per call for the completion
+    LLM_INTERACTIVE_MAX_WAIT_SECONDS: float = 10.0 # Chat calls expected to wait longer are rejected with 429
+    LLM_BULK_MAX_WAIT_SECONDS: float = 120.0 # Same for summaries and action items
+    LLM_RETRIES: int = 3 # Retries of rate-limited, timed-out and 5xx calls
+    LLM_BACKOFF_BASE_SECONDS: float = 0.5
+    LLM_BACKOFF_MAX_SECONDS: float = 20.0
+    LLM_BREAKER_FAILURES: int = 5 # Consecutive failed calls that open the circuit
+    LLM_BREAKER_RESET_SECONDS: float = 30.0 # How long the circuit stays open before a trial call
+
+    # Chat retrieval
+    CHAT_TOP_K: int = 12 # Number of transcript passages sent with each chat question
+    CHAT_FULL_CONTEXT_MAX_CHARS: int = 6000 # Shorter transcripts are sent in full
+    CHAT_INDEX_CACHE_SIZE: int = 64 # Number of transcript indexes kept in memory
+
+    # Server-side chat sessions
+    CHAT_SESSION_MAX_SESSIONS: int = 500 # Least recently used sessions are dropped beyond this
+    CHAT_SESSION_TTL_SECONDS: int = 3600 # Idle sessions expire after this
+    CHAT_SESSION_HISTORY_TOKENS: int = 1000 # Older turns are compacted into a summary above this
+    CHAT_SESSION_KEEP_TURNS: int = 2 # Most recent turns always sent verbatim
+
+    # Chat across all stored meetings
+    CORPUS_CHAT_MAX_CONTEXT_TOKENS: int = 3000 # Fixed prompt budget for retrieved passages, whatever the corpus size
+    CORPUS_CHAT_MAX_HITS: int = 50 # Best-matching utterances considered per question
+    CORPUS_CHAT_WINDOW: int = 2 # Utterances of context kept on each side of a hit
+    CORPUS_CHAT_MAX_TERM_FREQUENCY: float = 0.05 # Question words in more utterances than this are ignored
+
+    # LLM response cache (the on-disk tier is shared by all workers; set the path to "" to disable it)
+    LLM_CACHE_ENABLED: bool = True # Also keeps map-reduce chunk summaries, so an edited transcript only re-sends the changed chunks
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_DISK_PATH: str = "/tmp/polynote_cache/llm.sqlite3"
+    LLM_CACHE_DISK_MAX_BYTES: int = 256 * 1024 * 1024
 
     # Temporary directory for uploads (using /tmp in serverless environment)
     UPLOAD_DIR: str = "/tmp/audio_uploads"
+    MAX_UPLOAD_BYTES: int = 2 * 1024 * 1024 * 1024 # Uploads beyond this are rejected with 413
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024 # Uploads are written to disk in chunks of this size
+
+    # Background transcription jobs
+    TRANSCRIPTION_MAX_WORKERS: int = 4 # Max concurrent blocking AssemblyAI calls
+    TRANSCRIPTION_JOB_TTL_SECONDS: int = 3600 # How long finished jobs stay retrievable
+    PRECOMPUTE_ON_TRANSCRIPT: bool = False # Generate notes and the chat index in the background as soon as a job completes
+
+    # Searchable store of completed transcripts (set the path to "" to disable)
+    TRANSCRIPT_STORE_PATH: str = "/tmp/polynote_data/transcripts.sqlite3"
+
+    # Live meetings over WebSocket (raw 16-bit mono PCM frames)
+    LIVE_SAMPLE_RATE: int = 16000
+    LIVE_SUMMARY_EVERY_N_UTTERANCES: int = 10 # Rolling summary is updated after this many new final utterances (0 = off)
+
+    # Audio pre-processing before upload (requires ffmpeg; skipped when it is missing)
+    AUDIO_PREPROCESS: bool = True # Demux, downmix to mono 16 kHz and re-encode as Opus
+    AUDIO_TRIM_SILENCE: bool = False # Also trim leading and trailing silence
+    AUDIO_SILENCE_THRESHOLD_DB: int = -50
+    AUDIO_PREPROCESS_WORKERS: int = 2
+
+    # Segmented transcription of long recordings (requires ffmpeg/ffprobe)
+    TRANSCRIPTION_SEGMENTED: bool = False
+    TRANSCRIPTION_SEGMENT_MIN_SECONDS: int = 1800 # Only recordings longer than this are split
+    TRANSCRIPTION_SEGMENT_SECONDS: int = 600
+    TRANSCRIPTION_SEGMENT_OVERLAP_SECONDS: int = 15
+    TRANSCRIPTION_SEGMENT_CONCURRENCY: int = 4 # Max segments of one recording in flight
+    TRANSCRIPTION_SEGMENT_RETRIES: int = 2 # Retries per failed segment
+
+    # Transcript cache keyed by audio hash, ASR provider and audio processing settings (set the path to "" to disable)
+    TRANSCRIPT_CACHE_PATH: str = "/tmp/polynote_cache/transcripts.sqlite3"
+    TRANSCRIPT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
 
     class Config:
         case_sensitive = True
@@ -29,16 +120,9 @@ settings = Settings()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create upload directory only if we're not in a serverless environment
-if not os.getenv("VERCEL"):
-    try:
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    except Exception as e:
-        logger.warning(f"Could not create upload directory: {e}")
-
 logger.info("Settings loaded.")
-if not settings.ASSEMBLYAI_API_KEY:
+if not settings.ASSEMBLYAI_API_KEY and settings.ASR_PROVIDER == "assemblyai":
     logger.warning("ASSEMBLYAI_API_KEY is not set in the environment variables or .env file!")
-if not settings.GROQ_API_KEY:
+if not settings.GROQ_API_KEY and settings.LLM_PROVIDER == "groq":
     logger.warning("GROQ_API_KEY is not set in the environment variables or .env file!")
 
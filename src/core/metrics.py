@@ -0,0 +1,113 @@
+# src/core/metrics.py
+from typing import Callable, Dict, Optional
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Buckets sized for provider calls that take from milliseconds to many minutes
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1200, 2400)
+
+REQUEST_LATENCY = Histogram(
+    "polynote_http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+ASR_LATENCY = Histogram(
+    "polynote_asr_transcription_seconds",
+    "AssemblyAI submit-to-complete time per transcribed file or segment.",
+    ["outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_LATENCY = Histogram(
+    "polynote_llm_call_duration_seconds",
+    "Groq call latency by chain.",
+    ["chain"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "polynote_llm_tokens_total",
+    "Tokens sent to and received from the LLM by chain.",
+    ["chain", "kind"],
+)
+LLM_ERRORS = Counter(
+    "polynote_llm_errors_total",
+    "Failed LLM calls by chain.",
+    ["chain"],
+)
+LLM_IN_FLIGHT = Gauge(
+    "polynote_llm_calls_in_flight",
+    "LLM calls currently awaiting a response.",
+    ["chain"],
+)
+LLM_QUEUE_WAIT = Histogram(
+    "polynote_llm_queue_wait_seconds",
+    "Time LLM calls waited for a concurrency slot and token budget.",
+    ["provider", "priority"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_REJECTIONS = Counter(
+    "polynote_llm_rejections_total",
+    "LLM calls rejected by the scheduler without reaching the provider.",
+    ["provider", "reason"],
+)
+LLM_RETRIES = Counter(
+    "polynote_llm_retries_total",
+    "LLM calls retried after a transient provider error.",
+    ["provider"],
+)
+LLM_CIRCUIT_OPEN = Gauge(
+    "polynote_llm_circuit_open",
+    "1 while the circuit breaker for the LLM provider is open.",
+    ["provider"],
+)
+COALESCED_CALLS = Counter(
+    "polynote_coalesced_calls_total",
+    "Calls by whether they did the work (leader) or joined an identical call in flight (follower).",
+    ["operation", "role"],
+)
+TRANSCRIPTION_JOBS = Gauge(
+    "polynote_transcription_jobs",
+    "Transcription jobs that have not finished, by state.",
+    ["state"],
+)
+PRECOMPUTE_RUNS = Counter(
+    "polynote_precompute_total",
+    "Speculative notes generations started when a transcript completed, by outcome.",
+    ["outcome"],
+)
+AUDIO_BYTES_SAVED = Counter(
+    "polynote_audio_preprocess_bytes_saved_total",
+    "Upload bytes saved by audio pre-processing.",
+)
+
+
+class CacheStatsCollector:
+    """Exposes the stats() of registered caches as hit/miss counters and size gauges at scrape time."""
+
+    def __init__(self):
+        self.caches: Dict[str, Callable[[], Optional[dict]]] = {}
+
+    def collect(self):
+        hits = CounterMetricFamily("polynote_cache_hits", "Cache hits.", labels=["cache"])
+        misses = CounterMetricFamily("polynote_cache_misses", "Cache misses.", labels=["cache"])
+        ratio = GaugeMetricFamily("polynote_cache_hit_ratio", "Cache hit ratio since start.", labels=["cache"])
+        size = GaugeMetricFamily("polynote_cache_size_bytes", "Bytes stored in the cache.", labels=["cache"])
+        for name, get_stats in self.caches.items():
+            stats = get_stats()
+            if not stats:
+                continue
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            ratio.add_metric([name], stats["hit_ratio"])
+            size.add_metric([name], stats["size_bytes"])
+        yield from (hits, misses, ratio, size)
+
+
+_cache_collector = CacheStatsCollector()
+REGISTRY.register(_cache_collector)
+
+
+def register_cache(name: str, stats: Callable[[], Optional[dict]]):
+    """Adds a cache to the /metrics output; stats() may return None when it is disabled."""
+    _cache_collector.caches[name] = stats
@@ -0,0 +1,52 @@
+# src/core/registry.py
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from src.core.config import logger
+
+
+class ServiceRegistry:
+    """
+    Builds shared services (provider clients, prompt templates, caches) on first
+    use instead of at import, so startup stays fast and a misconfigured provider
+    only affects the endpoints that need it.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """Registers the factory for a service. The factory runs once, on first get()."""
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        """Returns the service, building it on first use."""
+        if name in self._instances:
+            return self._instances[name]
+        with self._lock:
+            if name not in self._instances:
+                logger.info(f"Initializing service: {name}")
+                self._instances[name] = self._factories[name]()
+            return self._instances[name]
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Returns the service if it has been built, without building it."""
+        return self._instances.get(name)
+
+    def override(self, name: str, instance: Any):
+        """Replaces a service instance, e.g. with a stand-in for tests or benchmarks."""
+        with self._lock:
+            self._instances[name] = instance
+
+    def reset(self, name: Optional[str] = None):
+        """Drops built instances so they are rebuilt on next use."""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+
+registry = ServiceRegistry()
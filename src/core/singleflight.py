@@ -0,0 +1,48 @@
+# src/core/singleflight.py
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+from src.core.config import logger
+from src.core.metrics import COALESCED_CALLS
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls with the same key: the first caller starts the
+    work and later callers await the same in-flight task instead of repeating it.
+    The work runs as its own task, so a caller that disconnects does not cancel
+    it for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    def join(self, key: str) -> Optional[Awaitable[T]]:
+        """Returns an awaitable for the call in flight with this key, or None if there is none."""
+        task = self._in_flight.get(key)
+        if task is None:
+            return None
+        COALESCED_CALLS.labels(self.name, "follower").inc()
+        return asyncio.shield(task)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Returns fn()'s result, sharing one call among concurrent callers with the same key."""
+        task = self._in_flight.get(key)
+        if task is None:
+            COALESCED_CALLS.labels(self.name, "leader").inc()
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            COALESCED_CALLS.labels(self.name, "follower").inc()
+            logger.info(f"Coalesced {self.name} call with one already in flight")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception() # Retrieved here so an error nobody awaited is not logged as unhandled
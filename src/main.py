@@ -1,11 +1,15 @@
 # src/main.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import os
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+import time
 
 from src.core.config import settings, logger
+from src.core.metrics import REQUEST_LATENCY
 from src.api.endpoints import transcription
+from src.api.endpoints import transcripts
+from src.api.endpoints import live
 from src.api.endpoints import llm as llm_router
 
 app = FastAPI(
@@ -25,8 +29,38 @@ app.add_middleware(
 )
 logger.info("CORS middleware added with permissive settings for development.")
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Records request latency per route template (not per raw path, to bound label cardinality)."""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status_code),
+        ).observe(time.perf_counter() - started)
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Rejects oversized requests from their Content-Length before the body is read."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body exceeds the maximum upload size of {settings.MAX_UPLOAD_BYTES} bytes."}
+        )
+    return await call_next(request)
+
 # Include API routers
 app.include_router(transcription.router, prefix=settings.API_V1_STR)
+app.include_router(transcripts.router, prefix=settings.API_V1_STR)
+app.include_router(live.router, prefix=settings.API_V1_STR)
 app.include_router(llm_router.router, prefix=f"{settings.API_V1_STR}/llm")
 
 @app.get("/", tags=["Health"])
@@ -40,6 +74,11 @@ async def ping():
     logger.info("Ping endpoint called")
     return {"message": "pong"}
 
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """Prometheus metrics: request and provider latency, token usage, cache and job counters."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for all unhandled exceptions."""
@@ -49,9 +88,6 @@ async def global_exception_handler(request, exc):
         content={"detail": "Internal server error. Please try again later."}
     )
 
-# Create upload directory if it doesn't exist
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-
 if __name__ == "__main__":
     import uvicorn
     logger.info("Starting Uvicorn server directly (for debugging)...")
@@ -0,0 +1,17 @@
+# src/schemas/cache.py
+from pydantic import BaseModel
+from typing import Optional
+
+class CacheStatsResponse(BaseModel):
+    """Response schema for cache statistics."""
+    hits: int # Lookups served from the cache since process start
+    misses: int # Lookups that had to go to the provider
+    hit_ratio: float
+    entries: int # Entries currently stored
+    size_bytes: int # Bytes currently stored
+    max_bytes: int # Size limit before LRU eviction
+
+class TieredCacheStatsResponse(BaseModel):
+    """Response schema for a cache with an in-process and an optional shared on-disk tier."""
+    memory: CacheStatsResponse
+    disk: Optional[CacheStatsResponse] = None # None when the on-disk tier is disabled
@@ -1,25 +1,80 @@
 # src/schemas/llm.py
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
+
+from src.schemas.transcription import Utterance
 
 # Request Schemas
 class LLMRequestBase(BaseModel):
     """Base request needing transcript text."""
     transcript: str = Field(..., description="The full transcript text.")
+    utterances: Optional[List[Utterance]] = Field(None, description="Speaker-separated utterances, used to split long transcripts on utterance boundaries.")
 
 # Response Schemas 
-class SummarizationResponse(BaseModel):
+class PromptBudget(BaseModel):
+    """How an LLM input was routed after counting its tokens locally, before any call was made."""
+    chain: str
+    tokenizer: str = Field(..., description="'tiktoken:<encoding>' or 'heuristic'.")
+    prompt_tokens: int = Field(..., description="Tokens of a single prompt with the whole input.")
+    budget_tokens: int = Field(..., description="Per-call prompt budget of the chain.")
+    route: str = Field(..., description="'direct', 'compress' (input reduced locally) or 'chunk' (split across calls).")
+    sent_tokens: int = Field(..., description="Input tokens actually sent, summed over chunks.")
+    chunks: int = 1
+
+class BudgetMetadata(BaseModel):
+    budgets: List[PromptBudget] = Field(default_factory=list, description="Prompt budget decisions made for this response.")
+
+class SummarizationResponse(BudgetMetadata):
     """Response schema for the summarization endpoint."""
     summary: str = Field(..., description="The generated concise summary of the meeting.")
 
-class ActionItemsResponse(BaseModel):
-    """Response schema for the action items endpoint."""
+class ActionItems(BaseModel):
+    """Action items as returned by the LLM."""
     action_items: List[str] = Field(default_factory=list, description="Action items extracted from the transcript.")
 
+class ActionItemsResponse(ActionItems, BudgetMetadata):
+    """Response schema for the action items endpoint."""
+
+class NotesResponse(SummarizationResponse, ActionItemsResponse):
+    """Response schema for the combined notes endpoint: summary plus action items."""
+    action_items_error: Optional[str] = Field(None, description="Set if action item extraction failed while the summary succeeded.")
+
 class ChatRequest(BaseModel):
     transcript_context: str = Field(..., description="The transcript context for the chat.")
     user_query: str = Field(..., description="The user's question.")
+    utterances: Optional[List[Utterance]] = Field(None, description="Speaker-separated utterances, used to retrieve timestamped passages relevant to the query.")
 
-class ChatResponse(BaseModel):
+class ChatResponse(BudgetMetadata):
     ai_response: str = Field(..., description="The AI's answer to the user's query.")
 
+class ChatSessionRequest(BaseModel):
+    transcript_id: Optional[str] = Field(None, description="Transcript to chat about; loaded from the transcript store unless transcript_context is given.")
+    transcript_context: Optional[str] = Field(None, description="The transcript text, if it is not in the transcript store.")
+    utterances: Optional[List[Utterance]] = Field(None, description="Speaker-separated utterances of transcript_context.")
+
+class ChatSessionResponse(BaseModel):
+    session_id: str
+    transcript_id: str
+    turns: int = Field(0, description="Turns kept verbatim in the session history.")
+    summarized_turns: int = Field(0, description="Earlier turns compacted into the history summary.")
+
+class ChatSessionQuery(BaseModel):
+    user_query: str = Field(..., description="The user's question.")
+
+
+class CorpusChatRequest(BaseModel):
+    user_query: str = Field(..., description="The user's question.")
+    transcript_ids: Optional[List[str]] = Field(None, description="Restrict the question to these stored transcripts.")
+    recent_meetings: Optional[int] = Field(None, ge=1, description="Restrict the question to the N most recently stored transcripts.")
+
+class CorpusCitation(BaseModel):
+    """A passage of a stored meeting that was sent to the LLM as context."""
+    transcript_id: str
+    filename: Optional[str] = None
+    start: int = Field(..., description="Start of the passage in milliseconds.")
+    end: int = Field(..., description="End of the passage in milliseconds.")
+    timestamp: str = Field(..., description="Start of the passage as MM:SS, as cited in the answer.")
+    score: float
+
+class CorpusChatResponse(ChatResponse):
+    citations: List[CorpusCitation] = Field(default_factory=list, description="Passages the answer was based on, most relevant first.")
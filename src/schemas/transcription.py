@@ -19,3 +19,74 @@ class TranscriptionResponse(BaseModel):
     utterances: Optional[List[Utterance]] = None # Speaker-separated utterances
     error: Optional[str] = None # Error message if status is 'error'
 
+
+class TranscriptionJobResponse(BaseModel):
+    """Response schema for background transcription jobs."""
+    job_id: str
+    status: str # 'queued', 'processing', 'completed', 'error'
+    filename: Optional[str] = None
+    created_at: float # Unix timestamp when the job was submitted
+    finished_at: Optional[float] = None # Unix timestamp when the job finished
+    result: Optional[TranscriptionResponse] = None # Set once the job has completed
+    cached: bool = False # True if the result was served from the transcript cache
+    error: Optional[str] = None # Error message if status is 'error'
+
+
+class StoredTranscript(BaseModel):
+    """A transcript in the transcript store."""
+    transcript_id: str
+    filename: Optional[str] = None
+    language_code: Optional[str] = None
+    created_at: float # Unix timestamp when the transcript was stored
+    duration_ms: int # End of the last utterance
+    utterance_count: int
+    text: Optional[str] = None # Full transcript text; omitted in listings
+
+
+class TranscriptListResponse(BaseModel):
+    """A page of stored transcripts, newest first."""
+    total: int
+    offset: int
+    limit: int
+    transcripts: List[StoredTranscript]
+
+
+class UtterancePage(BaseModel):
+    """A page of the utterances of a stored transcript, in order."""
+    transcript_id: str
+    total: int
+    offset: int
+    limit: int
+    utterances: List[Utterance]
+
+
+class SearchHit(BaseModel):
+    """An utterance matching a search query."""
+    transcript_id: str
+    filename: Optional[str] = None
+    language_code: Optional[str] = None
+    utterance_index: int # Position of the utterance in its transcript
+    speaker: Optional[str] = None
+    start: int # Start time in milliseconds
+    end: int # End time in milliseconds
+    text: str
+    score: float # BM25 relevance; higher is better
+
+
+class SearchResponse(BaseModel):
+    """Ranked utterances matching a query across stored transcripts."""
+    query: str
+    total: int
+    offset: int
+    limit: int
+    hits: List[SearchHit]
+
+
+class LiveMessage(BaseModel):
+    """Message sent by the server over a live meeting WebSocket."""
+    type: str # 'partial', 'final', 'summary', 'completed' or 'error'
+    utterance: Optional[Utterance] = None # 'partial' and 'final'; a partial is replaced by the next partial or final
+    summary: Optional[str] = None # 'summary' and 'completed'
+    utterance_count: Optional[int] = None # Final utterances covered by the summary
+    transcript: Optional[TranscriptionResponse] = None # 'completed'
+    detail: Optional[str] = None # 'error'
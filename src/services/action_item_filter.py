@@ -0,0 +1,124 @@
+# src/services/action_item_filter.py
+# Local prefilter for action item extraction: scores utterances for commitment,
+# request, obligation and deadline cues in several languages and keeps only the
+# likely candidates plus their neighbours, so long meetings send a fraction of
+# the transcript to the LLM.
+import re
+from typing import List, Optional, Tuple
+
+from src.core.config import settings
+from src.schemas.transcription import Utterance
+from src.services.text_chunking import format_utterance, split_into_units
+
+# (weight, cues in space-separated languages matched as whole words, cues in CJK matched anywhere)
+_CUES = {
+    "explicit": (3, [
+        "action items?", "to-?dos?", "follow[- ]up", "next steps", "takeaways?", "assign(?:ed)? to",
+        "tarea", "pendientes?", "seguimiento", "próximos pasos", "à faire", "prochaines étapes",
+        "aufgaben?", "nächste schritte", "próximos passos", "prossimi passi", "कार्य सूची",
+    ], ["待办", "行动项", "跟进", "后续", "宿題", "タスク", "アクションアイテム", "次のステップ"]),
+    "commitment": (2, [
+        "i'll", "i will", "i'm going to", "i am going to", "we'll", "we will", "let me", "i can take",
+        "leave it with me", "i'm on it", "voy a", "vamos a", "me encargo", "yo me ocupo", "je vais",
+        "on va", "nous allons", "je m'en occupe", "je m'en charge", "ich werde", "wir werden",
+        "ich kümmere mich", "ich übernehme", "mache ich", "eu vou", "vou", "vamos", "eu cuido",
+        "fico com", "farò", "faccio io", "me ne occupo", "ci penso io", "मैं करूंगा", "मैं कर दूंगा",
+        "हम करेंगे", "मैं भेज दूंगा",
+    ], ["我会", "我来", "我负责", "我們會", "我會", "交给我", "やります", "担当します", "対応します"]),
+    "request": (2, [
+        "can you", "could you", "would you", "will you", "can someone", "could someone", "who can",
+        "who will", "please", "puedes", "podrías", "por favor", "peux-tu", "pouvez-vous",
+        "pourrais-tu", "pourriez-vous", "s'il te plaît", "s'il vous plaît", "merci de", "kannst du",
+        "können sie", "könntest du", "bitte", "você pode", "pode", "podes", "puoi", "potresti",
+        "per favore", "कृपया", "क्या आप",
+    ], ["请", "麻烦", "能不能", "可以帮", "お願いします", "ください"]),
+    "obligation": (1, [
+        "need to", "needs to", "have to", "has to", "must", "should", "make sure", "don't forget",
+        "hay que", "tenemos que", "tienes que", "debemos", "necesitamos", "il faut", "on doit",
+        "nous devons", "tu dois", "vous devez", "müssen", "muss", "sollten", "soll", "precisamos",
+        "temos que", "tem que", "devemos", "bisogna", "dobbiamo", "devi", "करना है", "चाहिए",
+    ], ["需要", "必须", "务必", "必要", "しなければ", "べき"]),
+    "deadline": (1, [
+        "by (?:monday|tuesday|wednesday|thursday|friday|tomorrow|tonight|eod|eow|the end of)",
+        "deadline", "due", "asap", "tomorrow", "end of (?:the )?(?:day|week|month)", "next (?:week|month|sprint)",
+        "monday", "tuesday", "wednesday", "thursday", "friday",
+        "lunes", "martes", "miércoles", "jueves", "viernes", "mañana", "próxima semana", "fecha límite",
+        "lundi", "mardi", "mercredi", "jeudi", "vendredi", "demain", "semaine prochaine", "avant",
+        "montag", "dienstag", "mittwoch", "donnerstag", "freitag", "morgen", "nächste woche", "bis",
+        "segunda", "terça", "quarta", "quinta", "sexta", "amanhã", "prazo",
+        "lunedì", "martedì", "mercoledì", "giovedì", "venerdì", "domani", "prossima settimana", "entro",
+        "कल", "अगले हफ्ते", "सोमवार", "शुक्रवार", "तक", r"\d{1,2}[/.]\d{1,2}",
+    ], ["明天", "下周", "周[一二三四五]", "星期[一二三四五]", "之前", "截止", "明日", "来週", "[月火水木金]曜", "までに", "締め切り"]),
+    "task": (1, [
+        "send", "share", "review", "schedule", "prepare", "update", "draft", "book", "set up", "email",
+        "call", "fix", "finish", "write", "check", "enviar", "mandar", "revisar", "preparar", "compartir",
+        "llamar", "envoyer", "partager", "préparer", "vérifier", "relire", "appeler", "schicken",
+        "senden", "prüfen", "vorbereiten", "teilen", "compartilhar", "inviare", "mandare", "preparare",
+        "condividere", "controllare", "भेज", "तैयार",
+    ], ["发送", "准备", "整理", "安排", "更新", "送る", "準備", "共有", "確認"]),
+}
+
+_PATTERNS = [
+    (weight, re.compile(
+        r"(?<!\w)(?:" + "|".join(words) + r")(?!\w)" + ("|" + "|".join(cjk) if cjk else ""),
+        re.IGNORECASE,
+    ))
+    for weight, words, cjk in _CUES.values()
+]
+
+# Utterances scoring at least this are candidates, e.g. a commitment, or an obligation plus a task verb
+_MIN_SCORE = 2
+
+
+def score_utterance(text: str) -> int:
+    """Sums the weights of the cue categories present in the text (each counted once)."""
+    normalized = text.replace("’", "'")
+    return sum(weight for weight, pattern in _PATTERNS if pattern.search(normalized))
+
+
+def select_candidates(
+    utterances: List[Utterance],
+    radius: Optional[int] = None,
+) -> Tuple[List[Optional[Utterance]], int]:
+    """
+    Returns the candidate utterances with radius neighbours on each side, in
+    order, with None marking each gap of omitted utterances, and the number of
+    candidates.
+    """
+    radius = settings.ACTION_ITEMS_CONTEXT_RADIUS if radius is None else radius
+    candidates = [i for i, utt in enumerate(utterances) if score_utterance(utt.text) >= _MIN_SCORE]
+    keep = set()
+    for i in candidates:
+        keep.update(range(max(i - radius, 0), min(i + radius + 1, len(utterances))))
+
+    selected: List[Optional[Utterance]] = []
+    previous = -1
+    for i in sorted(keep):
+        if i > previous + 1:
+            selected.append(None)
+        selected.append(utterances[i])
+        previous = i
+    if selected and previous < len(utterances) - 1:
+        selected.append(None)
+    return selected, len(candidates)
+
+
+def build_action_item_context(text: str, utterances: Optional[List[Utterance]] = None) -> Tuple[str, int, int]:
+    """
+    Returns the transcript excerpts to send for action item extraction, with
+    "..." where utterances were left out, plus the number of candidates and of
+    utterances (or sentences) considered.
+    """
+    if utterances:
+        units = [utt for utt in utterances if utt.text and utt.text.strip()]
+    else:
+        units = [Utterance(start=0, end=0, text=unit, confidence=0.0) for unit in split_into_units(text)]
+    selected, candidates = select_candidates(units)
+
+    lines = []
+    for utt in selected:
+        if utt is None:
+            lines.append("...")
+        else:
+            lines.append(format_utterance(utt) if utterances else utt.text)
+    return "\n".join(lines), candidates, len(units)
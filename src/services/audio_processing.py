@@ -0,0 +1,237 @@
+# src/services/audio_processing.py
+import asyncio
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+
+from src.core.config import settings, logger
+from src.core.metrics import AUDIO_BYTES_SAVED
+
+
+class AudioProcessingError(RuntimeError):
+    """Raised when ffmpeg/ffprobe is missing or fails."""
+
+
+def scratch_dir(name: str) -> str:
+    """Returns a directory under UPLOAD_DIR for intermediate files, creating it if needed."""
+    path = os.path.join(settings.UPLOAD_DIR, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def ffmpeg_available() -> bool:
+    """True if both ffmpeg and ffprobe are on the PATH."""
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+async def _run(cmd: List[str]) -> bytes:
+    """Runs a command without blocking the event loop and returns its stdout."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError as e:
+        raise AudioProcessingError(f"{cmd[0]} is not installed: {e}")
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise AudioProcessingError(f"{cmd[0]} failed ({process.returncode}): {stderr.decode(errors='replace')[-500:]}")
+    return stdout
+
+
+async def probe_duration(path: str) -> float:
+    """Returns the duration of a media file in seconds."""
+    stdout = await _run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path,
+    ])
+    try:
+        return float(stdout.decode().strip())
+    except ValueError:
+        raise AudioProcessingError(f"Could not read duration of {path}")
+
+
+async def extract_segment(src_path: str, dst_path: str, start_seconds: float, duration_seconds: float):
+    """Cuts [start, start + duration) out of a media file as mono 16 kHz Opus audio."""
+    await _run([
+        "ffmpeg", "-v", "error", "-y",
+        "-ss", f"{start_seconds:.3f}",
+        "-t", f"{duration_seconds:.3f}",
+        "-i", src_path,
+        "-vn", "-ac", "1", "-ar", "16000",
+        "-c:a", "libopus", "-b:a", "32k",
+        dst_path,
+    ])
+    logger.debug(f"Extracted segment {start_seconds:.0f}s+{duration_seconds:.0f}s to {dst_path}")
+
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    """
+    Detects the container format from the first bytes of a file. Returns a MIME
+    type, or None if the content is not a recognised audio/video format.
+    """
+    if head.startswith(b"ID3") or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "audio/mpeg"
+    if head.startswith(b"RIFF") and head[8:12] == b"WAVE":
+        return "audio/wav"
+    if head.startswith(b"OggS"):
+        return "audio/ogg"
+    if head.startswith(b"fLaC"):
+        return "audio/flac"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand == b"qt  ":
+            return "video/quicktime"
+        if brand in (b"M4A ", b"M4B "):
+            return "audio/mp4"
+        return "video/mp4"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        # EBML header; the DocType tells WebM from Matroska
+        return "video/webm" if b"webm" in head[:64] else "video/x-matroska"
+    return None
+
+
+# Pre-processing before upload to the ASR provider
+class PreprocessResult(NamedTuple):
+    """Outcome of pre-processing one file."""
+    path: str # Compact audio file to upload
+    original_bytes: int
+    processed_bytes: int
+    leading_silence_ms: int # Audio trimmed from the start; add back to utterance offsets
+
+
+_SILENCE_EVENT = re.compile(r"silence_(start|end): (-?[0-9.]+)")
+_DURATION = re.compile(r"Duration: (\d+):(\d+):([0-9.]+)")
+_TRIM_PADDING_SECONDS = 0.1 # Silence kept on each side of the speech
+
+
+def _detect_silence(src_path: str, threshold_db: int) -> Tuple[float, Optional[float]]:
+    """
+    Runs one streaming silencedetect pass. Returns where the speech starts (0 if
+    the file does not open with silence) and where the trailing silence starts
+    (None if the file does not end with silence), in seconds.
+    """
+    completed = subprocess.run(
+        ["ffmpeg", "-v", "info", "-i", src_path, "-vn",
+         "-af", f"silencedetect=noise={threshold_db}dB:d=0.5", "-f", "null", "-"],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise AudioProcessingError(f"ffmpeg silencedetect failed ({completed.returncode}): {completed.stderr[-500:]}")
+
+    periods: List[List[Optional[float]]] = []
+    for kind, value in _SILENCE_EVENT.findall(completed.stderr):
+        if kind == "start":
+            periods.append([max(float(value), 0.0), None])
+        elif periods:
+            periods[-1][1] = float(value)
+    if not periods:
+        return 0.0, None
+    match = _DURATION.search(completed.stderr)
+    duration = int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3)) if match else None
+
+    first_start, first_end = periods[0]
+    leading = first_end if first_start <= 0.01 and first_end is not None else 0.0
+    last_start, last_end = periods[-1]
+    # Depending on the ffmpeg version, silence running to the end of the file has no silence_end or one at the duration
+    ends_silent = last_end is None or (duration is not None and last_end >= duration - 0.05)
+    trailing = last_start if ends_silent else None
+    if trailing is not None and trailing <= leading:
+        return 0.0, None # Silent throughout; leave it to the ASR provider
+    leading = max(leading - _TRIM_PADDING_SECONDS, 0.0)
+    return leading, trailing + _TRIM_PADDING_SECONDS if trailing is not None else None
+
+
+def preprocess_audio_sync(src_path: str, dst_path: str, trim_silence: bool, threshold_db: int) -> PreprocessResult:
+    """
+    Demuxes the audio track, downmixes to mono, resamples to 16 kHz and encodes
+    it as low-bitrate Opus, optionally trimming leading and trailing silence.
+    Blocking; runs in the pre-processing process pool.
+    """
+    input_args: List[str] = []
+    leading_silence_ms = 0
+    if trim_silence:
+        # Trimmed by seeking, so the audio is streamed rather than buffered
+        leading, trailing = _detect_silence(src_path, threshold_db)
+        if leading:
+            input_args += ["-ss", f"{leading:.3f}"]
+        if trailing is not None:
+            input_args += ["-t", f"{trailing - leading:.3f}"]
+        leading_silence_ms = int(leading * 1000)
+
+    cmd = ["ffmpeg", "-v", "error", "-y", *input_args, "-i", src_path, "-vn", "-ac", "1", "-ar", "16000"]
+    cmd += ["-c:a", "libopus", "-b:a", "24k", dst_path]
+    completed = subprocess.run(cmd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise AudioProcessingError(f"ffmpeg failed ({completed.returncode}): {completed.stderr[-500:]}")
+
+    return PreprocessResult(
+        path=dst_path,
+        original_bytes=os.path.getsize(src_path),
+        processed_bytes=os.path.getsize(dst_path),
+        leading_silence_ms=leading_silence_ms,
+    )
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # Spawn rather than fork: the API process runs threads
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.AUDIO_PREPROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+async def preprocess_audio(src_path: str) -> Optional[PreprocessResult]:
+    """
+    Shrinks a recording before upload into a uuid-named file under UPLOAD_DIR,
+    which the caller deletes. Returns None when pre-processing is disabled,
+    ffmpeg is unavailable, or the result would not be smaller.
+    """
+    if not settings.AUDIO_PREPROCESS or not ffmpeg_available():
+        return None
+
+    # Never next to the source: batch inputs may be read-only or share a stem with another recording
+    dst_path = os.path.join(scratch_dir("preprocessed"), f"{uuid.uuid4().hex}.ogg")
+    loop = asyncio.get_running_loop()
+    keep = False
+    try:
+        result = await loop.run_in_executor(
+            _get_process_pool(),
+            preprocess_audio_sync,
+            src_path,
+            dst_path,
+            settings.AUDIO_TRIM_SILENCE,
+            settings.AUDIO_SILENCE_THRESHOLD_DB,
+        )
+        saved = result.original_bytes - result.processed_bytes
+        if saved <= 0:
+            logger.info("Pre-processed audio is not smaller than the original, uploading original file")
+            return None
+        keep = True
+    except Exception as e:
+        logger.warning(f"Audio pre-processing failed, uploading original file: {e}")
+        return None
+    finally:
+        if not keep and os.path.exists(dst_path):
+            os.remove(dst_path)
+
+    AUDIO_BYTES_SAVED.inc(saved)
+    logger.info(
+        f"Pre-processed {src_path}: {result.original_bytes} -> {result.processed_bytes} bytes "
+        f"({saved / result.original_bytes:.0%} saved)"
+    )
+    return result
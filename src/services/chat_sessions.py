@@ -0,0 +1,121 @@
+# src/services/chat_sessions.py
+# Server-side chat sessions: each keeps one transcript, its retrieval index and
+# the conversation about it, so a chat turn only carries the question and the
+# session id. Older turns are compacted into a summary by llm_service.
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+from src.core.config import settings, logger
+from src.schemas.llm import ChatSessionResponse
+from src.schemas.transcription import Utterance
+from src.services.retrieval import TranscriptIndex, cache_transcript_index, cached_transcript_index, transcript_key
+from src.services.transcript_store import get_transcript_store
+
+
+class ChatTurn(NamedTuple):
+    question: str
+    answer: str
+
+
+def format_turns(turns: List[ChatTurn]) -> str:
+    return "\n".join(f"User: {turn.question}\nAssistant: {turn.answer}" for turn in turns)
+
+
+class ChatSession:
+    """One conversation about one transcript. Turns run one at a time under lock."""
+
+    def __init__(self, transcript_id: str, text: str, utterances: Optional[List[Utterance]], index: TranscriptIndex):
+        self.session_id = uuid.uuid4().hex
+        self.transcript_id = transcript_id
+        self.text = text
+        self.utterances = utterances
+        self.index = index
+        self.summary = "" # Compacted earlier turns
+        self.summarized_turns = 0
+        self.turns: List[ChatTurn] = []
+        self.lock = asyncio.Lock()
+        self.compaction: Optional[asyncio.Task] = None
+        self.last_used = time.time()
+
+    def history(self) -> str:
+        """The conversation so far as sent to the LLM: the summary of earlier turns, then the recent turns."""
+        lines = [f"Summary of the earlier conversation: {self.summary}"] if self.summary else []
+        if self.turns:
+            lines.append(format_turns(self.turns))
+        return "\n".join(lines) or "(no earlier questions)"
+
+    def describe(self) -> ChatSessionResponse:
+        return ChatSessionResponse(
+            session_id=self.session_id, transcript_id=self.transcript_id,
+            turns=len(self.turns), summarized_turns=self.summarized_turns,
+        )
+
+
+# Sessions live in process memory, least recently used first
+_sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+
+
+def _prune_sessions():
+    """Drops sessions idle for longer than CHAT_SESSION_TTL_SECONDS and the oldest beyond CHAT_SESSION_MAX_SESSIONS."""
+    cutoff = time.time() - settings.CHAT_SESSION_TTL_SECONDS
+    expired = [session_id for session_id, session in _sessions.items() if session.last_used < cutoff]
+    for session_id in expired:
+        del _sessions[session_id]
+    while len(_sessions) > settings.CHAT_SESSION_MAX_SESSIONS:
+        _sessions.popitem(last=False)
+
+
+async def create_session(
+    transcript_id: Optional[str] = None,
+    text: Optional[str] = None,
+    utterances: Optional[List[Utterance]] = None,
+) -> Optional[ChatSession]:
+    """
+    Opens a session on the given transcript text, or on a stored transcript if
+    only its id is given. Returns None if the transcript is not in the store.
+    """
+    if not text:
+        if not transcript_id:
+            raise ValueError("A transcript id or the transcript context is required.")
+        store = get_transcript_store()
+        if store is None:
+            raise ValueError("Transcript store is disabled; send the transcript context to open a session.")
+        stored = await asyncio.to_thread(store.get, transcript_id)
+        if stored is None:
+            return None
+        page = await asyncio.to_thread(store.get_utterances, transcript_id, 0, stored.utterance_count)
+        text, utterances = stored.text or "", page.utterances if page else None
+        if not text:
+            raise ValueError(f"Transcript {transcript_id} has no text.")
+
+    index = cached_transcript_index(text)
+    if index is None:
+        index = await asyncio.to_thread(TranscriptIndex, text, utterances)
+        cache_transcript_index(text, index)
+    session = ChatSession(transcript_id or transcript_key(text), text, utterances, index)
+    _sessions[session.session_id] = session
+    _prune_sessions()
+    logger.info(f"Opened chat session {session.session_id} on transcript {session.transcript_id}")
+    return session
+
+
+def get_session(session_id: str) -> Optional[ChatSession]:
+    """Returns a session by id, or None if unknown or expired."""
+    _prune_sessions()
+    session = _sessions.get(session_id)
+    if session is not None:
+        session.last_used = time.time()
+        _sessions.move_to_end(session_id)
+    return session
+
+
+def delete_session(session_id: str) -> bool:
+    session = _sessions.pop(session_id, None)
+    if session is None:
+        return False
+    if session.compaction is not None:
+        session.compaction.cancel()
+    return True
@@ -0,0 +1,85 @@
+# src/services/extractive.py
+# Local extractive summarization: TextRank over TF-IDF vectors of the transcript's
+# utterances (or sentences), with no provider call. Used for the offline summary
+# mode and to shrink the transcript before it is sent to the LLM.
+from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+
+from src.services.retrieval import tokenize
+from src.services.text_chunking import estimate_tokens
+
+_DAMPING = 0.85
+_MAX_ITERATIONS = 50
+_TOLERANCE = 1e-6
+_MIN_TOKENS = 4 # Shorter units ("yeah", "okay, thanks") are never selected
+_MAX_SIMILARITY = 0.8 # A unit this similar to one already selected is skipped as redundant
+_TEXTRANK_MAX_UNITS = 3000 # Above this, centrality to the whole transcript replaces the O(n^2) graph
+
+
+def _tfidf(token_lists: List[List[str]]) -> np.ndarray:
+    """L2-normalized TF-IDF rows (sublinear tf) over terms that occur in at least two units."""
+    doc_freq = Counter(term for tokens in token_lists for term in set(tokens))
+    vocabulary = {term: i for i, term in enumerate(term for term, df in doc_freq.items() if df >= 2)}
+    matrix = np.zeros((len(token_lists), len(vocabulary)), dtype=np.float32)
+    for row, tokens in enumerate(token_lists):
+        for term, count in Counter(tokens).items():
+            column = vocabulary.get(term)
+            if column is not None:
+                matrix[row, column] = 1 + np.log(count)
+    if vocabulary:
+        df = np.array([doc_freq[term] for term in vocabulary], dtype=np.float32)
+        matrix *= np.log((len(token_lists) + 1) / (df + 1)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def _textrank(vectors: np.ndarray) -> np.ndarray:
+    """PageRank over the cosine similarity graph of the units."""
+    n = len(vectors)
+    if n > _TEXTRANK_MAX_UNITS:
+        centroid = vectors.sum(axis=0)
+        return vectors @ (centroid / (np.linalg.norm(centroid) or 1))
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.full_like(similarity, 1 / n), where=out_weight > 0)
+    scores = np.full(n, 1 / n, dtype=np.float32)
+    for _ in range(_MAX_ITERATIONS):
+        updated = (1 - _DAMPING) / n + _DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < _TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def select_units(units: List[str], max_tokens: int, texts: Optional[List[str]] = None) -> List[str]:
+    """
+    Returns the most central units that fit in max_tokens, in transcript order.
+    texts, if given, are the plain texts of the units (without speaker labels)
+    used for ranking.
+    """
+    if not units:
+        return []
+    if sum(estimate_tokens(unit) + 1 for unit in units) <= max_tokens:
+        return list(units)
+
+    token_lists = [tokenize(text) for text in (texts or units)]
+    vectors = _tfidf(token_lists)
+    scores = _textrank(vectors)
+    scores[[len(tokens) < _MIN_TOKENS for tokens in token_lists]] = -np.inf
+
+    selected: List[int] = []
+    budget = max_tokens
+    for index in np.argsort(-scores, kind="stable"):
+        if not np.isfinite(scores[index]) or budget <= 0:
+            break
+        cost = estimate_tokens(units[index]) + 1
+        if cost > budget:
+            continue
+        if selected and float(np.max(vectors[selected] @ vectors[index])) > _MAX_SIMILARITY:
+            continue
+        selected.append(int(index))
+        budget -= cost
+    return [units[i] for i in sorted(selected)]
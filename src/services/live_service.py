@@ -0,0 +1,81 @@
+# src/services/live_service.py
+import asyncio
+import uuid
+from typing import Awaitable, Callable, List, Optional
+
+from src.core.config import logger
+from src.schemas.transcription import LiveMessage, TranscriptionResponse, Utterance
+from src.services import llm_service
+from src.services.transcription_service import save_to_store
+
+
+class LiveMeeting:
+    """
+    Transcript and rolling summary of a meeting in progress. Every summary_every
+    new final utterances the summary is updated in the background from the
+    previous summary and the new utterances only, and pushed with send().
+    """
+
+    def __init__(self, send: Callable[[LiveMessage], Awaitable[None]], summary_every: int):
+        self.transcript_id = f"live-{uuid.uuid4().hex}"
+        self.utterances: List[Utterance] = []
+        self.summary = ""
+        self._send = send
+        self._summary_every = summary_every
+        self._summarized = 0 # Utterances already folded into the summary
+        self._summary_task: Optional[asyncio.Task] = None
+        self._llm_available: Optional[bool] = None
+
+    def add_utterance(self, utterance: Utterance):
+        """Records a final utterance and starts a summary update once enough are pending."""
+        self.utterances.append(utterance)
+        if self._summary_every and len(self.utterances) - self._summarized >= self._summary_every:
+            if self._summary_task is None or self._summary_task.done():
+                self._summary_task = asyncio.create_task(self._update_summary())
+
+    async def _check_llm(self) -> bool:
+        """Resolves the LLM once, off the event loop: the first lookup imports LangChain."""
+        if self._llm_available is None:
+            self._llm_available = await asyncio.to_thread(llm_service.get_llm) is not None
+            if not self._llm_available:
+                logger.warning("LLM service is not available; live meeting runs without a rolling summary.")
+                self._summary_every = 0
+        return self._llm_available
+
+    async def _update_summary(self):
+        if not await self._check_llm():
+            return
+        # Utterances arriving during an update are picked up by the next pass
+        while len(self.utterances) - self._summarized >= self._summary_every:
+            if not await self._summarize_pending():
+                return
+
+    async def _summarize_pending(self) -> bool:
+        """Folds the utterances not yet summarized into the summary. Failures are reported to the client."""
+        count = len(self.utterances)
+        try:
+            self.summary = await llm_service.update_rolling_summary(self.summary, self.utterances[self._summarized:count])
+        except Exception as e:
+            logger.error(f"Live summary update failed for {self.transcript_id}: {e}")
+            await self._send(LiveMessage(type="error", detail=f"Summary update failed: {e}"))
+            return False
+        self._summarized = count
+        await self._send(LiveMessage(type="summary", summary=self.summary, utterance_count=count))
+        return True
+
+    async def finish(self) -> TranscriptionResponse:
+        """Waits for a running summary update, folds in the remaining utterances and stores the transcript."""
+        if self._summary_task is not None:
+            await self._summary_task
+        if self._summary_every and len(self.utterances) > self._summarized and await self._check_llm():
+            await self._summarize_pending()
+
+        result = TranscriptionResponse(
+            status="TranscriptStatus.completed", # str(assemblyai.TranscriptStatus.completed), as for uploads
+            transcript_id=self.transcript_id,
+            text=" ".join(utt.text for utt in self.utterances),
+            utterances=self.utterances,
+        )
+        await save_to_store(result, None)
+        logger.info(f"Live meeting {self.transcript_id} finished with {len(self.utterances)} utterances")
+        return result
@@ -0,0 +1,63 @@
+# src/services/llm_callbacks.py
+import time
+from typing import Any, Dict, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.core.metrics import LLM_ERRORS, LLM_IN_FLIGHT, LLM_LATENCY, LLM_TOKENS
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Records latency, token usage and errors of each LLM call made by a chain."""
+
+    def __init__(self, chain: str):
+        self.chain = chain
+        self._started: Dict[UUID, float] = {}
+
+    def _start(self, run_id: UUID):
+        self._started[run_id] = time.perf_counter()
+        LLM_IN_FLIGHT.labels(self.chain).inc()
+
+    def _finish(self, run_id: UUID):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            LLM_IN_FLIGHT.labels(self.chain).dec()
+            LLM_LATENCY.labels(self.chain).observe(time.perf_counter() - started)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        self._finish(run_id)
+        prompt_tokens, completion_tokens = _token_usage(response)
+        LLM_TOKENS.labels(self.chain, "prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(self.chain, "completion").inc(completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._finish(run_id)
+        LLM_ERRORS.labels(self.chain).inc()
+
+
+def _token_usage(response: LLMResult) -> Tuple[int, int]:
+    """Reads prompt and completion token counts from a provider response."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
+    # Streamed responses carry usage on the message instead
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt_tokens += metadata.get("input_tokens", 0)
+            completion_tokens += metadata.get("output_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+def llm_config(chain: str) -> dict:
+    """Runnable config that records metrics for the LLM calls of a chain."""
+    return {"callbacks": [LLMMetricsCallback(chain)]}
@@ -0,0 +1,374 @@
+# src/services/llm_scheduler.py
+import asyncio
+import heapq
+import itertools
+import math
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from src.core.config import settings, logger
+from src.core.metrics import LLM_CIRCUIT_OPEN, LLM_QUEUE_WAIT, LLM_REJECTIONS, LLM_RETRIES
+from src.core.registry import registry
+
+T = TypeVar("T")
+
+# Lower values are served first
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError"}
+
+
+class LLMOverloadedError(ConnectionError):
+    """
+    Raised without calling the provider when a call cannot be admitted in time
+    (429) or the circuit breaker is open (503). retry_after is in seconds.
+    """
+
+    def __init__(self, message: str, retry_after: float, status_code: int = 429):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Reads the Retry-After header of a provider error, if it has one."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers and headers.get("retry-after") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for rate limits, timeouts, connection failures and 5xx responses."""
+    if isinstance(error, LLMOverloadedError):
+        return False
+    status = _status_code(error)
+    if status is not None:
+        return status in _RETRYABLE_STATUS
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in _RETRYABLE_ERROR_NAMES
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "future")
+
+    def __init__(self, priority: int, tokens: float, future: asyncio.Future):
+        self.priority = priority
+        self.tokens = tokens
+        self.future = future
+
+
+class LLMScheduler:
+    """
+    Admits outbound LLM calls of one provider. Calls wait in a priority queue
+    for a concurrency slot and for their estimated tokens in a per-minute token
+    bucket; calls expected to wait longer than the limit for their priority are
+    rejected at once. Transient errors are retried with jittered exponential
+    backoff, a provider 429 pauses all calls, and consecutive failures open a
+    circuit breaker that rejects calls until a trial call succeeds.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        max_concurrency: int,
+        tokens_per_minute: int,
+        max_wait_seconds: Dict[int, float],
+        retries: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        breaker_failures: int,
+        breaker_reset_seconds: float,
+    ):
+        self.provider = provider
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_wait_seconds = max_wait_seconds
+        self.retries = retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.breaker_failures = breaker_failures
+        self.breaker_reset_seconds = breaker_reset_seconds
+
+        self._in_flight = 0
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+        self._avg_call_seconds: Optional[float] = None
+        self._paused_until = 0.0
+
+        # Token bucket; a capacity of 0 disables the budget
+        self._capacity = float(max(tokens_per_minute, 0))
+        self._tokens = self._capacity
+        self._refill_per_second = self._capacity / 60
+        self._refilled_at = time.monotonic()
+
+        # Circuit breaker
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    # Admission
+    def _refill(self):
+        now = time.monotonic()
+        if self._capacity:
+            self._tokens = min(self._capacity, self._tokens + (now - self._refilled_at) * self._refill_per_second)
+        self._refilled_at = now
+
+    def _estimate_wait(self, priority: int, tokens: float) -> float:
+        """Seconds a new call of this priority is expected to wait for admission."""
+        ahead = [waiter for _, _, waiter in self._queue if waiter.priority <= priority and not waiter.future.done()]
+        wait = max(self._paused_until - time.monotonic(), 0.0)
+        if self._capacity:
+            self._refill()
+            deficit = sum(waiter.tokens for waiter in ahead) + tokens - self._tokens
+            if deficit > 0:
+                wait = max(wait, deficit / self._refill_per_second)
+        busy = self._in_flight + len(ahead)
+        if self._avg_call_seconds is not None and busy >= self.max_concurrency:
+            wait = max(wait, (busy // self.max_concurrency) * self._avg_call_seconds)
+        return wait
+
+    def _circuit_retry_after(self) -> Optional[float]:
+        """Seconds until the open circuit allows a trial call, or None if calls may proceed."""
+        if self._opened_at is None:
+            return None
+        remaining = self._opened_at + self.breaker_reset_seconds - time.monotonic()
+        if remaining > 0 or self._trial_in_flight:
+            return max(remaining, 1.0)
+        return None
+
+    def check(self, priority: int, tokens: float):
+        """Raises LLMOverloadedError if a call would be rejected right now; admits nothing."""
+        retry_after = self._circuit_retry_after()
+        if retry_after is not None:
+            raise LLMOverloadedError(
+                f"The {self.provider} LLM provider is failing; retry in {math.ceil(retry_after)} s.", retry_after, 503
+            )
+        wait = self._estimate_wait(priority, self._clamp(tokens))
+        if wait > self.max_wait_seconds[priority]:
+            raise LLMOverloadedError(f"LLM capacity is exhausted; retry in {math.ceil(wait)} s.", wait)
+
+    def _clamp(self, tokens: float) -> float:
+        return min(tokens, self._capacity) if self._capacity else 0.0
+
+    def _admit_circuit(self) -> bool:
+        """Rejects the call while the circuit is open. Returns True if it is the trial call."""
+        retry_after = self._circuit_retry_after()
+        if retry_after is not None:
+            LLM_REJECTIONS.labels(self.provider, "circuit_open").inc()
+            raise LLMOverloadedError(
+                f"The {self.provider} LLM provider is failing; retry in {math.ceil(retry_after)} s.", retry_after, 503
+            )
+        if self._opened_at is not None:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    async def _acquire(self, priority: int, tokens: float):
+        """Waits for a concurrency slot and the token budget of one call."""
+        wait = self._estimate_wait(priority, tokens)
+        max_wait = self.max_wait_seconds[priority]
+        if wait > max_wait:
+            LLM_REJECTIONS.labels(self.provider, "over_budget").inc()
+            raise LLMOverloadedError(f"LLM capacity is exhausted; retry in {math.ceil(wait)} s.", wait)
+
+        waiter = _Waiter(priority, tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        started = time.monotonic()
+        self._dispatch()
+        try:
+            await asyncio.wait_for(waiter.future, max_wait)
+        except asyncio.TimeoutError:
+            LLM_REJECTIONS.labels(self.provider, "queue_timeout").inc()
+            retry_after = max(self._estimate_wait(priority, tokens), 1.0)
+            raise LLMOverloadedError(f"LLM capacity is exhausted; retry in {math.ceil(retry_after)} s.", retry_after)
+        except asyncio.CancelledError:
+            # Cancelled right after being admitted: hand the slot to the next call
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(tokens)
+            raise
+        finally:
+            LLM_QUEUE_WAIT.labels(self.provider, PRIORITY_NAMES[priority]).observe(time.monotonic() - started)
+
+    def _dispatch(self):
+        """Admits queued calls in priority order while slots, budget and no provider pause allow."""
+        if self._wake_handle is not None:
+            self._wake_handle.cancel()
+            self._wake_handle = None
+        self._refill()
+        while self._queue:
+            waiter = self._queue[0][2]
+            if waiter.future.done():
+                heapq.heappop(self._queue)
+                continue
+            if self._in_flight >= self.max_concurrency:
+                return
+            delay = self._paused_until - time.monotonic()
+            if self._capacity and waiter.tokens > self._tokens:
+                delay = max(delay, (waiter.tokens - self._tokens) / self._refill_per_second)
+            if delay > 0:
+                self._wake_handle = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self._in_flight += 1
+            self._tokens -= waiter.tokens
+            waiter.future.set_result(None)
+
+    def _release(self, reserved: float, used: Optional[float] = None):
+        """Frees a slot; returns the unused part of the token reservation to the bucket."""
+        self._in_flight -= 1
+        if used is not None and self._capacity:
+            self._tokens = min(self._capacity, self._tokens + reserved - min(used, reserved))
+        self._dispatch()
+
+    # Outcomes
+    def _record_success(self, seconds: float, trial: bool):
+        self._avg_call_seconds = seconds if self._avg_call_seconds is None else 0.8 * self._avg_call_seconds + 0.2 * seconds
+        self._failures = 0
+        if trial or self._opened_at is not None:
+            logger.info(f"LLM circuit for {self.provider} closed")
+        self._opened_at = None
+        self._trial_in_flight = False
+        LLM_CIRCUIT_OPEN.labels(self.provider).set(0)
+
+    def _record_failure(self, error: BaseException, attempt: int, trial: bool) -> Optional[float]:
+        """
+        Updates the breaker and the provider pause after a failed attempt.
+        Returns the backoff before the next attempt, or None if the error must be raised.
+        """
+        if not is_retryable(error):
+            if trial:
+                self._trial_in_flight = False
+            return None
+
+        self._failures += 1
+        if trial or self._failures >= self.breaker_failures:
+            if self._opened_at is None or trial:
+                logger.error(f"LLM circuit for {self.provider} opened after {self._failures} consecutive failures: {error}")
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+            LLM_CIRCUIT_OPEN.labels(self.provider).set(1)
+
+        backoff = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if _status_code(error) == 429:
+            # The provider is rate limiting this key: hold back every call, not just this one
+            pause = retry_after if retry_after is not None else backoff
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            if self._capacity:
+                self._tokens = min(self._tokens, 0.0)
+
+        if attempt >= self.retries:
+            return None
+        LLM_RETRIES.labels(self.provider).inc()
+        delay = max(backoff, retry_after or 0.0)
+        logger.warning(f"LLM call failed ({error}); retry {attempt + 1}/{self.retries} in {delay:.1f} s")
+        return delay
+
+    # Calls
+    async def call(self, fn: Callable[[], Awaitable[T]], priority: int, tokens: float) -> T:
+        """Runs fn() once admitted, retrying transient provider errors."""
+        tokens = self._clamp(tokens)
+        attempt = 0
+        while True:
+            trial = self._admit_circuit()
+            try:
+                await self._acquire(priority, tokens)
+            except BaseException:
+                if trial:
+                    self._trial_in_flight = False
+                raise
+            started = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                self._release(tokens)
+                delay = self._record_failure(e, attempt, trial)
+                if delay is None:
+                    raise
+            except BaseException:
+                self._release(tokens)
+                if trial:
+                    self._trial_in_flight = False
+                raise
+            else:
+                self._release(tokens, used=tokens - settings.LLM_COMPLETION_TOKENS_ESTIMATE + len(str(result)) / 4)
+                self._record_success(time.monotonic() - started, trial)
+                return result
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def stream(self, fn: Callable[[], AsyncIterator[str]], priority: int, tokens: float) -> AsyncIterator[str]:
+        """
+        Streams fn() once admitted. Errors before the first token are retried like
+        call(); once tokens have been yielded the error is raised.
+        """
+        tokens = self._clamp(tokens)
+        attempt = 0
+        while True:
+            trial = self._admit_circuit()
+            try:
+                await self._acquire(priority, tokens)
+            except BaseException:
+                if trial:
+                    self._trial_in_flight = False
+                raise
+            started = time.monotonic()
+            emitted = 0
+            failed = False
+            try:
+                async for token in fn():
+                    emitted += len(token)
+                    yield token
+            except Exception as e:
+                failed = True
+                delay = self._record_failure(e, attempt, trial)
+                if delay is None or emitted:
+                    raise
+            except BaseException:
+                failed = True
+                if trial:
+                    self._trial_in_flight = False
+                raise
+            finally:
+                self._release(tokens, used=None if failed else tokens - settings.LLM_COMPLETION_TOKENS_ESTIMATE + emitted / 4)
+            if not failed:
+                self._record_success(time.monotonic() - started, trial)
+                return
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def _build_scheduler() -> LLMScheduler:
+    return LLMScheduler(
+        provider=settings.LLM_PROVIDER,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        max_wait_seconds={
+            INTERACTIVE: settings.LLM_INTERACTIVE_MAX_WAIT_SECONDS,
+            BULK: settings.LLM_BULK_MAX_WAIT_SECONDS,
+        },
+        retries=settings.LLM_RETRIES,
+        backoff_base_seconds=settings.LLM_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds=settings.LLM_BACKOFF_MAX_SECONDS,
+        breaker_failures=settings.LLM_BREAKER_FAILURES,
+        breaker_reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+    )
+
+registry.register("llm_scheduler", _build_scheduler)
+
+
+def get_scheduler() -> LLMScheduler:
+    """Returns the shared scheduler of the configured LLM provider."""
+    return registry.get("llm_scheduler")
@@ -1,28 +1,76 @@
 # src/services/llm_service.py
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser, PydanticOutputParser
-from langchain_core.exceptions import OutputParserException
+import asyncio
+import hashlib
+import json
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
 
 from src.core.config import settings, logger
-from src.schemas.llm import SummarizationResponse, ActionItemsResponse, ChatResponse
+from src.core.cache import MemoryCache, SQLiteCache, TieredCache
+from src.core.metrics import register_cache
+from src.core.registry import registry
+from src.core.singleflight import SingleFlight
+from src.schemas.llm import (
+    SummarizationResponse, ActionItems, ActionItemsResponse, NotesResponse, ChatResponse, CorpusChatResponse,
+    CorpusCitation, PromptBudget,
+)
+from src.schemas.transcription import Utterance
+from src.services.text_chunking import split_into_units, chunk_units, format_utterance
+from src.services.retrieval import (
+    TranscriptIndex, build_chat_context, cache_transcript_index, cached_transcript_index,
+    format_timestamp, full_context_fits,
+)
+from src.services.llm_scheduler import BULK, INTERACTIVE, LLMOverloadedError, get_scheduler
+from src.services.transcript_store import get_transcript_store
+from src.services.action_item_filter import build_action_item_context
+from src.services.chat_sessions import ChatSession, ChatTurn, format_turns
+from src.services.token_budget import budget_decision, check_request_limit, count_tokens, pack_by_tokens, prompt_tokens
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
+
+# LangChain and the provider SDKs are imported on first use, not at startup.
+
+_LLM_TEMPERATURE = 0.1
+
 
-# Initialize Groq LLM
-if not settings.GROQ_API_KEY:
-    logger.error("GROQ_API_KEY not found. Cannot initialize LLM Service.")
-    llm = None
-else:
+def _model_name() -> str:
+    """The model of the configured provider, known from settings alone."""
+    return "stub" if settings.LLM_PROVIDER == "stub" else settings.GROQ_MODEL_NAME
+
+
+def _build_llm():
+    """Creates the chat model for the configured provider, or None if it is not configured."""
+    if settings.LLM_PROVIDER == "stub":
+        from src.services.stub_providers import StubChatModel
+        logger.info("Using stub LLM provider; no requests are sent to Groq.")
+        return StubChatModel()
+    if not settings.GROQ_API_KEY:
+        logger.error("GROQ_API_KEY not found. Cannot initialize LLM Service.")
+        return None
     try:
+        from langchain_groq import ChatGroq
         llm = ChatGroq(
-            temperature=0.1,
+            temperature=_LLM_TEMPERATURE,
             groq_api_key=settings.GROQ_API_KEY,
             model_name=settings.GROQ_MODEL_NAME,
-            max_retries=2,
+            max_retries=0, # Retries are handled by the LLM scheduler
         )
         logger.info(f"ChatGroq LLM initialized with model: {settings.GROQ_MODEL_NAME}")
+        return llm
     except Exception as e:
         logger.error(f"Failed to initialize ChatGroq: {e}", exc_info=True)
-        llm = None
+        return None
+
+registry.register("llm", _build_llm)
+
+
+def get_llm():
+    """Returns the shared chat model, or None if the LLM service is unavailable."""
+    return registry.get("llm")
+
 
 # Prompt Templates
 SUMMARY_ONLY_PROMPT_TEMPLATE = """System: You are an expert meeting assistant. Your task is to analyze the provided transcript and generate ONLY a concise summary of the main discussion points, key decisions, and overall outcome. Focus on clarity and accuracy.
@@ -32,12 +80,27 @@ Transcript Context:
 ---\n
 Human: Based on the transcript provided, generate the concise summary.
 Assistant:"""
-summary_only_prompt = ChatPromptTemplate.from_template(SUMMARY_ONLY_PROMPT_TEMPLATE)
 
-action_items_parser = PydanticOutputParser(pydantic_object=ActionItemsResponse)
+# Map-reduce prompts for transcripts over SUMMARY_PROMPT_BUDGET_TOKENS
+CHUNK_SUMMARY_PROMPT_TEMPLATE = """System: You are an expert meeting assistant. The following is ONE SECTION of a longer meeting transcript. Summarize the discussion points, decisions and outcomes in this section only. Keep speaker attributions and concrete details (names, numbers, dates). Do not speculate about the rest of the meeting.
+\n---
+Transcript Section:
+{context}
+---\n
+Human: Summarize this section of the transcript.
+Assistant:"""
+
+COMBINE_SUMMARIES_PROMPT_TEMPLATE = """System: You are an expert meeting assistant. The following are summaries of consecutive sections of the same meeting, in order. Merge them into ONE concise summary of the main discussion points, key decisions, and overall outcome. Remove repetition between sections. Focus on clarity and accuracy.
+\n---
+Section Summaries:
+{context}
+---\n
+Human: Based on the section summaries provided, generate the concise summary.
+Assistant:"""
 
 ACTION_ITEMS_PROMPT_TEMPLATE_PYDANTIC = """System: You are an expert meeting assistant focusing ONLY on identifying action items from the provided transcript.
 Extract specific, concrete tasks or actions assigned during the meeting. Include the owner if mentioned.
+For long meetings the context contains only the excerpts most likely to contain action items, in meeting order, with "..." marking omitted parts.
 Format your response as a JSON object according to the following schema.
 If NO specific action items are identified, return a JSON object with an empty list for the 'action_items' field.
 
@@ -51,37 +114,392 @@ Transcript Context:
 Human: Based *only* on the transcript provided, extract all specific action items and format them as JSON according to the schema.
 Assistant:""" # Removed NO_ACTION_ITEMS string instruction
 
-action_items_prompt_pydantic = ChatPromptTemplate.from_template(
-    ACTION_ITEMS_PROMPT_TEMPLATE_PYDANTIC,
-    partial_variables={"format_instructions": action_items_parser.get_format_instructions()}
-)
+CHAT_PROMPT_TEMPLATE = """System: You are an AI assistant answering questions based *only* on the provided meeting transcript context. For long meetings the context contains only the excerpts most relevant to the question, in meeting order, with timestamps and speakers where available. Be concise and directly address the user's query using information from the transcript. If the answer cannot be found in the transcript, explicitly state "The answer is not available in the provided transcript context." Do not make assumptions or use external knowledge.
+\n---
+Meeting Transcript Context:
+{transcript_context}
+---\n
+Human: {user_query}
+Assistant:"""
 
-CHAT_PROMPT_TEMPLATE = """System: You are an AI assistant answering questions based *only* on the provided meeting transcript context. Be concise and directly address the user's query using information from the transcript. If the answer cannot be found in the transcript, explicitly state "The answer is not available in the provided transcript context." Do not make assumptions or use external knowledge.
+# Chat sessions: the conversation so far is sent with each question so follow-ups keep their context
+SESSION_CHAT_PROMPT_TEMPLATE = """System: You are an AI assistant answering questions based *only* on the provided meeting transcript context. For long meetings the context contains only the excerpts most relevant to the question, in meeting order, with timestamps and speakers where available. The conversation so far is included so you can resolve follow-up questions; it is not a source of facts about the meeting. Be concise and directly address the user's query using information from the transcript. If the answer cannot be found in the transcript, explicitly state "The answer is not available in the provided transcript context." Do not make assumptions or use external knowledge.
 \n---
 Meeting Transcript Context:
 {transcript_context}
+---
+Conversation So Far:
+{history}
 ---\n
 Human: {user_query}
 Assistant:"""
-chat_prompt = ChatPromptTemplate.from_template(CHAT_PROMPT_TEMPLATE)
+
+CHAT_HISTORY_SUMMARY_PROMPT_TEMPLATE = """System: You are keeping a compact record of a conversation about a meeting transcript. Below are the summary of the conversation so far and the turns since. Update the summary so that later follow-up questions can still be understood: keep the topics asked about, the facts given in the answers and any names, numbers or dates. Keep it short.
+\n---
+Summary So Far:
+{summary}
+---
+New Turns:
+{turns}
+---\n
+Human: Write the updated summary of the conversation.
+Assistant:"""
+
+# Live meetings: the previous summary plus only the utterances since, so each update costs the same
+ROLLING_SUMMARY_PROMPT_TEMPLATE = """System: You are an expert meeting assistant keeping notes of a meeting that is still in progress. Below are the summary so far and the utterances spoken since it was written. Update the summary with the new discussion points, decisions and outcomes, keeping what is still relevant from the summary so far. Keep it concise and do not speculate about the rest of the meeting.
+\n---
+Summary So Far:
+{summary}
+---
+New Utterances:
+{context}
+---\n
+Human: Write the updated summary.
+Assistant:"""
+
+CORPUS_CHAT_PROMPT_TEMPLATE = """System: You are an AI assistant answering questions about a collection of past meetings, based *only* on the provided excerpts. Each excerpt starts with a header naming the meeting id, and each line starts with its timestamp in that meeting. Excerpts are ordered from most to least relevant and are not the full meetings. Be concise and cite every fact you use as [meeting <meeting id> @ <timestamp>]. If the answer cannot be found in the excerpts, explicitly state "The answer is not available in the stored meetings." Do not make assumptions or use external knowledge.
+\n---
+Meeting Excerpts:
+{corpus_context}
+---\n
+Human: {user_query}
+Assistant:"""
+
+
+def _build_prompts() -> SimpleNamespace:
+    """Builds the prompt templates and the action items output parser."""
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import PydanticOutputParser
+
+    action_items_parser = PydanticOutputParser(pydantic_object=ActionItems)
+    return SimpleNamespace(
+        summary_only_prompt=ChatPromptTemplate.from_template(SUMMARY_ONLY_PROMPT_TEMPLATE),
+        chunk_summary_prompt=ChatPromptTemplate.from_template(CHUNK_SUMMARY_PROMPT_TEMPLATE),
+        combine_summaries_prompt=ChatPromptTemplate.from_template(COMBINE_SUMMARIES_PROMPT_TEMPLATE),
+        action_items_parser=action_items_parser,
+        action_items_prompt_pydantic=ChatPromptTemplate.from_template(
+            ACTION_ITEMS_PROMPT_TEMPLATE_PYDANTIC,
+            partial_variables={"format_instructions": action_items_parser.get_format_instructions()}
+        ),
+        chat_prompt=ChatPromptTemplate.from_template(CHAT_PROMPT_TEMPLATE),
+        corpus_chat_prompt=ChatPromptTemplate.from_template(CORPUS_CHAT_PROMPT_TEMPLATE),
+        session_chat_prompt=ChatPromptTemplate.from_template(SESSION_CHAT_PROMPT_TEMPLATE),
+        chat_history_summary_prompt=ChatPromptTemplate.from_template(CHAT_HISTORY_SUMMARY_PROMPT_TEMPLATE),
+        rolling_summary_prompt=ChatPromptTemplate.from_template(ROLLING_SUMMARY_PROMPT_TEMPLATE),
+    )
+
+registry.register("llm_prompts", _build_prompts)
+
+
+def _prompts() -> SimpleNamespace:
+    return registry.get("llm_prompts")
+
+
+def _text_chain(prompt) -> "Runnable":
+    """prompt | llm | StrOutputParser()"""
+    from langchain_core.output_parsers import StrOutputParser
+    return prompt | get_llm() | StrOutputParser()
+
+
+def _llm_config(chain: str) -> dict:
+    """Runnable config that records metrics for the LLM calls of a chain."""
+    from src.services.llm_callbacks import llm_config
+    return llm_config(chain)
+
+
+# Chat is interactive and goes ahead of bulk summarization in the scheduler queue
+_CHAIN_PRIORITY = {
+    "chat": INTERACTIVE, "corpus_chat": INTERACTIVE, "summary": BULK, "rolling_summary": BULK, "action_items": BULK,
+    "chat_history": BULK,
+}
+
+
+def _estimate_tokens(inputs: dict) -> int:
+    """Token estimate of a call's inputs plus its expected completion, used for the TPM budget."""
+    return sum(count_tokens(str(value)) for value in inputs.values()) + settings.LLM_COMPLETION_TOKENS_ESTIMATE
+
+
+async def _ainvoke(chain: "Runnable", inputs: dict, name: str):
+    """Invokes a chain through the outbound LLM scheduler."""
+    return await get_scheduler().call(
+        lambda: chain.ainvoke(inputs, config=_llm_config(name)),
+        priority=_CHAIN_PRIORITY[name],
+        tokens=_estimate_tokens(inputs),
+    )
+
+
+def _astream(chain: "Runnable", inputs: dict, name: str) -> AsyncIterator[str]:
+    """Streams a chain through the outbound LLM scheduler."""
+    return get_scheduler().stream(
+        lambda: chain.astream(inputs, config=_llm_config(name)),
+        priority=_CHAIN_PRIORITY[name],
+        tokens=_estimate_tokens(inputs),
+    )
+
+
+def check_capacity(name: str):
+    """Raises LLMOverloadedError if a call for this chain would be rejected now, e.g. before starting a stream."""
+    get_scheduler().check(_CHAIN_PRIORITY[name], settings.LLM_COMPLETION_TOKENS_ESTIMATE)
+
+
+# Response Cache
+def _build_llm_cache() -> Optional[TieredCache]:
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    return TieredCache(
+        MemoryCache(settings.LLM_CACHE_MAX_BYTES, settings.LLM_CACHE_TTL_SECONDS),
+        SQLiteCache(settings.LLM_CACHE_DISK_PATH, settings.LLM_CACHE_DISK_MAX_BYTES, settings.LLM_CACHE_TTL_SECONDS)
+        if settings.LLM_CACHE_DISK_PATH else None,
+    )
+
+registry.register("llm_cache", _build_llm_cache)
+
+
+def _peek_cache_tier(tier: str) -> Optional[dict]:
+    cache = registry.peek("llm_cache")
+    store = getattr(cache, tier, None)
+    return store.stats() if store is not None else None
+
+register_cache("llm_memory", lambda: _peek_cache_tier("memory"))
+register_cache("llm_disk", lambda: _peek_cache_tier("disk"))
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+# Identical calls in flight at the same time (keyed like the cache) share one LLM call
+_summary_flight: SingleFlight[SummarizationResponse] = SingleFlight("summary")
+_action_items_flight: SingleFlight[ActionItemsResponse] = SingleFlight("action_items")
+_chat_flight: SingleFlight[ChatResponse] = SingleFlight("chat")
+_corpus_chat_flight: SingleFlight[CorpusChatResponse] = SingleFlight("corpus_chat")
+_partial_summary_flight: SingleFlight[SummarizationResponse] = SingleFlight("partial_summary")
+
+
+def _cache_key(chain_name: str, templates: List[str], **inputs: str) -> str:
+    """
+    Builds a cache key from the prompt templates, provider, model, temperature and
+    the whitespace-normalized inputs, so editing a prompt or switching models never
+    serves stale answers. Uses settings only, so a lookup never builds the LLM.
+    """
+    payload = json.dumps({
+        "chain": chain_name,
+        "templates": hashlib.sha256("\n".join(templates).encode("utf-8")).hexdigest(),
+        "provider": settings.LLM_PROVIDER,
+        "model": _model_name(),
+        "temperature": _LLM_TEMPERATURE,
+        "inputs": {name: " ".join(value.split()) for name, value in inputs.items()},
+    }, sort_keys=True, ensure_ascii=False)
+    return f"{chain_name}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def _cache_get(key: str, response_type: Type[ResponseT]) -> Optional[ResponseT]:
+    """Returns a cached response, or None on a miss or when caching is disabled."""
+    llm_cache = registry.get("llm_cache")
+    if llm_cache is None:
+        return None
+    payload = llm_cache.get(key)
+    if payload is None:
+        return None
+    logger.info(f"LLM cache hit for {key.split(':')[0]}")
+    return response_type.model_validate_json(payload)
+
+
+def _cache_set(key: str, response: BaseModel):
+    llm_cache = registry.get("llm_cache")
+    if llm_cache is not None:
+        llm_cache.set(key, response.model_dump_json())
+
+
+def get_cache_stats() -> Optional[dict]:
+    """Returns per-tier LLM cache counters, or None when caching is disabled."""
+    llm_cache = registry.get("llm_cache")
+    return llm_cache.stats() if llm_cache is not None else None
 
 
 # Service Functions
-async def generate_summary(text: str) -> SummarizationResponse:
-    """Generates ONLY the summary from the transcript."""
-    if not llm:
+async def _memoized_summary(
+    step: str,
+    template: str,
+    chain: "Runnable",
+    context: str,
+    semaphore: asyncio.Semaphore,
+    memo: Dict[str, str],
+) -> Tuple[str, bool]:
+    """
+    Runs one map or reduce step of a long summary, keyed by the content hash of
+    its input so unchanged chunks of an edited transcript are never re-sent.
+    Steps are reused within the request through memo, and across requests
+    through the LLM cache. Returns the partial summary and whether it was reused.
+    """
+    key = _cache_key(step, [template], context=context)
+    if key in memo:
+        return memo[key], True
+    cached = _cache_get(key, SummarizationResponse)
+    if cached is not None:
+        memo[key] = cached.summary
+        return cached.summary, True
+
+    async def summarize() -> SummarizationResponse:
+        async with semaphore:
+            result = await _ainvoke(chain, {"context": context}, "summary")
+        response = SummarizationResponse(summary=result.strip())
+        _cache_set(key, response)
+        return response
+
+    memo[key] = (await _partial_summary_flight.do(key, summarize)).summary
+    return memo[key], False
+
+
+async def _summarize_chunks(chunks: List[str], memo: Dict[str, str]) -> List[str]:
+    """Summarizes chunks concurrently, bounded by SUMMARY_MAX_CONCURRENCY, reusing memoized chunk summaries."""
+    semaphore = asyncio.Semaphore(settings.SUMMARY_MAX_CONCURRENCY)
+    chain = _text_chain(_prompts().chunk_summary_prompt)
+    results = await asyncio.gather(*(
+        _memoized_summary("chunk_summary", CHUNK_SUMMARY_PROMPT_TEMPLATE, chain, chunk, semaphore, memo)
+        for chunk in chunks
+    ))
+    reused = sum(1 for _, hit in results if hit)
+    logger.info(f"Summarized {len(chunks) - reused} of {len(chunks)} chunks; {reused} reused from earlier summaries")
+    return [summary for summary, _ in results]
+
+
+async def _reduce_summaries(summaries: List[str], memo: Dict[str, str]) -> str:
+    """
+    Reduces partial summaries hierarchically: groups that fit in CHUNK_SIZE are
+    combined concurrently until a single group remains. Returns that group, which
+    is the input for the final merge. Groups are content-defined and memoized
+    like the chunks, so an edit only re-combines the groups it reaches. If the
+    summaries stop shrinking, or after SUMMARY_MAX_REDUCE_ROUNDS rounds, each is
+    truncated to an equal share of CHUNK_SIZE instead.
+    """
+    semaphore = asyncio.Semaphore(settings.SUMMARY_MAX_CONCURRENCY)
+    chain = _text_chain(_prompts().combine_summaries_prompt)
+
+    async def combine(group: str) -> str:
+        summary, _ = await _memoized_summary("combine_summaries", COMBINE_SUMMARIES_PROMPT_TEMPLATE, chain, group, semaphore, memo)
+        return summary
+
+    for _ in range(settings.SUMMARY_MAX_REDUCE_ROUNDS):
+        groups = chunk_units(summaries, settings.CHUNK_SIZE, separator="\n\n", content_defined=True)
+        if len(groups) == 1:
+            return groups[0]
+        if len(groups) >= len(summaries):
+            # Every summary is already CHUNK_SIZE or larger; merge pairwise to make progress
+            groups = ["\n\n".join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+        logger.debug(f"Reducing {len(summaries)} partial summaries into {len(groups)}")
+        reduced = await asyncio.gather(*(combine(group) for group in groups))
+        if len(reduced) == len(summaries) and sum(map(len, reduced)) >= sum(map(len, summaries)):
+            break # A single summary over CHUNK_SIZE that combining does not shorten
+        summaries = reduced
+
+    logger.warning(f"{len(summaries)} partial summaries did not reduce to {settings.CHUNK_SIZE} characters; truncating them")
+    share = max(settings.CHUNK_SIZE // len(summaries), 1)
+    return "\n\n".join(summary[:share] for summary in summaries)
+
+
+async def _prepare_final_summary(
+    text: str,
+    utterances: Optional[List[Utterance]],
+) -> Tuple["Runnable", dict, PromptBudget]:
+    """
+    Routes the transcript by its token count: sent whole if the prompt fits in
+    SUMMARY_PROMPT_BUDGET_TOKENS, otherwise summarized map-reduce in CHUNK_SIZE
+    chunks (after extractive compression if SUMMARY_PROMPT_MAX_TOKENS is set).
+    Runs the map and intermediate reduce steps and returns the chain and input of
+    the final LLM call, so it can be invoked or streamed, plus the decision.
+    """
+    budget = settings.SUMMARY_PROMPT_BUDGET_TOKENS
+    text_tokens = count_tokens(text)
+    prompt = count_tokens(SUMMARY_ONLY_PROMPT_TEMPLATE) + text_tokens
+    route = "direct"
+    units = split_into_units(text, utterances)
+    if settings.SUMMARY_PROMPT_MAX_TOKENS and text_tokens > settings.SUMMARY_PROMPT_MAX_TOKENS:
+        from src.services.extractive import select_units
+        selected = await asyncio.to_thread(select_units, units, settings.SUMMARY_PROMPT_MAX_TOKENS, _unit_texts(utterances))
+        logger.info(f"Compressed transcript from {len(units)} to {len(selected)} units before summarization")
+        units, text, route = selected, "\n".join(selected), "compress"
+
+    sent = prompt_tokens(SUMMARY_ONLY_PROMPT_TEMPLATE, text)
+    chunks = chunk_units(units, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP, content_defined=True) if sent > budget else []
+    if len(chunks) <= 1:
+        return (
+            _text_chain(_prompts().summary_only_prompt), {"context": text},
+            budget_decision("summary", prompt, budget, route, sent),
+        )
+
+    logger.info(f"Transcript split into {len(chunks)} chunks for map-reduce summarization")
+    sent = sum(prompt_tokens(CHUNK_SUMMARY_PROMPT_TEMPLATE, chunk) for chunk in chunks)
+    decision = budget_decision("summary", prompt, budget, "chunk", sent, len(chunks))
+    memo: Dict[str, str] = {}
+    partial_summaries = await _summarize_chunks(chunks, memo)
+    final_group = await _reduce_summaries(partial_summaries, memo)
+    return _text_chain(_prompts().combine_summaries_prompt), {"context": final_group}, decision
+
+
+def _summary_cache_key(text: str, utterances: Optional[List[Utterance]]) -> str:
+    return _cache_key(
+        "summary",
+        [SUMMARY_ONLY_PROMPT_TEMPLATE, CHUNK_SUMMARY_PROMPT_TEMPLATE, COMBINE_SUMMARIES_PROMPT_TEMPLATE],
+        text=text,
+        utterances="\n".join(split_into_units(text, utterances)) if utterances else "",
+        chunking=f"{settings.CHUNK_SIZE}/{settings.CHUNK_OVERLAP}",
+        budget=str(settings.SUMMARY_PROMPT_BUDGET_TOKENS),
+        compression=str(settings.SUMMARY_PROMPT_MAX_TOKENS) if settings.SUMMARY_PROMPT_MAX_TOKENS else "",
+    )
+
+
+def _unit_texts(utterances: Optional[List[Utterance]]) -> Optional[List[str]]:
+    """Plain texts parallel to split_into_units(text, utterances), for ranking without speaker labels."""
+    if not utterances:
+        return None
+    return [utt.text for utt in utterances if utt.text and utt.text.strip()]
+
+
+async def generate_extractive_summary(text: str, utterances: Optional[List[Utterance]] = None) -> SummarizationResponse:
+    """
+    Builds a summary locally from the most central utterances (TextRank over
+    TF-IDF vectors), up to SUMMARY_EXTRACTIVE_MAX_TOKENS. Needs no LLM provider.
+    """
+    if not text:
+        raise ValueError("Transcript cannot be empty.")
+    from src.services.extractive import select_units
+
+    units = split_into_units(text, utterances)
+    selected = await asyncio.to_thread(select_units, units, settings.SUMMARY_EXTRACTIVE_MAX_TOKENS, _unit_texts(utterances))
+    logger.info(f"Extractive summary: {len(selected)} of {len(units)} units")
+    return SummarizationResponse(summary="\n".join(selected))
+
+
+async def generate_summary(text: str, utterances: Optional[List[Utterance]] = None) -> SummarizationResponse:
+    """
+    Generates ONLY the summary from the transcript. Transcripts over
+    SUMMARY_PROMPT_BUDGET_TOKENS are split on utterance boundaries and summarized
+    map-reduce style.
+    """
+    if get_llm() is None:
         raise ConnectionError("LLM service is not available.")
     if not text:
         raise ValueError("Transcript cannot be empty.")
+    check_request_limit("summary", count_tokens(text))
+
+    cache_key = _summary_cache_key(text, utterances)
+    cached = _cache_get(cache_key, SummarizationResponse)
+    if cached is not None:
+        return cached
+
+    async def summarize() -> SummarizationResponse:
+        chain, inputs, decision = await _prepare_final_summary(text, utterances)
+        logger.debug("Calling LLM chain with input...")
+        summary_text = await _ainvoke(chain, inputs, "summary")
+        logger.info("Summary LLM call successful.")
+        response = SummarizationResponse(summary=summary_text.strip(), budgets=[decision])
+        _cache_set(cache_key, response)
+        return response
 
     logger.info(f"Requesting summary from model {settings.GROQ_MODEL_NAME}")
     logger.debug(f"Transcript length: {len(text)} characters")
     try:
-        chain = summary_only_prompt | llm | StrOutputParser()
-        logger.debug("Calling LLM chain with input...")
-        summary_text = await chain.ainvoke({"context": text})
-        logger.info("Summary LLM call successful.")
-        return SummarizationResponse(summary=summary_text.strip())
+        return await _summary_flight.do(cache_key, summarize)
+    except LLMOverloadedError:
+        raise
     except Exception as e:
         import traceback
         tb = traceback.format_exc()
@@ -90,53 +508,552 @@ async def generate_summary(text: str) -> SummarizationResponse:
         raise RuntimeError(f"Failed to generate summary: {e}")
 
 
-async def extract_action_items(text: str) -> ActionItemsResponse:
-    """Extracts ONLY the action items using PydanticOutputParser."""
-    if not llm:
+async def _single_token(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+async def _stream_final_summary(chain: "Runnable", inputs: dict, decision: PromptBudget, cache_key: str) -> AsyncIterator[str]:
+    try:
+        parts = []
+        async for token in _astream(chain, inputs, "summary"):
+            parts.append(token)
+            yield token
+        logger.info("Summary LLM stream completed.")
+        _cache_set(cache_key, SummarizationResponse(summary="".join(parts).strip(), budgets=[decision]))
+    except LLMOverloadedError:
+        raise
+    except Exception as e:
+        logger.error(f"Summary streaming failed: {e}", exc_info=True)
+        raise RuntimeError(f"Failed to generate summary: {e}")
+
+
+async def stream_summary(text: str, utterances: Optional[List[Utterance]] = None) -> AsyncIterator[str]:
+    """
+    Validates and routes the transcript, then returns the summary as a token
+    stream. For long transcripts the map and reduce steps run before this
+    returns and only the final merge is streamed, so every error up to the
+    first token is raised here rather than inside the stream.
+    """
+    if get_llm() is None:
         raise ConnectionError("LLM service is not available.")
     if not text:
         raise ValueError("Transcript cannot be empty.")
+    check_request_limit("summary", count_tokens(text))
 
-    logger.info(f"Requesting action items extraction")
+    cache_key = _summary_cache_key(text, utterances)
+    cached = _cache_get(cache_key, SummarizationResponse)
+    if cached is not None:
+        return _single_token(cached.summary)
+
+    logger.info(f"Streaming summary from model {settings.GROQ_MODEL_NAME}")
     try:
+        in_flight = _summary_flight.join(cache_key)
+        if in_flight is not None:
+            # The same summary is already being generated; send it whole once it is ready
+            return _single_token((await in_flight).summary)
+        chain, inputs, decision = await _prepare_final_summary(text, utterances)
+    except LLMOverloadedError:
+        raise
+    except Exception as e:
+        logger.error(f"Summary streaming failed: {e}", exc_info=True)
+        raise RuntimeError(f"Failed to generate summary: {e}")
+    return _stream_final_summary(chain, inputs, decision, cache_key)
+
+
+async def update_rolling_summary(summary: str, utterances: List[Utterance]) -> str:
+    """
+    Folds new utterances of a live meeting into its running summary. Only the
+    previous summary and the new utterances are sent, never the whole transcript.
+    """
+    if get_llm() is None:
+        raise ConnectionError("LLM service is not available.")
+    if not utterances:
+        return summary
+
+    logger.info(f"Updating rolling summary with {len(utterances)} new utterances")
+    try:
+        chain = _text_chain(_prompts().rolling_summary_prompt)
+        result = await _ainvoke(chain, {
+            "summary": summary or "(nothing yet)",
+            "context": "\n".join(f"[{format_timestamp(utt.start)}] {format_utterance(utt)}" for utt in utterances),
+        }, "rolling_summary")
+        return result.strip()
+    except LLMOverloadedError:
+        raise
+    except Exception as e:
+        logger.error(f"Rolling summary update failed: {e}", exc_info=True)
+        raise RuntimeError(f"Failed to update rolling summary: {e}")
+
+
+async def extract_action_items(text: str, utterances: Optional[List[Utterance]] = None) -> ActionItemsResponse:
+    """
+    Extracts ONLY the action items using PydanticOutputParser. Transcripts longer
+    than ACTION_ITEMS_PREFILTER_MIN_TOKENS are first narrowed locally to the
+    utterances with action item cues and their neighbours; inputs whose prompt is
+    still over ACTION_ITEMS_PROMPT_BUDGET_TOKENS are extracted chunk by chunk.
+    """
+    if not text:
+        raise ValueError("Transcript cannot be empty.")
+
+    text_tokens = count_tokens(text)
+    check_request_limit("action_items", text_tokens)
+    budget = settings.ACTION_ITEMS_PROMPT_BUDGET_TOKENS
+
+    context, route, candidates = text, "direct", None
+    if settings.ACTION_ITEMS_PREFILTER_MIN_TOKENS and text_tokens > settings.ACTION_ITEMS_PREFILTER_MIN_TOKENS:
+        context, candidates, total = await asyncio.to_thread(build_action_item_context, text, utterances)
+        route = "compress"
+        logger.info(
+            f"Action item prefilter kept {candidates} of {total} utterances as candidates "
+            f"({count_tokens(context)} of {text_tokens} tokens)"
+        )
+
+    # Looked up before the LLM and the prompts are built, so a hit never imports LangChain
+    cache_key = _cache_key(
+        "action_items", [ACTION_ITEMS_PROMPT_TEMPLATE_PYDANTIC], text=context, budget=str(budget)
+    )
+    cached = _cache_get(cache_key, ActionItemsResponse)
+    if cached is not None:
+        return cached
+
+    template_tokens = count_tokens(ACTION_ITEMS_PROMPT_TEMPLATE_PYDANTIC) + count_tokens(
+        _prompts().action_items_parser.get_format_instructions()
+    )
+    prompt = template_tokens + text_tokens
+    if candidates == 0:
+        return ActionItemsResponse(
+            action_items=[], budgets=[budget_decision("action_items", prompt, budget, route, 0, 0)]
+        )
+    if get_llm() is None:
+        raise ConnectionError("LLM service is not available.")
+
+    sent = template_tokens + count_tokens(context)
+    chunks = [context]
+    if sent > budget:
+        units = context.split("\n") if route == "compress" else split_into_units(text, utterances)
+        chunks = pack_by_tokens(units, max(budget - template_tokens, 1))
+        sent = template_tokens * len(chunks) + sum(count_tokens(chunk) for chunk in chunks)
+        if len(chunks) > 1:
+            route = "chunk"
+    decision = budget_decision("action_items", prompt, budget, route, sent, len(chunks))
+
+    from langchain_core.exceptions import OutputParserException
+
+    async def extract() -> ActionItemsResponse:
         # Chain now uses the pydantic prompt and parser
-        chain = action_items_prompt_pydantic | llm | action_items_parser
+        prompts = _prompts()
+        chain = prompts.action_items_prompt_pydantic | get_llm() | prompts.action_items_parser
+        semaphore = asyncio.Semaphore(settings.SUMMARY_MAX_CONCURRENCY)
 
-        # The result of invoke IS the parsed Pydantic object
-        parsed_output: ActionItemsResponse = await chain.ainvoke({"context": text})
+        async def extract_chunk(chunk: str) -> List[str]:
+            # The result of invoke IS the parsed Pydantic object
+            async with semaphore:
+                parsed_output: ActionItems = await _ainvoke(chain, {"context": chunk}, "action_items")
+            # Filter out any empty strings the LLM might have included
+            return [item.strip() for item in parsed_output.action_items if item and item.strip()]
+
+        results = await asyncio.gather(*(extract_chunk(chunk) for chunk in chunks))
         logger.info("Action items LLM call and parsing successful.")
 
-        # Optional: Filter out any empty strings the LLM might have included
-        if parsed_output and parsed_output.action_items:
-            parsed_output.action_items = [item for item in parsed_output.action_items if item and item.strip()]
+        # Items repeated across chunk boundaries are kept once
+        action_items, seen = [], set()
+        for item in (item for items in results for item in items):
+            key = " ".join(item.lower().split())
+            if key not in seen:
+                seen.add(key)
+                action_items.append(item)
 
-        # Add model used before returning
-        return parsed_output
+        response = ActionItemsResponse(action_items=action_items, budgets=[decision])
+        _cache_set(cache_key, response)
+        return response
 
+    logger.info(f"Requesting action items extraction")
+    try:
+        return await _action_items_flight.do(cache_key, extract)
     except OutputParserException as ope:
         logger.error(f"Failed to parse LLM output for action items: {ope}", exc_info=True)
         raise RuntimeError(f"Failed to parse action items from LLM response: {ope}")
+    except LLMOverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Action item extraction failed: {e}", exc_info=True)
         raise RuntimeError(f"Failed to extract action items: {e}")
 
 
-async def answer_query(transcript_context: str, user_query: str) -> ChatResponse:
-    """Answers a user query based on the provided transcript context."""
-    if not llm:
+async def generate_notes(text: str, utterances: Optional[List[Utterance]] = None) -> NotesResponse:
+    """
+    Generates the summary and the action items concurrently. A failed action item
+    extraction is reported alongside the summary instead of failing the request.
+    """
+    if get_llm() is None:
+        raise ConnectionError("LLM service is not available.")
+    if not text:
+        raise ValueError("Transcript cannot be empty.")
+
+    logger.info("Requesting summary and action items concurrently")
+    summary_result, action_items_result = await asyncio.gather(
+        generate_summary(text, utterances),
+        extract_action_items(text, utterances),
+        return_exceptions=True,
+    )
+    if isinstance(summary_result, BaseException):
+        raise summary_result
+
+    if isinstance(action_items_result, BaseException):
+        logger.warning(f"Action items failed while summary succeeded: {action_items_result}")
+        return NotesResponse(
+            summary=summary_result.summary, action_items_error=str(action_items_result), budgets=summary_result.budgets
+        )
+    return NotesResponse(
+        summary=summary_result.summary, action_items=action_items_result.action_items,
+        budgets=summary_result.budgets + action_items_result.budgets,
+    )
+
+
+def _question_tokens(user_query: str, session: Optional[ChatSession] = None) -> int:
+    """Prompt tokens of a question (and the session history); raises ValueError if they leave no room in the chat budget."""
+    budget = settings.CHAT_PROMPT_BUDGET_TOKENS
+    if session is None:
+        question = prompt_tokens(CHAT_PROMPT_TEMPLATE, user_query)
+    else:
+        question = prompt_tokens(SESSION_CHAT_PROMPT_TEMPLATE, user_query, session.history())
+    if question >= budget:
+        raise ValueError(f"Question is too long: about {question} tokens with the prompt, over the chat budget of {budget}.")
+    return question
+
+
+async def _chat_context(
+    transcript_context: str,
+    user_query: str,
+    utterances: Optional[List[Utterance]],
+    session: Optional[ChatSession] = None,
+) -> Tuple[str, PromptBudget]:
+    """
+    Fits the chat prompt in CHAT_PROMPT_BUDGET_TOKENS: the question (and the
+    session history) must fit with room to spare, and the transcript passages
+    sent are trimmed to the rest. In a session, passages are retrieved for the
+    previous question too, so follow-ups find what they refer to. A transcript
+    index that is not cached yet is built off the event loop.
+    """
+    budget = settings.CHAT_PROMPT_BUDGET_TOKENS
+    question = _question_tokens(user_query, session)
+    if session is None:
+        search_query, index = user_query, None
+    else:
+        search_query = f"{session.turns[-1].question} {user_query}" if session.turns else user_query
+        index = session.index
+    max_tokens = budget - question
+    if index is None and not full_context_fits(transcript_context, max_tokens):
+        index = cached_transcript_index(transcript_context)
+        if index is None:
+            index = await asyncio.to_thread(TranscriptIndex, transcript_context, utterances)
+            cache_transcript_index(transcript_context, index)
+    context = build_chat_context(transcript_context, search_query, utterances, max_tokens=max_tokens, index=index)
+    logger.debug(f"Chat context: {len(context)} of {len(transcript_context)} characters")
+    route = "direct" if context == transcript_context else "compress"
+    return context, budget_decision(
+        "chat", question + count_tokens(transcript_context), budget, route, question + count_tokens(context)
+    )
+
+
+async def answer_query(
+    transcript_context: str,
+    user_query: str,
+    utterances: Optional[List[Utterance]] = None,
+) -> ChatResponse:
+    """
+    Answers a user query based on the provided transcript context. Long transcripts
+    are indexed once and only the passages relevant to the query are sent.
+    """
+    if get_llm() is None:
         raise ConnectionError("LLM service is not available.")
     if not transcript_context or not user_query:
         raise ValueError("Transcript context and user query cannot be empty.")
 
+    context, decision = await _chat_context(transcript_context, user_query, utterances)
     logger.info(f"Requesting chat response from model {settings.GROQ_MODEL_NAME}")
     try:
-        chain = chat_prompt | llm | StrOutputParser()
-        result = await chain.ainvoke({
-            "transcript_context": transcript_context,
-            "user_query": user_query
-        })
-        logger.info("Chat LLM call successful.")
-        return ChatResponse(ai_response=result.strip())
+        cache_key = _cache_key("chat", [CHAT_PROMPT_TEMPLATE], context=context, user_query=user_query)
+        cached = _cache_get(cache_key, ChatResponse)
+        if cached is not None:
+            return cached
+
+        async def answer() -> ChatResponse:
+            chain = _text_chain(_prompts().chat_prompt)
+            result = await _ainvoke(chain, {
+                "transcript_context": context,
+                "user_query": user_query
+            }, "chat")
+            logger.info("Chat LLM call successful.")
+            response = ChatResponse(ai_response=result.strip(), budgets=[decision])
+            _cache_set(cache_key, response)
+            return response
+
+        return await _chat_flight.do(cache_key, answer)
+    except LLMOverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Chat query failed: {e}", exc_info=True)
         raise RuntimeError(f"Failed to get chat response: {e}")
+
+
+async def _stream_chat_answer(context: str, user_query: str, decision: PromptBudget, cache_key: str) -> AsyncIterator[str]:
+    try:
+        chain = _text_chain(_prompts().chat_prompt)
+        parts = []
+        async for token in _astream(chain, {
+            "transcript_context": context,
+            "user_query": user_query
+        }, "chat"):
+            parts.append(token)
+            yield token
+        logger.info("Chat LLM stream completed.")
+        _cache_set(cache_key, ChatResponse(ai_response="".join(parts).strip(), budgets=[decision]))
+    except LLMOverloadedError:
+        raise
+    except Exception as e:
+        logger.error(f"Chat streaming failed: {e}", exc_info=True)
+        raise RuntimeError(f"Failed to get chat response: {e}")
+
+
+async def stream_answer(
+    transcript_context: str,
+    user_query: str,
+    utterances: Optional[List[Utterance]] = None,
+) -> AsyncIterator[str]:
+    """
+    Fits the question and its passages in the chat budget, then returns the
+    answer as a token stream. Input and budget errors are raised here rather
+    than inside the stream.
+    """
+    if get_llm() is None:
+        raise ConnectionError("LLM service is not available.")
+    if not transcript_context or not user_query:
+        raise ValueError("Transcript context and user query cannot be empty.")
+
+    context, decision = await _chat_context(transcript_context, user_query, utterances)
+    logger.info(f"Streaming chat response from model {settings.GROQ_MODEL_NAME}")
+    cache_key = _cache_key("chat", [CHAT_PROMPT_TEMPLATE], context=context, user_query=user_query)
+    cached = _cache_get(cache_key, ChatResponse)
+    if cached is not None:
+        return _single_token(cached.ai_response)
+    return _stream_chat_answer(context, user_query, decision, cache_key)
+
+
+async def _compact_chat_history(session: ChatSession):
+    """
+    Folds all but the last CHAT_SESSION_KEEP_TURNS turns of a session into its
+    history summary once the history is over CHAT_SESSION_HISTORY_TOKENS. On
+    failure the turns are kept and compaction is retried after the next turn.
+    """
+    if count_tokens(session.history()) <= settings.CHAT_SESSION_HISTORY_TOKENS:
+        return
+    older = session.turns[:max(len(session.turns) - settings.CHAT_SESSION_KEEP_TURNS, 0)]
+    if not older:
+        return
+    try:
+        chain = _text_chain(_prompts().chat_history_summary_prompt)
+        summary = await _ainvoke(chain, {
+            "summary": session.summary or "(nothing yet)",
+            "turns": format_turns(older),
+        }, "chat_history")
+    except Exception as e:
+        logger.warning(f"Chat history compaction failed for session {session.session_id}: {e}")
+        return
+    session.summary = summary.strip()
+    session.turns = session.turns[len(older):]
+    session.summarized_turns += len(older)
+    logger.info(f"Compacted {len(older)} turns of chat session {session.session_id} into its history summary")
+
+
+async def _prepare_session_turn(session: ChatSession, user_query: str) -> Tuple[dict, PromptBudget, str]:
+    """Waits for any pending compaction, then returns the chain inputs, budget decision and cache key of a turn."""
+    if session.compaction is not None:
+        await session.compaction
+        session.compaction = None
+    context, decision = await _chat_context(session.text, user_query, session.utterances, session)
+    inputs = {"transcript_context": context, "history": session.history(), "user_query": user_query}
+    return inputs, decision, _cache_key("session_chat", [SESSION_CHAT_PROMPT_TEMPLATE], **inputs)
+
+
+def _finish_session_turn(session: ChatSession, user_query: str, answer: str):
+    """Records a turn and compacts the history in the background, before the next turn runs."""
+    session.turns.append(ChatTurn(user_query, answer))
+    session.compaction = asyncio.create_task(_compact_chat_history(session))
+
+
+async def answer_session_query(session: ChatSession, user_query: str) -> ChatResponse:
+    """
+    Answers the next question of a chat session. Only the question travels from
+    the client; the transcript, its index and the history are kept server-side.
+    """
+    if get_llm() is None:
+        raise ConnectionError("LLM service is not available.")
+    if not user_query or not user_query.strip():
+        raise ValueError("User query cannot be empty.")
+
+    async with session.lock:
+        inputs, decision, cache_key = await _prepare_session_turn(session, user_query)
+        logger.info(f"Requesting chat response in session {session.session_id} ({len(session.turns)} recent turns)")
+        try:
+            response = _cache_get(cache_key, ChatResponse)
+            if response is None:
+                result = await _ainvoke(_text_chain(_prompts().session_chat_prompt), inputs, "chat")
+                logger.info("Session chat LLM call successful.")
+                response = ChatResponse(ai_response=result.strip(), budgets=[decision])
+                _cache_set(cache_key, response)
+        except LLMOverloadedError:
+            raise
+        except Exception as e:
+            logger.error(f"Session chat query failed: {e}", exc_info=True)
+            raise RuntimeError(f"Failed to get chat response: {e}")
+        _finish_session_turn(session, user_query, response.ai_response)
+        return response
+
+
+async def stream_session_answer(session: ChatSession, user_query: str) -> AsyncIterator[str]:
+    """
+    Checks the next question of a chat session against the chat budget, then
+    returns its answer as a token stream. The turn itself runs under the session
+    lock once the stream starts.
+    """
+    if get_llm() is None:
+        raise ConnectionError("LLM service is not available.")
+    if not user_query or not user_query.strip():
+        raise ValueError("User query cannot be empty.")
+    if session.compaction is not None:
+        # The history is measured as the turn will send it
+        await asyncio.shield(session.compaction)
+    _question_tokens(user_query, session)
+    return _stream_session_turn(session, user_query)
+
+
+async def _stream_session_turn(session: ChatSession, user_query: str) -> AsyncIterator[str]:
+    async with session.lock:
+        inputs, decision, cache_key = await _prepare_session_turn(session, user_query)
+        logger.info(f"Streaming chat response in session {session.session_id} ({len(session.turns)} recent turns)")
+        try:
+            cached = _cache_get(cache_key, ChatResponse)
+            if cached is not None:
+                answer = cached.ai_response
+                yield answer
+            else:
+                parts = []
+                async for token in _astream(_text_chain(_prompts().session_chat_prompt), inputs, "chat"):
+                    parts.append(token)
+                    yield token
+                logger.info("Session chat LLM stream completed.")
+                answer = "".join(parts).strip()
+                _cache_set(cache_key, ChatResponse(ai_response=answer, budgets=[decision]))
+        except LLMOverloadedError:
+            raise
+        except Exception as e:
+            logger.error(f"Session chat streaming failed: {e}", exc_info=True)
+            raise RuntimeError(f"Failed to get chat response: {e}")
+        _finish_session_turn(session, user_query, answer)
+
+
+def build_corpus_context(
+    user_query: str,
+    transcript_ids: Optional[List[str]] = None,
+    recent_meetings: Optional[int] = None,
+) -> Tuple[str, List[CorpusCitation], Optional[PromptBudget]]:
+    """
+    Retrieves the utterance windows most relevant to a question across stored
+    meetings and packs them, best first, into CORPUS_CHAT_MAX_CONTEXT_TOKENS. The
+    prompt stays the same size however many meetings are stored. Returns the
+    context, its citations and the budget decision (None if nothing was found).
+    Blocking.
+    """
+    store = get_transcript_store()
+    if store is None:
+        raise ConnectionError("Transcript store is disabled. Set TRANSCRIPT_STORE_PATH.")
+    if recent_meetings:
+        recent = [t.transcript_id for t in store.list(limit=recent_meetings).transcripts]
+        transcript_ids = [tid for tid in transcript_ids if tid in recent] if transcript_ids else recent
+        if not transcript_ids:
+            return "", [], None
+
+    windows = store.retrieve_windows(
+        user_query, settings.CORPUS_CHAT_MAX_HITS, settings.CORPUS_CHAT_WINDOW, transcript_ids
+    )
+    passages, citations = [], []
+    budget = settings.CORPUS_CHAT_MAX_CONTEXT_TOKENS
+    retrieved = 0
+    for window in windows:
+        if not window.utterances:
+            continue
+        start = window.utterances[0].start
+        header = f"[meeting {window.transcript_id}"
+        header += f" ({window.filename})" if window.filename else ""
+        header += f" @ {format_timestamp(start)}]"
+        passage = "\n".join(
+            [header] + [f"[{format_timestamp(utt.start)}] {format_utterance(utt)}" for utt in window.utterances]
+        )
+        cost = count_tokens(passage) + 1
+        retrieved += cost
+        if cost > budget:
+            continue # A smaller, less relevant window may still fit
+        budget -= cost
+        passages.append(passage)
+        citations.append(CorpusCitation(
+            transcript_id=window.transcript_id, filename=window.filename, start=start,
+            end=window.utterances[-1].end, timestamp=format_timestamp(start), score=window.score,
+        ))
+    logger.info(
+        f"Corpus chat context: {len(passages)} of {len(windows)} passages, "
+        f"{settings.CORPUS_CHAT_MAX_CONTEXT_TOKENS - budget} tokens"
+    )
+    if not citations:
+        return "", [], None
+    question = prompt_tokens(CORPUS_CHAT_PROMPT_TEMPLATE, user_query)
+    used = settings.CORPUS_CHAT_MAX_CONTEXT_TOKENS - budget
+    decision = budget_decision(
+        "corpus_chat", question + retrieved, question + settings.CORPUS_CHAT_MAX_CONTEXT_TOKENS,
+        "direct" if len(passages) == len(windows) else "compress", question + used,
+    )
+    return "\n\n".join(passages), citations, decision
+
+
+async def answer_corpus_query(
+    user_query: str,
+    transcript_ids: Optional[List[str]] = None,
+    recent_meetings: Optional[int] = None,
+) -> CorpusChatResponse:
+    """
+    Answers a question across all stored meetings (or the selected ones), citing
+    the meeting id and timestamp of the passages the answer is based on.
+    """
+    if get_llm() is None:
+        raise ConnectionError("LLM service is not available.")
+    if not user_query or not user_query.strip():
+        raise ValueError("User query cannot be empty.")
+
+    context, citations, decision = await asyncio.to_thread(build_corpus_context, user_query, transcript_ids, recent_meetings)
+    if not citations:
+        return CorpusChatResponse(ai_response="The answer is not available in the stored meetings.", citations=[])
+
+    logger.info(f"Requesting corpus chat response from model {settings.GROQ_MODEL_NAME}")
+    try:
+        cache_key = _cache_key("corpus_chat", [CORPUS_CHAT_PROMPT_TEMPLATE], corpus_context=context, user_query=user_query)
+        cached = _cache_get(cache_key, CorpusChatResponse)
+        if cached is not None:
+            return cached
+
+        async def answer() -> CorpusChatResponse:
+            chain = _text_chain(_prompts().corpus_chat_prompt)
+            result = await _ainvoke(chain, {
+                "corpus_context": context,
+                "user_query": user_query
+            }, "corpus_chat")
+            logger.info("Corpus chat LLM call successful.")
+            response = CorpusChatResponse(ai_response=result.strip(), citations=citations, budgets=[decision])
+            _cache_set(cache_key, response)
+            return response
+
+        return await _corpus_chat_flight.do(cache_key, answer)
+    except LLMOverloadedError:
+        raise
+    except Exception as e:
+        logger.error(f"Corpus chat query failed: {e}", exc_info=True)
+        raise RuntimeError(f"Failed to get corpus chat response: {e}")
@@ -0,0 +1,54 @@
+# src/services/precompute.py
+# Opt-in speculative work when a transcription job completes
+# (PRECOMPUTE_ON_TRANSCRIPT): the chat index and the notes are built in the
+# background, so the first chat question and the Summarize request are served
+# from the caches, or join the generation already in flight.
+import asyncio
+import time
+from typing import Set
+
+from src.core.config import settings, logger
+from src.core.metrics import PRECOMPUTE_RUNS
+from src.core.registry import registry
+from src.schemas.transcription import TranscriptionResponse
+from src.services import llm_service
+from src.services.llm_scheduler import LLMOverloadedError
+from src.services.retrieval import TranscriptIndex, cache_transcript_index, cached_transcript_index
+
+_tasks: Set[asyncio.Task] = set()
+
+
+async def _precompute(result: TranscriptionResponse):
+    started = time.perf_counter()
+    text, utterances = result.text, result.utterances
+    try:
+        if cached_transcript_index(text) is None:
+            cache_transcript_index(text, await asyncio.to_thread(TranscriptIndex, text, utterances))
+    except Exception as e:
+        logger.warning(f"Could not precompute the chat index of transcript {result.transcript_id}: {e}")
+
+    if llm_service.get_llm() is None or registry.get("llm_cache") is None:
+        # Without the LLM cache nothing generated now could be served later
+        PRECOMPUTE_RUNS.labels("skipped").inc()
+        return
+    try:
+        await llm_service.generate_notes(text, utterances)
+    except (LLMOverloadedError, ValueError) as e:
+        logger.info(f"Skipped precomputing notes for transcript {result.transcript_id}: {e}")
+        PRECOMPUTE_RUNS.labels("skipped").inc()
+        return
+    except Exception as e:
+        logger.warning(f"Precomputing notes for transcript {result.transcript_id} failed: {e}")
+        PRECOMPUTE_RUNS.labels("failed").inc()
+        return
+    PRECOMPUTE_RUNS.labels("completed").inc()
+    logger.info(f"Precomputed notes for transcript {result.transcript_id} in {time.perf_counter() - started:.1f}s")
+
+
+def schedule_precompute(result: TranscriptionResponse):
+    """Starts precomputing a completed transcript's notes and chat index, if enabled."""
+    if not settings.PRECOMPUTE_ON_TRANSCRIPT or result.error or not result.text:
+        return
+    task = asyncio.create_task(_precompute(result))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
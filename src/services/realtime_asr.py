@@ -0,0 +1,130 @@
+# src/services/realtime_asr.py
+# Real-time speech recognition behind a small interface, so live meetings can run
+# against AssemblyAI's streaming API or, with ASR_PROVIDER=stub, a local stand-in.
+import asyncio
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, NamedTuple, Union
+
+from src.core.config import settings, logger
+from src.core.registry import registry
+from src.schemas.transcription import Utterance
+
+
+class RealtimeTranscript(NamedTuple):
+    """A partial (still changing) or final utterance recognized from streamed audio."""
+    utterance: Utterance
+    is_final: bool
+
+
+class RealtimeASRSession(ABC):
+    """One audio stream. Audio goes in with send_audio; recognized utterances come out of events()."""
+
+    @abstractmethod
+    async def send_audio(self, frame: bytes):
+        """Sends a frame of 16-bit mono PCM audio at the session's sample rate."""
+
+    @abstractmethod
+    async def close(self):
+        """Ends the audio stream. events() finishes once the remaining utterances are delivered."""
+
+    @abstractmethod
+    def events(self) -> AsyncIterator[RealtimeTranscript]:
+        """Yields recognized utterances until the session ends; raises ConnectionError if it fails."""
+
+
+class RealtimeASRBackend(ABC):
+    @abstractmethod
+    async def open_session(self, sample_rate: int) -> RealtimeASRSession:
+        """Opens a streaming recognition session."""
+
+
+_END = object()
+
+
+class QueuedSession(RealtimeASRSession):
+    """Base for sessions whose results arrive through callbacks: they are queued for events()."""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def _emit(self, item: Union[RealtimeTranscript, Exception, object]):
+        self._queue.put_nowait(item)
+
+    async def events(self) -> AsyncIterator[RealtimeTranscript]:
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _end(self):
+        self._emit(_END)
+
+
+class AssemblyAIRealtimeSession(QueuedSession):
+    """
+    Wraps the SDK's RealtimeTranscriber. Its callbacks run on SDK threads and
+    are handed to the event loop. Streaming recognition has no speaker labels.
+    """
+
+    def __init__(self, aai, sample_rate: int):
+        super().__init__()
+        self._aai = aai
+        self._loop = asyncio.get_running_loop()
+        self._transcriber = aai.RealtimeTranscriber(
+            sample_rate=sample_rate,
+            on_data=self._on_data,
+            on_error=self._on_error,
+            on_close=lambda: self._loop.call_soon_threadsafe(self._end),
+        )
+
+    def _on_data(self, transcript):
+        if not transcript.text:
+            return
+        utterance = Utterance(
+            start=transcript.audio_start, end=transcript.audio_end,
+            text=transcript.text, confidence=transcript.confidence,
+        )
+        is_final = isinstance(transcript, self._aai.RealtimeFinalTranscript)
+        self._loop.call_soon_threadsafe(self._emit, RealtimeTranscript(utterance, is_final))
+
+    def _on_error(self, error):
+        logger.error(f"AssemblyAI real-time error: {error}")
+        self._loop.call_soon_threadsafe(self._emit, ConnectionError(f"Real-time transcription failed: {error}"))
+
+    async def connect(self):
+        await asyncio.to_thread(self._transcriber.connect)
+
+    async def send_audio(self, frame: bytes):
+        self._transcriber.stream(frame) # Queued and sent by the SDK's writer thread
+
+    async def close(self):
+        await asyncio.to_thread(self._transcriber.close)
+        self._end()
+
+
+class AssemblyAIRealtimeASR(RealtimeASRBackend):
+    def __init__(self, aai):
+        self._aai = aai
+
+    async def open_session(self, sample_rate: int) -> RealtimeASRSession:
+        session = AssemblyAIRealtimeSession(self._aai, sample_rate)
+        await session.connect()
+        return session
+
+
+def _build_realtime_asr() -> RealtimeASRBackend:
+    if settings.ASR_PROVIDER == "stub":
+        from src.services.stub_providers import StubRealtimeASR
+        logger.info("Using stub real-time ASR; no audio is sent to AssemblyAI.")
+        return StubRealtimeASR()
+    return AssemblyAIRealtimeASR(registry.get("assemblyai"))
+
+registry.register("realtime_asr", _build_realtime_asr)
+
+
+def get_realtime_asr() -> RealtimeASRBackend:
+    """Returns the real-time ASR backend. Raises ValueError if AssemblyAI is not configured."""
+    return registry.get("realtime_asr")
@@ -0,0 +1,169 @@
+# src/services/retrieval.py
+import hashlib
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from src.core.config import settings, logger
+from src.schemas.transcription import Utterance
+from src.services.text_chunking import split_into_units, format_utterance
+from src.services.token_budget import count_tokens
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+# Scripts written without spaces are indexed per character
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases and splits text into word tokens; CJK runs are split per character."""
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if _CJK.search(word):
+            tokens.extend(ch for ch in word if not ch.isspace())
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def format_timestamp(ms: int) -> str:
+    """Formats milliseconds as MM:SS (or H:MM:SS for long meetings)."""
+    seconds = ms // 1000
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+class BM25Index:
+    """Okapi BM25 index over a fixed list of documents."""
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.term_freqs: List[Counter] = [Counter(tokenize(doc)) for doc in documents]
+        self.doc_lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_doc_length = (sum(self.doc_lengths) / len(documents)) if documents else 0.0
+
+        doc_freqs: Counter = Counter()
+        for tf in self.term_freqs:
+            doc_freqs.update(tf.keys())
+        n = len(documents)
+        self.idf: Dict[str, float] = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()
+        }
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """Returns (document index, score) pairs for the best matches, best first."""
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        if not terms:
+            return []
+        scores = []
+        for i, tf in enumerate(self.term_freqs):
+            length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[i] / (self.avg_doc_length or 1))
+            score = 0.0
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + length_norm)
+            if score > 0:
+                scores.append((i, score))
+        scores.sort(key=lambda pair: pair[1], reverse=True)
+        return scores[:top_k]
+
+
+class TranscriptIndex:
+    """Lexical index over the utterances (or sentences) of one transcript."""
+
+    def __init__(self, text: str, utterances: Optional[List[Utterance]] = None):
+        if utterances:
+            utterances = [utt for utt in utterances if utt.text and utt.text.strip()]
+            self.passages = [
+                f"[{format_timestamp(utt.start)}] {format_utterance(utt)}" for utt in utterances
+            ]
+        else:
+            self.passages = split_into_units(text)
+        self.bm25 = BM25Index(self.passages)
+
+    def retrieve(self, query: str, top_k: int, max_tokens: Optional[int] = None) -> List[str]:
+        """
+        Returns the top_k passages most relevant to the query in transcript order,
+        keeping the best ones that fit in max_tokens if given.
+        """
+        hits = [i for i, _ in self.bm25.search(query, top_k)]
+        if not hits:
+            # Nothing matched lexically; fall back to the opening of the meeting
+            hits = list(range(min(top_k, len(self.passages))))
+        if max_tokens is not None:
+            kept, budget = [], max_tokens
+            for i in hits:
+                cost = count_tokens(self.passages[i]) + 1
+                if cost <= budget:
+                    kept.append(i)
+                    budget -= cost
+            hits = kept
+        return [self.passages[i] for i in sorted(hits)]
+
+
+# Indexes are built once per transcript and kept in a small LRU keyed by content hash
+_indexes: "OrderedDict[str, TranscriptIndex]" = OrderedDict()
+
+
+def transcript_key(text: str) -> str:
+    """Content hash identifying a transcript."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cached_transcript_index(text: str) -> Optional[TranscriptIndex]:
+    """Returns the cached index for a transcript, or None if it has not been built."""
+    key = transcript_key(text)
+    index = _indexes.get(key)
+    if index is not None:
+        _indexes.move_to_end(key)
+    return index
+
+
+def cache_transcript_index(text: str, index: TranscriptIndex):
+    """Adds an index built elsewhere (e.g. off the event loop) to the cache."""
+    _indexes[transcript_key(text)] = index
+    while len(_indexes) > settings.CHAT_INDEX_CACHE_SIZE:
+        _indexes.popitem(last=False)
+
+
+def get_transcript_index(text: str, utterances: Optional[List[Utterance]] = None) -> TranscriptIndex:
+    """Returns the cached index for a transcript, building it on first use."""
+    index = cached_transcript_index(text)
+    if index is not None:
+        return index
+
+    index = TranscriptIndex(text, utterances)
+    cache_transcript_index(text, index)
+    logger.info(f"Built chat index over {len(index.passages)} passages")
+    return index
+
+
+def full_context_fits(text: str, max_tokens: Optional[int] = None) -> bool:
+    """Whether a transcript is short enough to be sent whole with a chat question."""
+    return len(text) <= settings.CHAT_FULL_CONTEXT_MAX_CHARS and (max_tokens is None or count_tokens(text) <= max_tokens)
+
+
+def build_chat_context(
+    text: str,
+    query: str,
+    utterances: Optional[List[Utterance]] = None,
+    max_tokens: Optional[int] = None,
+    index: Optional[TranscriptIndex] = None,
+) -> str:
+    """
+    Returns the transcript context to send with a chat question: the full text for
+    short transcripts, otherwise only the CHAT_TOP_K most relevant passages. With
+    max_tokens, the full text must also fit in it and only the passages that fit
+    are kept. index, if given, is the transcript's prebuilt index.
+    """
+    if full_context_fits(text, max_tokens):
+        return text
+    index = index or get_transcript_index(text, utterances)
+    passages = index.retrieve(query, settings.CHAT_TOP_K, max_tokens)
+    return "\n".join(passages)
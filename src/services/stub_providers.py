@@ -0,0 +1,164 @@
+# src/services/stub_providers.py
+# Local stand-ins for AssemblyAI and Groq with configurable latency, jitter and
+# failure rate, so the API can be benchmarked without keys or network access.
+# Enabled with ASR_PROVIDER=stub and LLM_PROVIDER=stub.
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.core.config import settings
+from src.schemas.transcription import TranscriptionResponse, Utterance
+from src.services.realtime_asr import QueuedSession, RealtimeASRBackend, RealtimeASRSession, RealtimeTranscript
+
+_STUB_SENTENCES = [
+    "Let's start with the quarterly budget review.",
+    "I'll send the updated forecast by Friday.",
+    "We need to decide on the hiring plan before the next sprint.",
+    "The launch date moves to the second week of next month.",
+    "Can someone own the customer feedback summary?",
+    "I can take that and share it on Monday.",
+    "Marketing wants a draft of the announcement next week.",
+    "Let's revisit the vendor contract in the next meeting.",
+]
+
+
+def _stub_delay_seconds(latency_ms: int) -> float:
+    jitter = random.uniform(-settings.STUB_JITTER_MS, settings.STUB_JITTER_MS)
+    return max(latency_ms + jitter, 0) / 1000
+
+
+def _maybe_fail(provider: str):
+    if random.random() < settings.STUB_FAILURE_RATE:
+        raise ConnectionError(f"Simulated {provider} failure")
+
+
+# ASR
+def stub_transcribe_file_sync(filepath: str) -> TranscriptionResponse:
+    """
+    Blocking stand-in for an AssemblyAI transcription. Produces a deterministic
+    transcript derived from the file content after STUB_ASR_LATENCY_MS.
+    """
+    time.sleep(_stub_delay_seconds(settings.STUB_ASR_LATENCY_MS))
+    _maybe_fail("ASR")
+
+    with open(filepath, "rb") as f:
+        digest = hashlib.sha256(f.read(1024 * 1024)).hexdigest()
+    rng = random.Random(digest)
+    utterances = []
+    start = 0
+    for i in range(rng.randint(8, 24)):
+        text = rng.choice(_STUB_SENTENCES)
+        end = start + 1000 + 60 * len(text)
+        utterances.append(Utterance(speaker="AB"[i % 2], start=start, end=end, text=text, confidence=0.95))
+        start = end + 250
+    return TranscriptionResponse(
+        status="TranscriptStatus.completed",
+        transcript_id=f"stub-{digest[:16]}",
+        text=" ".join(utt.text for utt in utterances),
+        language_code="en",
+        utterances=utterances,
+    )
+
+
+class StubRealtimeSession(QueuedSession):
+    """
+    Recognizes one stub sentence per STUB_REALTIME_UTTERANCE_MS of streamed audio,
+    revealing it word by word as partial transcripts while the audio arrives.
+    """
+
+    def __init__(self, sample_rate: int):
+        super().__init__()
+        self._bytes_per_ms = sample_rate * 2 / 1000
+        self._received = 0
+        self._utterance_start = 0
+        self._rng = random.Random(sample_rate)
+        self._sentence = self._rng.choice(_STUB_SENTENCES)
+
+    def _utterance(self, position_ms: int, words: int) -> Utterance:
+        return Utterance(
+            start=self._utterance_start, end=position_ms,
+            text=" ".join(self._sentence.split()[:words]), confidence=0.95,
+        )
+
+    async def send_audio(self, frame: bytes):
+        _maybe_fail("real-time ASR")
+        self._received += len(frame)
+        position_ms = int(self._received / self._bytes_per_ms)
+        while position_ms - self._utterance_start >= settings.STUB_REALTIME_UTTERANCE_MS:
+            end = self._utterance_start + settings.STUB_REALTIME_UTTERANCE_MS
+            self._emit(RealtimeTranscript(self._utterance(end, len(self._sentence.split())), is_final=True))
+            self._utterance_start = end
+            self._sentence = self._rng.choice(_STUB_SENTENCES)
+        words = len(self._sentence.split()) * (position_ms - self._utterance_start) // settings.STUB_REALTIME_UTTERANCE_MS
+        if words:
+            self._emit(RealtimeTranscript(self._utterance(position_ms, words), is_final=False))
+
+    async def close(self):
+        position_ms = int(self._received / self._bytes_per_ms)
+        words = len(self._sentence.split()) * (position_ms - self._utterance_start) // settings.STUB_REALTIME_UTTERANCE_MS
+        if words:
+            self._emit(RealtimeTranscript(self._utterance(position_ms, words), is_final=True))
+        self._end()
+
+
+class StubRealtimeASR(RealtimeASRBackend):
+    async def open_session(self, sample_rate: int) -> RealtimeASRSession:
+        return StubRealtimeSession(sample_rate)
+
+
+# LLM
+class StubChatModel(BaseChatModel):
+    """
+    Chat model that answers after STUB_LLM_LATENCY_MS without calling a provider.
+    Prompts asking for JSON get a valid action items object; others get prose.
+    """
+    temperature: float = 0.1
+    tokens_per_second: float = 200.0 # Streaming pace after the first token
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(m.content) for m in messages)
+        if "JSON" in prompt:
+            return json.dumps({"action_items": [_STUB_SENTENCES[1], _STUB_SENTENCES[5]]})
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        rng = random.Random(digest)
+        return " ".join(rng.sample(_STUB_SENTENCES, 3))
+
+    def _result(self, messages: List[BaseMessage], text: str) -> ChatResult:
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4}
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text))],
+            llm_output={"token_usage": usage, "model_name": "stub"},
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(_stub_delay_seconds(settings.STUB_LLM_LATENCY_MS))
+        _maybe_fail("LLM")
+        return self._result(messages, self._reply(messages))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(_stub_delay_seconds(settings.STUB_LLM_LATENCY_MS))
+        _maybe_fail("LLM")
+        return self._result(messages, self._reply(messages))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(_stub_delay_seconds(settings.STUB_LLM_LATENCY_MS))
+        _maybe_fail("LLM")
+        for i, word in enumerate(self._reply(messages).split(" ")):
+            token = word if i == 0 else f" {word}"
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(1 / self.tokens_per_second)
@@ -0,0 +1,114 @@
+# src/services/text_chunking.py
+import hashlib
+import re
+from typing import List, Optional
+
+from src.schemas.transcription import Utterance
+
+# Sentence boundaries for transcripts without utterances (Latin, CJK and Devanagari punctuation)
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？।])\s+")
+
+# Scripts that tokenize at about one token per character
+_DENSE_SCRIPT = re.compile(r"[\u0900-\u097f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+
+# With content-defined chunking, about one unit in this many ends a chunk once it is half full
+_BOUNDARY_MODULUS = 6
+
+
+def format_utterance(utterance: Utterance) -> str:
+    """Formats a single utterance as a speaker-labelled transcript line."""
+    speaker = utterance.speaker or "Unknown"
+    return f"Speaker {speaker}: {utterance.text.strip()}"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of a text: about 4 characters per token, but one per
+    character in CJK and Devanagari, which tokenizers split much more finely.
+    """
+    dense = len(_DENSE_SCRIPT.findall(text))
+    return dense + (len(text) - dense) // 4
+
+
+def split_into_units(text: str, utterances: Optional[List[Utterance]] = None) -> List[str]:
+    """
+    Splits a transcript into the smallest units a chunk boundary may fall between.
+    Uses utterances when available, otherwise lines and then sentences of the raw text.
+    """
+    if utterances:
+        return [format_utterance(utt) for utt in utterances if utt.text and utt.text.strip()]
+
+    units = []
+    for line in text.splitlines():
+        units.extend(s.strip() for s in _SENTENCE_END.split(line) if s.strip())
+    return units
+
+
+def _split_oversized(unit: str, chunk_size: int) -> List[str]:
+    """Hard-splits a single unit longer than chunk_size on whitespace."""
+    pieces, current = [], ""
+    for word in unit.split():
+        if current and len(current) + 1 + len(word) > chunk_size:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _is_boundary(unit: str) -> bool:
+    """Whether a chunk may end after this unit; a stable hash, so it is the same in every process."""
+    digest = hashlib.blake2b(unit.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % _BOUNDARY_MODULUS == 0
+
+
+def chunk_units(
+    units: List[str],
+    chunk_size: int,
+    chunk_overlap: int = 0,
+    separator: str = "\n",
+    content_defined: bool = False,
+) -> List[str]:
+    """
+    Greedily packs units into chunks of at most chunk_size characters without
+    splitting a unit. Each chunk repeats up to chunk_overlap characters of
+    trailing units from the previous chunk for context.
+
+    With content_defined=True a chunk that is at least half full also ends after
+    any unit whose hash marks it as a boundary. Boundaries then depend on the
+    units themselves rather than on their position, so editing or appending to
+    a transcript changes only the chunks around the edit.
+    """
+    expanded: List[str] = []
+    for unit in units:
+        expanded.extend(_split_oversized(unit, chunk_size) if len(unit) > chunk_size else [unit])
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+    at_boundary = False
+    for unit in expanded:
+        added_len = len(unit) + (len(separator) if current else 0)
+        if current and (at_boundary or current_len + added_len > chunk_size):
+            chunks.append(separator.join(current))
+            # Carry trailing units into the next chunk as overlap
+            overlap: List[str] = []
+            overlap_len = 0
+            for prev in reversed(current):
+                if overlap_len + len(prev) + len(separator) > chunk_overlap:
+                    break
+                overlap.insert(0, prev)
+                overlap_len += len(prev) + len(separator)
+            if overlap_len + len(unit) > chunk_size:
+                overlap, overlap_len = [], 0
+            current = overlap
+            current_len = max(overlap_len - len(separator), 0)
+            added_len = len(unit) + (len(separator) if current else 0)
+        current.append(unit)
+        current_len += added_len
+        at_boundary = content_defined and current_len >= chunk_size // 2 and _is_boundary(unit)
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
@@ -0,0 +1,78 @@
+# src/services/token_budget.py
+# Pre-flight token counting for LLM prompts. Uses tiktoken when it is installed
+# and TOKEN_COUNTER allows it, otherwise the estimate from text_chunking. Counts
+# are local approximations of the provider's tokenizer, close enough to route
+# inputs before anything is sent.
+from typing import List, Optional
+
+from src.core.config import settings, logger
+from src.core.registry import registry
+from src.schemas.llm import PromptBudget
+from src.services.text_chunking import estimate_tokens
+
+
+def _build_tokenizer():
+    """Returns a tiktoken encoding, or None to use the heuristic estimate."""
+    if settings.TOKEN_COUNTER == "heuristic":
+        return None
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(settings.TOKEN_ENCODING)
+    except Exception as e:
+        logger.info(f"tiktoken unavailable ({e}); counting prompt tokens heuristically")
+        return None
+
+registry.register("tokenizer", _build_tokenizer)
+
+
+def tokenizer_name() -> str:
+    return f"tiktoken:{settings.TOKEN_ENCODING}" if registry.get("tokenizer") is not None else "heuristic"
+
+
+def count_tokens(text: str) -> int:
+    """Counts the tokens of a text locally."""
+    encoding = registry.get("tokenizer")
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def prompt_tokens(template: str, *inputs: str) -> int:
+    """Tokens of a prompt: its template plus the inputs substituted into it."""
+    return count_tokens(template) + sum(count_tokens(value) for value in inputs)
+
+
+def check_request_limit(chain: str, tokens: int):
+    """Rejects a request before any call is made if it exceeds LLM_MAX_REQUEST_TOKENS."""
+    if settings.LLM_MAX_REQUEST_TOKENS and tokens > settings.LLM_MAX_REQUEST_TOKENS:
+        logger.warning(f"Rejected {chain} request of {tokens} tokens (limit {settings.LLM_MAX_REQUEST_TOKENS})")
+        raise ValueError(
+            f"Input is too large: about {tokens} tokens, more than the limit of {settings.LLM_MAX_REQUEST_TOKENS}."
+        )
+
+
+def pack_by_tokens(units: List[str], max_tokens: int, separator: str = "\n") -> List[str]:
+    """Greedily packs units into chunks of at most max_tokens; a longer unit becomes a chunk of its own."""
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        tokens = count_tokens(unit) + 1
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += tokens
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def budget_decision(chain: str, prompt: int, budget: int, route: str, sent: Optional[int] = None, chunks: int = 1) -> PromptBudget:
+    """Builds and logs the budget decision for a call."""
+    result = PromptBudget(
+        chain=chain, tokenizer=tokenizer_name(), prompt_tokens=prompt, budget_tokens=budget,
+        route=route, sent_tokens=prompt if sent is None else sent, chunks=chunks,
+    )
+    logger.info(f"Prompt budget for {chain}: {prompt} tokens of {budget}, route {route}, {result.sent_tokens} tokens sent in {chunks} chunk(s)")
+    return result
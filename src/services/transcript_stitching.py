@@ -0,0 +1,121 @@
+# src/services/transcript_stitching.py
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+from src.schemas.transcription import TranscriptionResponse, Utterance
+
+
+def plan_segments(duration_ms: int, segment_ms: int, overlap_ms: int) -> List[Tuple[int, int]]:
+    """
+    Splits [0, duration) into (start, end) windows of segment_ms where each window
+    overlaps the previous one by overlap_ms.
+    """
+    if duration_ms <= segment_ms:
+        return [(0, duration_ms)]
+    step = segment_ms - overlap_ms
+    if step <= 0:
+        raise ValueError("Segment length must be greater than the overlap.")
+    segments = []
+    start = 0
+    while True:
+        end = min(start + segment_ms, duration_ms)
+        segments.append((start, end))
+        if end >= duration_ms:
+            return segments
+        start += step
+
+
+def _speaker_name(index: int) -> str:
+    """Returns AssemblyAI-style speaker labels: A..Z, then AA, AB, ..."""
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord("A") + remainder) + name
+    return name
+
+
+def _shift(utterances: List[Utterance], offset_ms: int) -> List[Utterance]:
+    return [utt.model_copy(update={"start": utt.start + offset_ms, "end": utt.end + offset_ms}) for utt in utterances]
+
+
+def _match_speakers(
+    previous: List[Utterance],
+    current: List[Utterance],
+    window: Tuple[int, int],
+    next_index: int,
+) -> Tuple[Dict[str, str], int]:
+    """
+    Maps the current segment's speaker labels onto global labels by matching
+    utterances inside the overlap window: pairs that overlap in time and say the
+    same thing vote for the same speaker. Unmatched labels get new global labels.
+    """
+    window_start, window_end = window
+    votes: Dict[Tuple[str, str], float] = defaultdict(float)
+    prev_in_window = [u for u in previous if u.end > window_start and u.start < window_end]
+    curr_in_window = [u for u in current if u.end > window_start and u.start < window_end]
+    for cur in curr_in_window:
+        for prev in prev_in_window:
+            time_overlap = min(cur.end, prev.end) - max(cur.start, prev.start)
+            if time_overlap <= 0 or cur.speaker is None or prev.speaker is None:
+                continue
+            similarity = SequenceMatcher(None, cur.text.lower(), prev.text.lower()).ratio()
+            votes[(cur.speaker, prev.speaker)] += time_overlap * similarity
+
+    mapping: Dict[str, str] = {}
+    used = set()
+    for (cur_label, global_label), _ in sorted(votes.items(), key=lambda item: item[1], reverse=True):
+        if cur_label not in mapping and global_label not in used:
+            mapping[cur_label] = global_label
+            used.add(global_label)
+
+    for utt in current:
+        if utt.speaker is not None and utt.speaker not in mapping:
+            mapping[utt.speaker] = _speaker_name(next_index)
+            next_index += 1
+    return mapping, next_index
+
+
+def stitch_transcripts(
+    segments: List[Tuple[int, int]],
+    results: List[TranscriptionResponse],
+) -> TranscriptionResponse:
+    """
+    Merges per-segment transcripts into one. Utterance offsets are shifted to the
+    original timeline, the overlap between neighbouring segments is de-duplicated
+    by cutting at its midpoint, and speaker labels are reconciled across segments.
+    """
+    merged: List[Utterance] = []
+    previous: List[Utterance] = []
+    next_index = 0
+
+    for i, ((seg_start, _), result) in enumerate(zip(segments, results)):
+        current = _shift(result.utterances or [], seg_start)
+
+        if i == 0:
+            labels = sorted({u.speaker for u in current if u.speaker is not None})
+            mapping = {label: _speaker_name(n) for n, label in enumerate(labels)}
+            next_index = len(labels)
+        else:
+            window = (seg_start, segments[i - 1][1])
+            mapping, next_index = _match_speakers(previous, current, window, next_index)
+        current = [u.model_copy(update={"speaker": mapping.get(u.speaker, u.speaker)}) for u in current]
+        previous, kept = current, current
+
+        if i > 0:
+            cut = (seg_start + segments[i - 1][1]) // 2
+            merged = [u for u in merged if u.start < cut]
+            last_end = merged[-1].end if merged else 0
+            # Drop utterances the previous segment already covered past the cut
+            kept = [u for u in current if u.start >= cut and u.end > last_end]
+        merged.extend(kept)
+
+    languages = Counter(r.language_code for r in results if r.language_code)
+    return TranscriptionResponse(
+        status=results[0].status,
+        transcript_id="+".join(r.transcript_id for r in results),
+        text=" ".join(u.text for u in merged),
+        language_code=languages.most_common(1)[0][0] if languages else None,
+        utterances=merged,
+    )
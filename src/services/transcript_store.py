@@ -0,0 +1,340 @@
+# src/services/transcript_store.py
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.core.config import settings, logger
+from src.core.registry import registry
+from src.schemas.transcription import (
+    SearchHit,
+    SearchResponse,
+    StoredTranscript,
+    TranscriptionResponse,
+    TranscriptListResponse,
+    Utterance,
+    UtterancePage,
+)
+from src.services.retrieval import tokenize
+from src.services.text_chunking import split_into_units
+
+
+class UtteranceWindow(NamedTuple):
+    """A run of consecutive utterances around one or more search hits in a stored transcript."""
+    transcript_id: str
+    filename: Optional[str]
+    created_at: float
+    score: float
+    utterances: List[Utterance]
+
+
+class TranscriptStore:
+    """
+    Completed transcripts in a local SQLite file, with an FTS5 index over their
+    utterances. Utterances are indexed as retrieval.tokenize() tokens, so CJK text
+    is searchable per character like the chat index, and hits are ranked by BM25.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                " id TEXT PRIMARY KEY,"
+                " filename TEXT,"
+                " language_code TEXT,"
+                " text TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " duration_ms INTEGER NOT NULL,"
+                " utterance_count INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS transcripts_created_at ON transcripts (created_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS utterances ("
+                " id INTEGER PRIMARY KEY,"
+                " transcript_id TEXT NOT NULL,"
+                " idx INTEGER NOT NULL,"
+                " speaker TEXT,"
+                " start_ms INTEGER NOT NULL,"
+                " end_ms INTEGER NOT NULL,"
+                " confidence REAL NOT NULL,"
+                " text TEXT NOT NULL,"
+                " UNIQUE (transcript_id, idx))"
+            )
+            # rowid matches utterances.id
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS utterance_fts"
+                " USING fts5(tokens, tokenize='unicode61 remove_diacritics 2')"
+            )
+            # Per-term document counts, used to drop near-ubiquitous query terms
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS utterance_vocab USING fts5vocab(utterance_fts, 'row')")
+        logger.info(f"Transcript store ready at {path}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Opens a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, result: TranscriptionResponse, filename: Optional[str] = None) -> bool:
+        """Stores and indexes a completed transcript. Returns False if it was already stored."""
+        utterances = result.utterances or [
+            Utterance(start=0, end=0, text=unit, confidence=0.0)
+            for unit in split_into_units(result.text or "", None)
+        ]
+        with self._lock, self._connect() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO transcripts"
+                " (id, filename, language_code, text, created_at, duration_ms, utterance_count)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.transcript_id, filename, result.language_code, result.text or "", time.time(),
+                    max((utt.end for utt in utterances), default=0), len(utterances),
+                ),
+            ).rowcount
+            if not inserted:
+                return False
+            for index, utt in enumerate(utterances):
+                row_id = conn.execute(
+                    "INSERT INTO utterances (transcript_id, idx, speaker, start_ms, end_ms, confidence, text)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (result.transcript_id, index, utt.speaker, utt.start, utt.end, utt.confidence, utt.text),
+                ).lastrowid
+                conn.execute(
+                    "INSERT INTO utterance_fts (rowid, tokens) VALUES (?, ?)",
+                    (row_id, " ".join(tokenize(utt.text))),
+                )
+        logger.info(f"Stored transcript {result.transcript_id} with {len(utterances)} utterances")
+        return True
+
+    def get(self, transcript_id: str) -> Optional[StoredTranscript]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, filename, language_code, created_at, duration_ms, utterance_count, text"
+                " FROM transcripts WHERE id = ?",
+                (transcript_id,),
+            ).fetchone()
+        return _stored_transcript(row) if row else None
+
+    def list(self, offset: int = 0, limit: int = 50) -> TranscriptListResponse:
+        """Lists stored transcripts without their text, newest first."""
+        with self._connect() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+            rows = conn.execute(
+                "SELECT id, filename, language_code, created_at, duration_ms, utterance_count, NULL"
+                " FROM transcripts ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return TranscriptListResponse(
+            total=total, offset=offset, limit=limit, transcripts=[_stored_transcript(row) for row in rows]
+        )
+
+    def get_utterances(self, transcript_id: str, offset: int = 0, limit: int = 100) -> Optional[UtterancePage]:
+        """Returns a page of a transcript's utterances, or None if the transcript is unknown."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT utterance_count FROM transcripts WHERE id = ?", (transcript_id,)).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute(
+                "SELECT speaker, start_ms, end_ms, text, confidence FROM utterances"
+                " WHERE transcript_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                (transcript_id, offset, limit),
+            ).fetchall()
+        return UtterancePage(
+            transcript_id=transcript_id, total=row[0], offset=offset, limit=limit,
+            utterances=[
+                Utterance(speaker=speaker, start=start, end=end, text=text, confidence=confidence)
+                for speaker, start, end, text, confidence in rows
+            ],
+        )
+
+    def search(
+        self,
+        query: str,
+        offset: int = 0,
+        limit: int = 20,
+        transcript_id: Optional[str] = None,
+        match_all: bool = True,
+    ) -> SearchResponse:
+        """
+        Ranks utterances matching the query by BM25 across all stored transcripts,
+        or within one. With match_all=False an utterance needs only one query term.
+        """
+        terms = ['"' + token.replace('"', '""') + '"' for token in dict.fromkeys(tokenize(query))]
+        if not terms:
+            return SearchResponse(query=query, total=0, offset=offset, limit=limit, hits=[])
+        match = (" AND " if match_all else " OR ").join(terms)
+
+        with self._connect() as conn:
+            scope, params = "", [match]
+            if transcript_id:
+                # A transcript's utterances are inserted together, so their ids form one range
+                bounds = conn.execute(
+                    "SELECT MIN(id), MAX(id) FROM utterances WHERE transcript_id = ?", (transcript_id,)
+                ).fetchone()
+                if bounds[0] is None:
+                    return SearchResponse(query=query, total=0, offset=offset, limit=limit, hits=[])
+                scope, params = " AND rowid BETWEEN ? AND ?", [match, *bounds]
+
+            total = conn.execute(f"SELECT COUNT(*) FROM utterance_fts WHERE utterance_fts MATCH ?{scope}", params).fetchone()[0]
+            # Rank inside the index first and join only the requested page
+            rows = conn.execute(
+                "SELECT u.transcript_id, t.filename, t.language_code, u.idx, u.speaker, u.start_ms, u.end_ms, u.text, f.score"
+                " FROM (SELECT rowid, bm25(utterance_fts) AS score FROM utterance_fts"
+                f"       WHERE utterance_fts MATCH ?{scope} ORDER BY score LIMIT ? OFFSET ?) f"
+                " JOIN utterances u ON u.id = f.rowid"
+                " JOIN transcripts t ON t.id = u.transcript_id"
+                " ORDER BY f.score",
+                params + [limit, offset],
+            ).fetchall()
+        hits = [
+            SearchHit(
+                transcript_id=row[0], filename=row[1], language_code=row[2], utterance_index=row[3],
+                speaker=row[4], start=row[5], end=row[6], text=row[7], score=-row[8],
+            )
+            for row in rows
+        ]
+        return SearchResponse(query=query, total=total, offset=offset, limit=limit, hits=hits)
+
+    def retrieve_windows(
+        self,
+        query: str,
+        max_hits: int,
+        radius: int,
+        transcript_ids: Optional[List[str]] = None,
+    ) -> List[UtteranceWindow]:
+        """
+        Finds the max_hits utterances most relevant to a free-form question across
+        stored transcripts (or the given ones), widens each by radius utterances on
+        both sides and merges windows that overlap. Windows are returned best first,
+        scored by the sum of the BM25 scores of the hits they contain.
+        """
+        with self._connect() as conn:
+            match = self._question_match(conn, query)
+            if match is None:
+                return []
+            scope, params = "", [match]
+            if transcript_ids:
+                bounds = conn.execute(
+                    "SELECT MIN(id), MAX(id) FROM utterances"
+                    f" WHERE transcript_id IN ({','.join('?' * len(transcript_ids))}) GROUP BY transcript_id",
+                    transcript_ids,
+                ).fetchall()
+                if not bounds:
+                    return []
+                scope = " AND (" + " OR ".join("rowid BETWEEN ? AND ?" for _ in bounds) + ")"
+                params += [bound for pair in bounds for bound in pair]
+
+            hits = conn.execute(
+                "SELECT u.transcript_id, u.idx, f.score"
+                " FROM (SELECT rowid, bm25(utterance_fts) AS score FROM utterance_fts"
+                f"       WHERE utterance_fts MATCH ?{scope} ORDER BY score LIMIT ?) f"
+                " JOIN utterances u ON u.id = f.rowid",
+                params + [max_hits],
+            ).fetchall()
+
+            by_transcript: Dict[str, List[Tuple[int, float]]] = {}
+            for transcript_id, idx, score in hits:
+                by_transcript.setdefault(transcript_id, []).append((idx, -score))
+            spans = []
+            for transcript_id, transcript_hits in by_transcript.items():
+                transcript_hits.sort()
+                first, last, total = transcript_hits[0][0] - radius, transcript_hits[0][0] + radius, 0.0
+                for idx, score in transcript_hits:
+                    if idx - radius > last + 1:
+                        spans.append((transcript_id, first, last, total))
+                        first, total = idx - radius, 0.0
+                    last, total = idx + radius, total + score
+                spans.append((transcript_id, first, last, total))
+            spans.sort(key=lambda span: span[3], reverse=True)
+
+            windows = []
+            for transcript_id, first, last, total in spans:
+                filename, created_at = conn.execute(
+                    "SELECT filename, created_at FROM transcripts WHERE id = ?", (transcript_id,)
+                ).fetchone()
+                rows = conn.execute(
+                    "SELECT speaker, start_ms, end_ms, text, confidence FROM utterances"
+                    " WHERE transcript_id = ? AND idx BETWEEN ? AND ? ORDER BY idx",
+                    (transcript_id, max(first, 0), last),
+                ).fetchall()
+                windows.append(UtteranceWindow(
+                    transcript_id=transcript_id, filename=filename, created_at=created_at, score=total,
+                    utterances=[
+                        Utterance(speaker=speaker, start=start, end=end, text=text, confidence=confidence)
+                        for speaker, start, end, text, confidence in rows
+                    ],
+                ))
+        return windows
+
+    def _question_match(self, conn: sqlite3.Connection, query: str) -> Optional[str]:
+        """
+        Builds an any-term MATCH expression for a natural-language question. Terms
+        found in more than CORPUS_CHAT_MAX_TERM_FREQUENCY of all utterances (filler
+        words in any language) are dropped, keeping at least the rarest indexed term.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return None
+        # The vocabulary holds terms as FTS5 stored them, with diacritics removed
+        folded = {token: _remove_diacritics(token) for token in tokens}
+        vocabulary_terms = list(set(folded.values()))
+        doc_counts = dict(conn.execute(
+            f"SELECT term, doc FROM utterance_vocab WHERE term IN ({','.join('?' * len(vocabulary_terms))})",
+            vocabulary_terms,
+        ).fetchall())
+        indexed = sorted((doc_counts[folded[token]], token) for token in tokens if folded[token] in doc_counts)
+        if not indexed:
+            return None
+        total = conn.execute("SELECT COUNT(*) FROM utterances").fetchone()[0] or 1
+        terms = [token for count, token in indexed if count <= total * settings.CORPUS_CHAT_MAX_TERM_FREQUENCY]
+        terms = terms or [indexed[0][1]]
+        return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+    def delete(self, transcript_id: str) -> bool:
+        """Removes a transcript and its index entries. Returns False if it was not stored."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "DELETE FROM utterance_fts WHERE rowid IN (SELECT id FROM utterances WHERE transcript_id = ?)",
+                (transcript_id,),
+            )
+            conn.execute("DELETE FROM utterances WHERE transcript_id = ?", (transcript_id,))
+            return conn.execute("DELETE FROM transcripts WHERE id = ?", (transcript_id,)).rowcount > 0
+
+
+def _remove_diacritics(token: str) -> str:
+    return "".join(ch for ch in unicodedata.normalize("NFKD", token) if not unicodedata.combining(ch))
+
+
+def _stored_transcript(row) -> StoredTranscript:
+    transcript_id, filename, language_code, created_at, duration_ms, utterance_count, text = row
+    return StoredTranscript(
+        transcript_id=transcript_id, filename=filename, language_code=language_code, created_at=created_at,
+        duration_ms=duration_ms, utterance_count=utterance_count, text=text,
+    )
+
+
+def _build_transcript_store() -> Optional[TranscriptStore]:
+    if not settings.TRANSCRIPT_STORE_PATH:
+        return None
+    return TranscriptStore(settings.TRANSCRIPT_STORE_PATH)
+
+registry.register("transcript_store", _build_transcript_store)
+
+
+def get_transcript_store() -> Optional[TranscriptStore]:
+    """Returns the shared transcript store, or None when it is disabled."""
+    return registry.get("transcript_store")
@@ -1,19 +1,81 @@
 # src/services/transcription_service.py
-import assemblyai as aai
+import asyncio
+import hashlib
+import json
 import os
+import time
 import uuid
-import shutil
-from fastapi import UploadFile, HTTPException, BackgroundTasks
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, NamedTuple, Optional, Set
+from fastapi import UploadFile, HTTPException
 
 from src.core.config import settings, logger
-from src.schemas.transcription import TranscriptionResponse, Utterance
+from src.core.cache import SQLiteCache
+from src.core.metrics import ASR_LATENCY, TRANSCRIPTION_JOBS, register_cache
+from src.core.registry import registry
+from src.core.singleflight import SingleFlight
+from src.schemas.transcription import TranscriptionResponse, TranscriptionJobResponse, Utterance
+from src.services.audio_processing import (
+    AudioProcessingError,
+    ffmpeg_available,
+    probe_duration,
+    extract_segment,
+    preprocess_audio,
+    scratch_dir,
+    sniff_media_type,
+)
+from src.services.transcript_stitching import plan_segments, stitch_transcripts
+from src.services.precompute import schedule_precompute
+from src.services.transcript_store import get_transcript_store
 
-# Configure AssemblyAI SDK
-if settings.ASSEMBLYAI_API_KEY:
+# The AssemblyAI SDK is imported and configured on first use, not at startup
+def _build_assemblyai():
+    if not settings.ASSEMBLYAI_API_KEY:
+        logger.error("AssemblyAI API Key not configured. Transcription service will not work.")
+        raise ValueError("AssemblyAI API Key is required but not configured.")
+    import assemblyai as aai
     aai.settings.api_key = settings.ASSEMBLYAI_API_KEY
-else:
-    logger.error("AssemblyAI API Key not configured. Transcription service will not work.")
-    raise ValueError("AssemblyAI API Key is required but not configured.")
+    return aai
+
+registry.register("assemblyai", _build_assemblyai)
+
+# The AssemblyAI SDK is blocking, so transcriptions run on a bounded thread pool
+# instead of the event loop.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.TRANSCRIPTION_MAX_WORKERS,
+    thread_name_prefix="transcription",
+)
+
+# Completed transcripts keyed by the SHA-256 of the uploaded audio
+def _build_transcript_cache() -> Optional[SQLiteCache]:
+    if not settings.TRANSCRIPT_CACHE_PATH:
+        return None
+    return SQLiteCache(settings.TRANSCRIPT_CACHE_PATH, settings.TRANSCRIPT_CACHE_MAX_BYTES)
+
+registry.register("transcript_cache", _build_transcript_cache)
+
+def _peek_transcript_cache_stats() -> Optional[dict]:
+    cache = registry.peek("transcript_cache")
+    return cache.stats() if cache is not None else None
+
+register_cache("transcript", _peek_transcript_cache_stats)
+
+# Bump when the TranscriptionConfig changes so stale transcripts are not served
+TRANSCRIPT_CACHE_VERSION = "v1"
+
+# Jobs for identical audio in flight at the same time share one transcription
+_transcription_flight: SingleFlight[TranscriptionResponse] = SingleFlight("transcription")
+
+# In-memory registry of background transcription jobs
+_jobs: Dict[str, TranscriptionJobResponse] = {}
+_job_tasks: Set[asyncio.Task] = set()
+# A job only counts as processing once it holds one of the transcription pool's worker slots
+_job_slots = asyncio.Semaphore(settings.TRANSCRIPTION_MAX_WORKERS)
+
+def transcription_available() -> bool:
+    """True if the configured ASR provider can accept work."""
+    return settings.ASR_PROVIDER == "stub" or bool(settings.ASSEMBLYAI_API_KEY)
 
 def cleanup_file(filepath: str):
     """Removes a file safely."""
@@ -24,76 +86,388 @@ def cleanup_file(filepath: str):
     except OSError as e:
         logger.error(f"Error cleaning up file {filepath}: {e}")
 
-async def process_audio_file(
-    file: UploadFile,
-    background_tasks: BackgroundTasks
-) -> TranscriptionResponse:
+class SavedUpload(NamedTuple):
+    """An upload written to the upload directory."""
+    path: str
+    audio_hash: str # SHA-256 hex digest of the content
+    size: int
+    media_type: str # Sniffed from the content, not taken from the client
+
+async def _iter_upload_file(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+SNIFF_BYTES = 64 # Leading bytes read before the media type is sniffed
+
+async def save_stream(chunks: AsyncIterator[bytes], filename: Optional[str]) -> SavedUpload:
     """
-    Saves the uploaded audio file temporarily, submits it to AssemblyAI for transcription
-    with speaker labels and language detection, and returns the results.
+    Writes an upload to disk chunk by chunk without blocking the event loop,
+    hashing it and sniffing its media type on the fly. Rejects unrecognised
+    content once the first SNIFF_BYTES have arrived and stops reading as soon as
+    MAX_UPLOAD_BYTES is exceeded.
     """
-    if not aai.settings.api_key:
-        raise HTTPException(status_code=503, detail="Transcription service is unavailable due to missing API key.")
-
-    _, file_extension = os.path.splitext(file.filename or "audio.tmp")
+    _, file_extension = os.path.splitext(filename or "audio.tmp")
     temp_filename = f"{uuid.uuid4()}{file_extension}"
     temp_filepath = os.path.join(settings.UPLOAD_DIR, temp_filename)
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    media_type = None
+
+    def sniff() -> str:
+        detected = sniff_media_type(head)
+        if detected is None:
+            raise HTTPException(status_code=415, detail="Unrecognized media content: not a supported audio/video file.")
+        return detected
 
     try:
         with open(temp_filepath, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        logger.info(f"Temporary file saved: {temp_filepath}")
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if media_type is None:
+                    # Clients may send the first bytes in pieces smaller than a container header
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                    if len(head) >= SNIFF_BYTES:
+                        media_type = sniff()
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"File exceeds the maximum upload size of {settings.MAX_UPLOAD_BYTES} bytes.")
+                digest.update(chunk)
+                await asyncio.to_thread(buffer.write, chunk)
+        if not head:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+        if media_type is None:
+            media_type = sniff()
+        logger.info(f"Temporary file saved: {temp_filepath} ({size} bytes, {media_type})")
+    except HTTPException:
+        cleanup_file(temp_filepath)
+        raise
     except Exception as e:
         logger.error(f"Could not save temporary file: {e}")
+        cleanup_file(temp_filepath)
         raise HTTPException(status_code=500, detail=f"Could not save file: {e}")
+    return SavedUpload(temp_filepath, digest.hexdigest(), size, media_type)
+
+async def save_upload_file(file: UploadFile) -> SavedUpload:
+    """Saves a multipart upload to the upload directory via save_stream."""
+    try:
+        return await save_stream(_iter_upload_file(file), file.filename)
     finally:
         await file.close()
 
-    background_tasks.add_task(cleanup_file, temp_filepath)
+def _transcript_cache_key(audio_hash: str) -> str:
+    """
+    Keys a transcript by its audio hash and by the settings that change the
+    output, so a stub transcript or one of differently processed audio is never
+    served for another configuration.
+    """
+    variant = json.dumps({
+        "provider": settings.ASR_PROVIDER,
+        "preprocess": settings.AUDIO_PREPROCESS,
+        "trim_silence": settings.AUDIO_TRIM_SILENCE,
+        "silence_threshold_db": settings.AUDIO_SILENCE_THRESHOLD_DB if settings.AUDIO_TRIM_SILENCE else None,
+        "segmented": settings.TRANSCRIPTION_SEGMENTED,
+        "segments": [
+            settings.TRANSCRIPTION_SEGMENT_MIN_SECONDS,
+            settings.TRANSCRIPTION_SEGMENT_SECONDS,
+            settings.TRANSCRIPTION_SEGMENT_OVERLAP_SECONDS,
+        ] if settings.TRANSCRIPTION_SEGMENTED else None,
+    }, sort_keys=True)
+    return f"{TRANSCRIPT_CACHE_VERSION}:{audio_hash}:{hashlib.sha256(variant.encode('utf-8')).hexdigest()[:16]}"
+
+def get_cached_transcript(audio_hash: str) -> Optional[TranscriptionResponse]:
+    """Returns a previously completed transcript for identical audio, if cached."""
+    transcript_cache = registry.get("transcript_cache")
+    if transcript_cache is None:
+        return None
+    try:
+        payload = transcript_cache.get(_transcript_cache_key(audio_hash))
+    except Exception as e:
+        logger.error(f"Transcript cache lookup failed: {e}")
+        return None
+    if payload is None:
+        return None
+    logger.info(f"Transcript cache hit for audio {audio_hash[:12]}")
+    return TranscriptionResponse.model_validate_json(payload)
+
+def store_cached_transcript(audio_hash: str, result: TranscriptionResponse):
+    """Caches a completed transcript under its audio hash and settings. Errors are never cached."""
+    transcript_cache = registry.get("transcript_cache")
+    if transcript_cache is None or result.error:
+        return
+    try:
+        transcript_cache.set(_transcript_cache_key(audio_hash), result.model_dump_json())
+    except Exception as e:
+        logger.error(f"Transcript cache write failed: {e}")
+
+async def save_to_store(result: TranscriptionResponse, filename: Optional[str]):
+    """Adds a completed transcript to the searchable transcript store, if enabled."""
+    if result.error or not result.text:
+        return
+    try:
+        store = await asyncio.to_thread(get_transcript_store)
+        if store is not None:
+            await asyncio.to_thread(store.save, result, filename)
+    except Exception as e:
+        logger.error(f"Could not store transcript {result.transcript_id}: {e}")
 
+def transcribe_file_sync(filepath: str) -> TranscriptionResponse:
+    """
+    Submits a local file to AssemblyAI with speaker labels and language detection
+    and blocks until the transcript is ready. Must not be called on the event loop.
+    """
+    if settings.ASR_PROVIDER == "stub":
+        from src.services.stub_providers import stub_transcribe_file_sync
+        return stub_transcribe_file_sync(filepath)
+
+    aai = registry.get("assemblyai")
     config = aai.TranscriptionConfig(
         speaker_labels=True,      # Enable speaker diarization
         language_detection=True   # Enable language detection (for multilingual)
     )
     transcriber = aai.Transcriber(config=config)
 
-    logger.info(f"Submitting file for transcription: {temp_filepath}")
+    logger.info(f"Submitting file for transcription: {filepath}")
+    started = time.perf_counter()
     try:
-        transcript = transcriber.transcribe(temp_filepath)
-        logger.info(f"Transcription completed for ID: {transcript.id}")
-
-        if transcript.status == aai.TranscriptStatus.error:
-            logger.error(f"Transcription failed: {transcript.error}")
-            return TranscriptionResponse(
-                status=str(transcript.status),
-                transcript_id=transcript.id,
-                error=transcript.error
-            )
-
-        utterance_list = []
-        if transcript.utterances:
-            utterance_list = [
-                Utterance(
-                    speaker=utt.speaker,
-                    start=utt.start,
-                    end=utt.end,
-                    text=utt.text,
-                    confidence=utt.confidence
-                ) for utt in transcript.utterances
-            ]
+        transcript = transcriber.transcribe(filepath)
+    except Exception:
+        ASR_LATENCY.labels("exception").observe(time.perf_counter() - started)
+        raise
+    ASR_LATENCY.labels("error" if transcript.status == aai.TranscriptStatus.error else "completed").observe(
+        time.perf_counter() - started
+    )
+    logger.info(f"Transcription completed for ID: {transcript.id}")
 
+    if transcript.status == aai.TranscriptStatus.error:
+        logger.error(f"Transcription failed: {transcript.error}")
         return TranscriptionResponse(
             status=str(transcript.status),
             transcript_id=transcript.id,
-            text=transcript.text,
-            language_code=getattr(transcript, 'language_code', None),
-            utterances=utterance_list,
-            error=transcript.error # Should be None if status is completed
+            error=transcript.error
         )
 
-    except Exception as e:
-        logger.error(f"An unexpected error occurred during transcription: {e}", exc_info=True)
-        # Attempt cleanup immediately if an exception occurs before background task runs
-        cleanup_file(temp_filepath)
-        raise HTTPException(status_code=500, detail=f"Transcription process failed: {e}")
+    utterance_list = []
+    if transcript.utterances:
+        utterance_list = [
+            Utterance(
+                speaker=utt.speaker,
+                start=utt.start,
+                end=utt.end,
+                text=utt.text,
+                confidence=utt.confidence
+            ) for utt in transcript.utterances
+        ]
+
+    return TranscriptionResponse(
+        status=str(transcript.status),
+        transcript_id=transcript.id,
+        text=transcript.text,
+        language_code=getattr(transcript, 'language_code', None),
+        utterances=utterance_list,
+        error=transcript.error # Should be None if status is completed
+    )
+
+async def _transcribe_segment(filepath: str, index: int) -> TranscriptionResponse:
+    """Transcribes one segment, retrying it alone with exponential backoff on failure."""
+    loop = asyncio.get_running_loop()
+    attempts = settings.TRANSCRIPTION_SEGMENT_RETRIES + 1
+    for attempt in range(1, attempts + 1):
+        try:
+            result = await loop.run_in_executor(_executor, transcribe_file_sync, filepath)
+            if result.error:
+                raise RuntimeError(result.error)
+            return result
+        except Exception as e:
+            if attempt == attempts:
+                raise RuntimeError(f"Segment {index} failed after {attempts} attempts: {e}")
+            delay = 2 ** attempt
+            logger.warning(f"Segment {index} attempt {attempt} failed: {e}. Retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+async def transcribe_file_segmented(filepath: str, duration_seconds: float) -> TranscriptionResponse:
+    """
+    Splits a long recording into overlapping segments, transcribes them
+    concurrently and stitches the results into a single transcript.
+    """
+    segments = plan_segments(
+        int(duration_seconds * 1000),
+        settings.TRANSCRIPTION_SEGMENT_SECONDS * 1000,
+        settings.TRANSCRIPTION_SEGMENT_OVERLAP_SECONDS * 1000,
+    )
+    logger.info(f"Transcribing {filepath} as {len(segments)} segments")
+    semaphore = asyncio.Semaphore(settings.TRANSCRIPTION_SEGMENT_CONCURRENCY)
+
+    with tempfile.TemporaryDirectory(dir=scratch_dir("segments")) as segment_dir:
+        async def run(index: int, start_ms: int, end_ms: int) -> TranscriptionResponse:
+            async with semaphore:
+                segment_path = os.path.join(segment_dir, f"segment_{index:04d}.ogg")
+                await extract_segment(filepath, segment_path, start_ms / 1000, (end_ms - start_ms) / 1000)
+                return await _transcribe_segment(segment_path, index)
+
+        # Wait for every segment before the directory is removed
+        results = await asyncio.gather(
+            *(run(i, start, end) for i, (start, end) in enumerate(segments)),
+            return_exceptions=True,
+        )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return stitch_transcripts(segments, results)
+
+async def _transcribe_local_file(filepath: str) -> TranscriptionResponse:
+    """Transcribes a file as is, in segments if it is long and segmentation is enabled."""
+    if settings.TRANSCRIPTION_SEGMENTED and ffmpeg_available():
+        try:
+            duration = await probe_duration(filepath)
+        except AudioProcessingError as e:
+            logger.warning(f"Could not probe duration, transcribing as one file: {e}")
+            duration = 0
+        if duration > settings.TRANSCRIPTION_SEGMENT_MIN_SECONDS:
+            return await transcribe_file_segmented(filepath, duration)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, transcribe_file_sync, filepath)
+
+async def transcribe_file(filepath: str) -> TranscriptionResponse:
+    """
+    Transcribes a local file on the transcription thread pool. The file is first
+    shrunk to compact mono audio when pre-processing is enabled, and with
+    TRANSCRIPTION_SEGMENTED enabled, long recordings are transcribed in segments.
+    """
+    preprocessed = await preprocess_audio(filepath)
+    if preprocessed is None:
+        return await _transcribe_local_file(filepath)
+
+    try:
+        result = await _transcribe_local_file(preprocessed.path)
+    finally:
+        cleanup_file(preprocessed.path)
+    if preprocessed.leading_silence_ms and result.utterances:
+        # Keep offsets relative to the original recording
+        offset = preprocessed.leading_silence_ms
+        result.utterances = [
+            utt.model_copy(update={"start": utt.start + offset, "end": utt.end + offset})
+            for utt in result.utterances
+        ]
+    return result
+
+async def transcribe_and_cache(filepath: str, audio_hash: str) -> TranscriptionResponse:
+    """
+    Transcribes a file and caches the result under its audio hash. Calls for
+    identical audio in flight at the same time share one transcription.
+    """
+    async def transcribe() -> TranscriptionResponse:
+        result = await transcribe_file(filepath)
+        store_cached_transcript(audio_hash, result)
+        return result
+
+    return await _transcription_flight.do(audio_hash, transcribe)
+
+
+# Background Jobs
+def _prune_jobs():
+    """Drops finished jobs older than TRANSCRIPTION_JOB_TTL_SECONDS."""
+    cutoff = time.time() - settings.TRANSCRIPTION_JOB_TTL_SECONDS
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job.finished_at is not None and job.finished_at < cutoff
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+async def _run_transcription_job(job_id: str, filepath: str, audio_hash: str, filename: Optional[str]):
+    """Runs a queued job to completion once a worker slot is free, and records the outcome."""
+    job = _jobs[job_id]
+    try:
+        async with _job_slots:
+            job.status = "processing"
+            TRANSCRIPTION_JOBS.labels("queued").dec()
+            TRANSCRIPTION_JOBS.labels("processing").inc()
+            try:
+                result = await transcribe_and_cache(filepath, audio_hash)
+                await save_to_store(result, filename)
+                schedule_precompute(result)
+                job.result = result
+                if result.error:
+                    job.status = "error"
+                    job.error = result.error
+                else:
+                    job.status = "completed"
+                logger.info(f"Transcription job {job_id} finished with status: {job.status}")
+            except Exception as e:
+                logger.error(f"Transcription job {job_id} failed: {e}", exc_info=True)
+                job.status = "error"
+                job.error = f"Transcription process failed: {e}"
+            finally:
+                TRANSCRIPTION_JOBS.labels("processing").dec()
+    finally:
+        if job.status == "queued":
+            TRANSCRIPTION_JOBS.labels("queued").dec() # Cancelled before it got a slot
+        job.finished_at = time.time()
+        cleanup_file(filepath)
+
+async def _submit_saved_upload(upload: SavedUpload, filename: Optional[str]) -> TranscriptionJobResponse:
+    """Creates a job for a saved upload, served from the cache or queued for transcription."""
+    job = TranscriptionJobResponse(
+        job_id=str(uuid.uuid4()),
+        status="queued",
+        filename=filename,
+        created_at=time.time(),
+    )
+    _jobs[job.job_id] = job
+
+    cached = get_cached_transcript(upload.audio_hash)
+    if cached is not None:
+        cleanup_file(upload.path)
+        job.status = "completed"
+        job.result = cached
+        job.cached = True
+        job.finished_at = time.time()
+        await save_to_store(cached, filename)
+        schedule_precompute(cached)
+        return job
+
+    TRANSCRIPTION_JOBS.labels("queued").inc()
+    task = asyncio.create_task(_run_transcription_job(job.job_id, upload.path, upload.audio_hash, filename))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+
+    logger.info(f"Queued transcription job {job.job_id} for file: {filename}")
+    return job
+
+async def submit_transcription_job(file: UploadFile) -> TranscriptionJobResponse:
+    """
+    Saves the uploaded file and schedules its transcription in the background.
+    Returns immediately with the queued job.
+    """
+    if not transcription_available():
+        raise HTTPException(status_code=503, detail="Transcription service is unavailable due to missing API key.")
+
+    _prune_jobs()
+    upload = await save_upload_file(file)
+    return await _submit_saved_upload(upload, file.filename)
+
+async def submit_transcription_stream(chunks: AsyncIterator[bytes], filename: Optional[str]) -> TranscriptionJobResponse:
+    """
+    Streams a raw request body to disk and schedules its transcription in the
+    background. Returns immediately with the queued job.
+    """
+    if not transcription_available():
+        raise HTTPException(status_code=503, detail="Transcription service is unavailable due to missing API key.")
+
+    _prune_jobs()
+    upload = await save_stream(chunks, filename)
+    return await _submit_saved_upload(upload, filename)
+
+def get_transcription_job(job_id: str) -> Optional[TranscriptionJobResponse]:
+    """Returns a transcription job by ID, or None if unknown or expired."""
+    _prune_jobs()
+    return _jobs.get(job_id)
 
+def get_transcript_cache_stats() -> Optional[dict]:
+    """Returns transcript cache counters, or None when the cache is disabled."""
+    transcript_cache = registry.get("transcript_cache")
+    return transcript_cache.stats() if transcript_cache is not None else None
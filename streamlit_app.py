@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 import time
 from io import BytesIO
 import os
@@ -11,9 +12,16 @@ st.set_page_config(initial_sidebar_state="collapsed")
 # --- Configuration ---
 FASTAPI_BASE_URL = os.getenv("FASTAPI_BASE_URL", "https://meeting-summarizer-production.up.railway.app/api/v1")
 TRANSCRIPTION_ENDPOINT = f"{FASTAPI_BASE_URL}/transcribe"
+TRANSCRIPTION_STREAM_ENDPOINT = f"{FASTAPI_BASE_URL}/transcribe/stream"
+TRANSCRIPTION_JOBS_ENDPOINT = f"{FASTAPI_BASE_URL}/transcriptions"
+TRANSCRIPTION_POLL_INTERVAL = 2 # Seconds between job status checks
 SUMMARIZATION_ENDPOINT = f"{FASTAPI_BASE_URL}/llm/summarize"
 ACTION_ITEMS_ENDPOINT = f"{FASTAPI_BASE_URL}/llm/extract-action-items"
+NOTES_ENDPOINT = f"{FASTAPI_BASE_URL}/llm/notes"
 CHAT_ENDPOINT = f"{FASTAPI_BASE_URL}/llm/chat"
+CHAT_SESSIONS_ENDPOINT = f"{FASTAPI_BASE_URL}/llm/chat/sessions"
+TRANSCRIPTS_ENDPOINT = f"{FASTAPI_BASE_URL}/transcripts"
+SEARCH_ENDPOINT = f"{FASTAPI_BASE_URL}/search"
 
 # --- Page Setup ---
 st.set_page_config(
@@ -259,6 +267,7 @@ def init_session_state():
         'chat_history': [],
         'chatting': False,
         'chat_error': None,
+        'chat_session_id': None,
         'full_transcript_text': None
     }
     for key, val in defaults.items():
@@ -272,7 +281,7 @@ import pandas as pd
 from docx import Document
 
 def reset_state():
-    keys_to_skip = ['audio_uploader', 'chat_input', 'transcribe_button', 'summarize_btn']  # widget keys to skip
+    keys_to_skip = ['audio_uploader', 'chat_input', 'transcribe_button', 'summarize_btn', 'open_meeting_btn', 'stored_transcript', 'search_all']  # widget keys to skip
     for k in st.session_state.keys():
         if k in keys_to_skip:
             continue
@@ -283,6 +292,44 @@ def reset_state():
         else:
             st.session_state[k] = None
 
+def iter_sse_tokens(resp):
+    """Yields tokens from a Server-Sent Events response until the stream ends."""
+    event = "message"
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line:
+            event = "message"
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data = json.loads(line[len("data:"):].strip())
+            if event == "error":
+                raise RuntimeError(data.get("detail", "Streaming failed"))
+            if event == "done":
+                return
+            yield data.get("token", "")
+
+def open_chat_session():
+    """Opens a server-side chat session; the transcript is only sent if the server has not stored it."""
+    data = st.session_state.transcript_data or {}
+    payload = {"transcript_id": data.get("transcript_id")}
+    resp = requests.post(CHAT_SESSIONS_ENDPOINT, json=payload, timeout=30) if payload["transcript_id"] else None
+    if resp is None or resp.status_code in (400, 404):
+        payload.update(transcript_context=st.session_state.full_transcript_text, utterances=data.get("utterances"))
+        resp = requests.post(CHAT_SESSIONS_ENDPOINT, json=payload, timeout=60)
+    resp.raise_for_status()
+    st.session_state.chat_session_id = resp.json()["session_id"]
+    return st.session_state.chat_session_id
+
+def post_chat_question(question):
+    """Sends only the question to the chat session, reopening it once if it has expired."""
+    session_id = st.session_state.chat_session_id or open_chat_session()
+    resp = requests.post(f"{CHAT_SESSIONS_ENDPOINT}/{session_id}/stream", json={"user_query": question}, timeout=120, stream=True)
+    if resp.status_code == 404:
+        resp.close()
+        session_id = open_chat_session()
+        resp = requests.post(f"{CHAT_SESSIONS_ENDPOINT}/{session_id}/stream", json={"user_query": question}, timeout=120, stream=True)
+    return resp
+
 def highlight_text(text, query):
     if not query:
         return text
@@ -291,6 +338,41 @@ def highlight_text(text, query):
     # Highlight with HTML span and yellow background
     return pattern.sub(lambda m: f'<span style="background-color: #ffd700; color: #000000; padding: 2px 4px; border-radius: 3px; font-weight: bold;">{m.group(0)}</span>', text)
 
+def fetch_stored_transcripts(limit=100):
+    """Lists the most recent transcripts in the server-side store; empty if it is unavailable."""
+    try:
+        resp = requests.get(TRANSCRIPTS_ENDPOINT, params={"limit": limit}, timeout=10)
+        resp.raise_for_status()
+        return resp.json().get("transcripts", [])
+    except Exception:
+        return []
+
+def load_stored_transcript(transcript_id):
+    """Loads a stored transcript and all its utterances in the shape of a transcription result."""
+    resp = requests.get(f"{TRANSCRIPTS_ENDPOINT}/{transcript_id}", timeout=30)
+    resp.raise_for_status()
+    stored = resp.json()
+    utterances, offset = [], 0
+    while offset < stored["utterance_count"]:
+        page = requests.get(
+            f"{TRANSCRIPTS_ENDPOINT}/{transcript_id}/utterances",
+            params={"offset": offset, "limit": 1000},
+            timeout=30,
+        )
+        page.raise_for_status()
+        batch = page.json()["utterances"]
+        if not batch:
+            break
+        utterances.extend(batch)
+        offset += len(batch)
+    return {
+        "status": "TranscriptStatus.completed",
+        "transcript_id": transcript_id,
+        "text": stored.get("text", ""),
+        "language_code": stored.get("language_code"),
+        "utterances": utterances,
+    }
+
 def generate_txt(summary_data: dict, transcript_text: str) -> BytesIO:
     buffer = BytesIO()
     summary = summary_data.get("summary", "No summary available")
@@ -361,10 +443,22 @@ with st.sidebar:
             st.session_state.is_loading = True
             st.write("Transcribing audio... This might take a moment depending on the file size.")
             try:
-                files = {'file': (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type)}
-                resp = requests.post(TRANSCRIPTION_ENDPOINT, files=files)
+                # Send the raw bytes so the server can stream them straight to disk
+                resp = requests.post(
+                    TRANSCRIPTION_STREAM_ENDPOINT,
+                    data=uploaded_file.getvalue(),
+                    params={"filename": uploaded_file.name},
+                    headers={"Content-Type": uploaded_file.type},
+                )
                 resp.raise_for_status()
-                result = resp.json()
+                job = resp.json()
+                # Poll the background job until it finishes
+                while job.get("status") in ("queued", "processing"):
+                    time.sleep(TRANSCRIPTION_POLL_INTERVAL)
+                    job_resp = requests.get(f"{TRANSCRIPTION_JOBS_ENDPOINT}/{job['job_id']}", timeout=30)
+                    job_resp.raise_for_status()
+                    job = job_resp.json()
+                result = job.get("result") or {"error": job.get("error")}
                 status = result.get("status")
                 if status == "TranscriptStatus.completed":
                     st.session_state.transcript_data = result
@@ -384,39 +478,51 @@ with st.sidebar:
         if st.button("Summarize Transcript", key="summarize_btn", use_container_width=True, disabled=sum_disabled):
             st.session_state.summarizing = True
             st.write("Generating summary and extracting action items...")
-            summary_data = None
-            action_items_data = None
-            action_items_error = None
             try:
-                payload = {"transcript": st.session_state.full_transcript_text}
-                # Call summary endpoint
-                summary_resp = requests.post(SUMMARIZATION_ENDPOINT, json=payload, timeout=180)
-                summary_resp.raise_for_status()
-                summary_data = summary_resp.json()
+                payload = {
+                    "transcript": st.session_state.full_transcript_text,
+                    "utterances": (st.session_state.transcript_data or {}).get("utterances"),
+                }
+                # Summary and action items come back from a single request
+                notes_resp = requests.post(NOTES_ENDPOINT, json=payload, timeout=180)
+                notes_resp.raise_for_status()
+                notes_data = notes_resp.json()
+                action_items_error = notes_data.pop("action_items_error", None)
+                st.session_state.summary_data = notes_data
+                st.session_state.summary_error = None
+                st.session_state.action_items_error = f"Action Items Error: {action_items_error}" if action_items_error else None
             except Exception as e:
                 st.session_state.summary_error = f"Summarization Error: {e}"
+            st.session_state.summarizing = False
+            st.rerun()
+
+    # Meetings kept in the server-side transcript store survive page reloads
+    stored_transcripts = fetch_stored_transcripts()
+    if stored_transcripts:
+        st.markdown("---")
+        st.subheader("Stored Meetings")
+        labels = {
+            t["transcript_id"]: f"{t.get('filename') or t['transcript_id']} ({time.strftime('%Y-%m-%d %H:%M', time.localtime(t['created_at']))})"
+            for t in stored_transcripts
+        }
+        selected_id = st.selectbox("Open a stored meeting", options=list(labels), format_func=labels.get, key="stored_transcript")
+        if st.button("Open Meeting", key="open_meeting_btn", use_container_width=True):
             try:
-                # Call action items endpoint
-                action_resp = requests.post(ACTION_ITEMS_ENDPOINT, json=payload, timeout=180)
-                action_resp.raise_for_status()
-                action_items_data = action_resp.json()
+                result = load_stored_transcript(selected_id)
+                reset_state()
+                st.session_state.transcribe_clicked = True
+                st.session_state.uploaded_filename = labels[selected_id]
+                st.session_state.transcript_data = result
+                st.session_state.full_transcript_text = result.get("text", "")
             except Exception as e:
-                action_items_error = f"Action Items Error: {e}"
-            # Merge action items if available
-            if summary_data:
-                summary_data["action_items"] = action_items_data.get("action_items", []) if action_items_data else []
-                st.session_state.summary_data = summary_data
-                st.session_state.summary_error = None
-                st.session_state.action_items_error = action_items_error
-            elif action_items_error:
-                st.session_state.summary_error = action_items_error
-            st.session_state.summarizing = False
+                st.session_state.error_message = f"Could not load meeting: {e}"
             st.rerun()
 
     # Status Display
     st.markdown("---")
     st.subheader("Search in Transcript")
     search_query = st.text_input("Enter a keyword to search", placeholder="e.g., budget, next meeting, action", key="keyword_search")
+    search_all = st.checkbox("Search all stored meetings", key="search_all")
     
     st.subheader("Status")
     if st.session_state.is_loading:
@@ -435,6 +541,25 @@ with st.sidebar:
         st.info("Upload a file to start.")
 
 
+if search_all and search_query:
+    st.subheader("Search Results Across Meetings")
+    try:
+        resp = requests.get(SEARCH_ENDPOINT, params={"q": search_query, "limit": 50}, timeout=30)
+        resp.raise_for_status()
+        results = resp.json()
+        if not results["hits"]:
+            st.warning(f"No matches found for '{search_query}'")
+        else:
+            st.info(f"Found {results['total']} matching utterances; showing the best {len(results['hits'])}")
+        for hit in results["hits"]:
+            timestamp = time.strftime('%M:%S', time.gmtime(hit["start"] / 1000))
+            meeting = hit.get("filename") or hit["transcript_id"]
+            with st.chat_message(hit.get("speaker") or "Unknown"):
+                st.markdown(f"**{meeting}** _{timestamp}_ | {highlight_text(hit['text'], search_query)}", unsafe_allow_html=True)
+    except Exception as e:
+        st.error(f"Search Error: {e}")
+    st.markdown("---")
+
 if st.session_state.get("transcribe_clicked"):
     data = st.session_state.transcript_data
     st.subheader("Meeting Transcript")
@@ -533,15 +658,13 @@ if st.session_state.get("transcribe_clicked"):
 
     # On rerun, if chatting and last message is user, call Chat API
     if st.session_state.chatting and st.session_state.chat_history[-1]['role'] == 'user':
-        with st.spinner("Thinking..."):
+        with st.chat_message("assistant"):
             try:
-                payload = {
-                    "transcript_context": st.session_state.full_transcript_text,
-                    "user_query": st.session_state.chat_history[-1]['content']
-                }
-                resp = requests.post(CHAT_ENDPOINT, json=payload, timeout=120)
-                resp.raise_for_status()
-                ai_resp = resp.json().get('ai_response','')
+                # The server keeps the transcript and the conversation; only the question is sent
+                # Render the answer token by token as it streams in
+                with post_chat_question(st.session_state.chat_history[-1]['content']) as resp:
+                    resp.raise_for_status()
+                    ai_resp = st.write_stream(iter_sse_tokens(resp))
                 st.session_state.chat_history.append({"role": "assistant", "content": ai_resp})
             except Exception as e:
                 st.session_state.chat_history.append({"role": "assistant", "content": f"Error: {e}"})